@@ -1,241 +1,544 @@
 import asyncio
 import logging
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
 
-import aiohttp
-from aiogram import Bot, Dispatcher
-from aiogram.filters import Command
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
-from apscheduler import events
 
 from app.config import config
+from app.delivery import Broadcaster, DeliveryReport, OutgoingMessage
+from app.filters import get_filter
+from app.jobs import REPLACED, ChatJobs
+from app.logging_config import setup_logging
+from app.messages import digest_cache
 from app.models import Vacancy
+from app.parser import commit_new_vacancies, fetch_new_vacancies
+from app.providers import VacancyProvider, create_provider
+from app.storage import get_subscriber_store
+from app.subscriptions import Subscription, SubscriptionIndex
 
-PLANNING_HOUR = 6
-PLANNING_MINUTE = 0
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/bot.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Валидируем конфигурацию при импорте
-config.validate()
+# Обработчики команд; бот, диспетчер и остальное создаются при первом
+# обращении, поэтому импорт модуля не требует BOT_TOKEN и не пишет логи
+router = Router()
 
-# Инициализация бота и диспетчера
-bot = Bot(token=config.BOT_TOKEN or "")
-dp = Dispatcher()
+_bot: Optional[Bot] = None
+_dp: Optional[Dispatcher] = None
+_provider: Optional[VacancyProvider] = None
+_broadcaster: Optional[Broadcaster] = None
+_jobs: Optional[ChatJobs] = None
 
-# Инициализация планировщика
-scheduler = AsyncIOScheduler()
 
+def get_bot() -> Bot:
+    global _bot
+    if _bot is None:
+        config.validate()
+        # TELEGRAM_API_URL позволяет подменить Bot API
+        api = TelegramAPIServer.from_base(config.TELEGRAM_API_URL)
+        _bot = Bot(token=config.BOT_TOKEN or "", session=AiohttpSession(api=api))
+    return _bot
 
-async def get_vacancies_from_api() -> List[Vacancy]:
-    try:
-        api_url = f"http://{config.API_HOST}:{config.API_PORT}/vacancies"
-        logger.info(f"Запрос к API: {api_url}")
-        async with aiohttp.ClientSession() as session:
-            async with session.get(api_url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    logger.info(f"Получено {len(data)} вакансий из API")
-                    return [Vacancy(**vacancy) for vacancy in data]
-                else:
-                    logger.error(f"API вернул статус {response.status}")
-                    return []
-    except Exception as e:
-        logger.error(f"Ошибка при получении вакансий из API: {e}")
-        return []
+
+def get_dispatcher() -> Dispatcher:
+    global _dp
+    if _dp is None:
+        _dp = Dispatcher()
+        _dp.include_router(router)
+    return _dp
+
+
+def get_provider() -> VacancyProvider:
+    """
+    Источник вакансий: напрямую из процесса или через HTTP API
+    """
+    global _provider
+    if _provider is None:
+        _provider = create_provider()
+    return _provider
+
+
+def get_broadcaster() -> Broadcaster:
+    """
+    Рассылка с учётом лимитов Telegram; заблокировавшие бота чаты отписываются
+    """
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = Broadcaster(
+            get_bot(), on_blocked=lambda chat_id: get_subscriber_store().remove(chat_id)
+        )
+    return _broadcaster
 
 
-def format_vacancy_message(vacancy: Vacancy) -> str:
+def get_jobs() -> ChatJobs:
+    """
+    Фоновые задания /start, по одному на чат
+    """
+    global _jobs
+    if _jobs is None:
+        _jobs = ChatJobs()
+    return _jobs
+
+
+async def close() -> None:
+    """
+    Отменяет незавершённые задания /start, закрывает источник вакансий и
+    HTTP-сессию бота
+    """
+    global _bot, _provider, _broadcaster
+    if _jobs is not None:
+        await _jobs.cancel()
+    if _provider is not None:
+        await _provider.close()
+        _provider = None
+    if _bot is not None:
+        await _bot.session.close()
+        _bot = None
+        _broadcaster = None
+
+
+HTML_OPTIONS = {"parse_mode": "HTML", "disable_web_page_preview": True}
+
+DAILY_HEADER = (
+    "🌅 Доброе утро! Найдено {count} новых вакансий:\n\n"
+    "Вот актуальные предложения для Вас:"
+)
+DAILY_FOOTER = (
+    "✅ Ежедневные вакансии загружены! Используйте /start для обновления списка."
+)
+START_HEADER = "📋 Найдено {count} вакансий:\n\nВот актуальные предложения для Вас:"
+SEARCH_HEADER = "🔎 Найдено {count} вакансий по запросу «{query}»:"
+SEARCHING_TEXT = "🔍 Ищу актуальные вакансии из Pentest, DevOps, Develop..."
+PROGRESS_TEXT = SEARCHING_TEXT + "\n\nУже найдено вакансий: {count}"
+REPLACED_TEXT = "🔁 Поиск заменён новым запросом /start с другими параметрами."
+START_FOOTER = (
+    "✅ Все вакансии загружены! Используйте /start для обновления списка.\n\n"
+    "🤖 Бот будет автоматически отправлять новые вакансии каждый день в 6:00!"
+)
+
+
+def parse_listing(args: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Разбирает параметры выдачи /start вида ``sort=salary; min_salary=150000``
+    """
+    sort: Optional[str] = None
+    min_salary: Optional[int] = None
+    for part in (args or "").split(";"):
+        if not part.strip():
+            continue
+        key, sep, value = part.partition("=")
+        key, value = key.strip().lower(), value.strip()
+        if not sep:
+            raise ValueError(f"Ожидалось ключ=значение: {part.strip()}")
+        if key == "sort":
+            if value != "salary":
+                raise ValueError(f"Сортировка возможна только по salary: {value}")
+            sort = value
+        elif key == "min_salary":
+            if not value.isdigit():
+                raise ValueError(f"Зарплата должна быть числом: {value}")
+            min_salary = int(value)
+        else:
+            raise ValueError(f"Неизвестный параметр: {key}")
+    return sort, min_salary
+
+
+def parse_search(args: Optional[str]) -> Tuple[str, Optional[int]]:
+    """
+    Разбирает /search: текст запроса и необязательное ``days=N``
     """
-    Форматирует вакансию для отображения в Telegram
+    words: List[str] = []
+    days: Optional[int] = None
+    for word in (args or "").split():
+        if word.lower().startswith("days="):
+            value = word[5:]
+            if not value.isdigit() or not int(value):
+                raise ValueError(f"Число дней должно быть положительным: {value}")
+            days = int(value)
+        else:
+            words.append(word)
+    return " ".join(words), days
+
+
+def render_vacancy_messages(
+    vacancies: List[Vacancy], header: str = "", footer: str = ""
+) -> List[OutgoingMessage]:
     """
-    return (
-        f"🏢 <b>{vacancy.title}</b>\n"
-        f"💰 <b>Зарплата:</b> {vacancy.salary}\n"
-        f"🔗 <a href='{vacancy.url}'>Открыть вакансию</a>\n"
-        f"{'─' * 34}"
+    Упаковывает заголовок, вакансии и подпись в минимум сообщений по 4096
+    символов. Готовые сообщения кэшируются по содержимому набора вакансий.
+    """
+    chunks = digest_cache.render(vacancies, header, footer)
+    return [(chunk, HTML_OPTIONS) for chunk in chunks]
+
+
+def build_daily_digest(vacancies: Optional[List[Vacancy]]) -> List[OutgoingMessage]:
+    if vacancies is None:
+        return [("❌ К сожалению, не удалось получить вакансии. Попробуйте позже.", {})]
+
+    if not vacancies:
+        return [("🌅 Доброе утро! Новых вакансий с прошлой рассылки нет.", {})]
+
+    return render_vacancy_messages(
+        vacancies, DAILY_HEADER.format(count=len(vacancies)), DAILY_FOOTER
     )
 
 
-async def send_daily_vacancies() -> None:
-    if not config.NOTIFICATION_USER_ID:
-        logger.error("❌ ID пользователя для уведомлений не установлен")
-        return
+def plan_daily_digests(
+    subscribers: List[str],
+    preferences: List[Subscription],
+    vacancies: Optional[List[Vacancy]],
+) -> List[Tuple[List[str], List[OutgoingMessage]]]:
+    """
+    Разбивает подписчиков на группы с одинаковой выдачей.
 
-    try:
-        logger.info("🕕 Отправка ежедневных вакансий...")
+    Вакансии раскладываются по персональным настройкам через инвертированный
+    индекс за один проход; дайджест каждой группы собирается один раз.
+    Подписчики без настроек получают общий дайджест.
+    """
+    if not vacancies or not preferences:
+        return [(subscribers, build_daily_digest(vacancies))]
 
-        vacancies = await get_vacancies_from_api()
+    personal = {subscription.chat_id for subscription in preferences}
+    matched = SubscriptionIndex(preferences).match_all(vacancies)
 
-        if not vacancies:
-            await bot.send_message(
-                config.NOTIFICATION_USER_ID,
-                "❌ К сожалению, не удалось получить вакансии. Попробуйте позже.",
-            )
-            return
+    groups: Dict[Tuple[int, ...], List[str]] = {}
+    default: List[str] = []
+    for chat_id in subscribers:
+        if chat_id in personal:
+            key = tuple(map(id, matched.get(chat_id, [])))
+            groups.setdefault(key, []).append(chat_id)
+        else:
+            default.append(chat_id)
 
-        # Отправляем заголовок
-        await bot.send_message(
-            config.NOTIFICATION_USER_ID,
-            f"🌅 Доброе утро! Найдено {len(vacancies)} новых вакансий:\n\n"
-            "Вот актуальные предложения для Вас:",
-        )
+    plans = [(default, build_daily_digest(vacancies))] if default else []
+    for chat_ids in groups.values():
+        plans.append((chat_ids, build_daily_digest(matched.get(chat_ids[0], []))))
+    return plans
 
-        batch_size = 5
-        for i in range(0, len(vacancies), batch_size):
-            batch = vacancies[i : i + batch_size]
-            message_text = "\n\n".join([format_vacancy_message(vac) for vac in batch])
 
-            await bot.send_message(
-                config.NOTIFICATION_USER_ID,
-                message_text,
-                parse_mode="HTML",
-                disable_web_page_preview=True,
-            )
+async def send_daily_vacancies() -> None:
+    subscribers = get_subscriber_store().all()
+    if not subscribers:
+        logger.error("❌ Нет подписчиков для уведомлений")
+        return
 
-            # Небольшая пауза между сообщениями
-            if i + batch_size < len(vacancies):
-                await asyncio.sleep(1)
+    try:
+        logger.info(
+            f"🕕 Отправка ежедневных вакансий {len(subscribers)} подписчикам..."
+        )
 
-        await bot.send_message(
-            config.NOTIFICATION_USER_ID,
-            "✅ Ежедневные вакансии загружены! Используйте /start для "
-            "обновления списка.",
+        # Только вакансии, которые ещё не отправлялись. Обход идёт в процессе
+        # бота: увиденными они станут только после доставки рассылки
+        delta = await fetch_new_vacancies()
+        vacancies = delta.vacancies if delta is not None else None
+        if vacancies is not None and not vacancies:
+            logger.info("📭 Новых вакансий с прошлого обхода нет")
+
+        # Дайджест собирается один раз на группу подписчиков с одинаковой выдачей
+        plans = plan_daily_digests(
+            subscribers, get_subscriber_store().preferences(), vacancies
+        )
+        broadcaster = get_broadcaster()
+        reports = await asyncio.gather(
+            *(broadcaster.broadcast(chat_ids, digest) for chat_ids, digest in plans)
+        )
+        report = DeliveryReport(
+            chats=sum(r.chats for r in reports),
+            sent=sum(r.sent for r in reports),
+            failed=sum(r.failed for r in reports),
+            blocked=[chat_id for r in reports for chat_id in r.blocked],
+            elapsed=max(r.elapsed for r in reports),
         )
 
-        logger.info("✅ Ежедневные вакансии отправлены успешно")
+        logger.info(
+            f"✅ Ежедневные вакансии отправлены: {report.sent} сообщений, "
+            f"{report.chats} чатов, ошибок {report.failed}, "
+            f"заблокировали {len(report.blocked)}, за {report.elapsed:.1f} с"
+        )
+        if delta is not None:
+            if report.failed:
+                logger.warning(
+                    f"⚠️ Рассылка доставлена не всем ({report.failed} ошибок): "
+                    "новые вакансии будут отправлены повторно"
+                )
+            else:
+                commit_new_vacancies(delta)
 
     except Exception as e:
         logger.error(f"❌ Ошибка при отправке ежедневных вакансий: {e}")
         try:
-            await bot.send_message(
-                config.NOTIFICATION_USER_ID,
-                "❌ Произошла ошибка при получении ежедневных вакансий.",
+            await get_broadcaster().broadcast(
+                subscribers,
+                [("❌ Произошла ошибка при получении ежедневных вакансий.", {})],
             )
         except Exception:
             pass
 
 
-@dp.message(Command("start"))
-async def cmd_start(message: Message) -> None:
-    # Сохраняем ID пользователя для автоматических уведомлений
-    if not config.NOTIFICATION_USER_ID:
-        if message.from_user:
-            config.NOTIFICATION_USER_ID = str(message.from_user.id)
-        print(
-            f"👤 Установлен ID пользователя для уведомлений: "
-            f"{config.NOTIFICATION_USER_ID}"
-        )
+async def build_listing(
+    chat_id: str,
+    sort: Optional[str] = None,
+    min_salary: Optional[int] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> List[OutgoingMessage]:
+    """
+    Сообщения выдачи /start с учётом параметров и настроек чата
+    """
+    vacancies = await get_provider().get_vacancies(sort, min_salary, on_progress)
+
+    if not vacancies:
+        if vacancies is not None and min_salary is not None:
+            return [
+                (f"📭 Вакансий с зарплатой от {min_salary} на руки не найдено.", {})
+            ]
+        return [("❌ К сожалению, не удалось получить вакансии. Попробуйте позже.", {})]
+
+    preferences = get_subscriber_store().get_preferences(chat_id)
+    if preferences is not None:
+        vacancies = preferences.filter(vacancies)
+        if not vacancies:
+            return [
+                (
+                    "📭 По вашим настройкам вакансий не найдено. "
+                    "Измените их командой /prefs.",
+                    {},
+                )
+            ]
+
+    return render_vacancy_messages(
+        vacancies, START_HEADER.format(count=len(vacancies)), START_FOOTER
+    )
 
-    await message.answer("🔍 Ищу актуальные вакансии из Pentest, DevOps, Develop...")
 
+async def deliver_listing(
+    chat_id: str, sort: Optional[str] = None, min_salary: Optional[int] = None
+) -> None:
+    """
+    Фоновое задание /start: пока идёт обход, сообщение о поиске обновляется
+    числом найденных вакансий, затем заменяется первым сообщением выдачи
+    """
+    broadcaster = get_broadcaster()
+    # Все сообщения задания идут через лимиты рассылки: при всплеске /start
+    # ответ Telegram 429 приводит к ожиданию, а не к потере выдачи
+    progress = await broadcaster.send(chat_id, SEARCHING_TEXT)
+    found = 0
+
+    def on_progress(count: int) -> None:
+        nonlocal found
+        found = count
+
+    async def show_progress() -> None:
+        shown = 0
+        while True:
+            await asyncio.sleep(config.PROGRESS_EDIT_INTERVAL)
+            if found != shown:
+                shown = found
+                await broadcaster.edit(
+                    chat_id, progress.message_id, PROGRESS_TEXT.format(count=found)
+                )
+
+    reporter = asyncio.create_task(show_progress())
     try:
-        vacancies = await get_vacancies_from_api()
+        messages = await build_listing(chat_id, sort, min_salary, on_progress)
+    except asyncio.CancelledError as e:
+        if e.args == (REPLACED,):
+            # Выдачу пришлёт новое задание чата, это сообщение закрываем
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+            await broadcaster.edit(chat_id, progress.message_id, REPLACED_TEXT)
+        raise
+    except Exception as e:
+        logger.error(f"Ошибка в обработчике start: {e}")
+        messages = [
+            ("❌ Произошла ошибка при получении вакансий. Попробуйте позже.", {})
+        ]
+    finally:
+        reporter.cancel()
+        # Последнее обновление хода поиска не должно перезаписать выдачу
+        await asyncio.gather(reporter, return_exceptions=True)
 
-        if not vacancies:
-            await message.answer(
-                "❌ К сожалению, не удалось получить вакансии. Попробуйте позже."
-            )
-            return
+    (text, options), rest = messages[0], messages[1:]
+    try:
+        await broadcaster.edit(chat_id, progress.message_id, text, **options)
+    except TelegramBadRequest:
+        # Сообщение о поиске удалено: выдача приходит новым сообщением
+        await broadcaster.send(chat_id, text, **options)
+    await broadcaster.send_many(chat_id, rest)
 
-        await message.answer(
-            f"📋 Найдено {len(vacancies)} вакансий:\n\n"
-            "Вот актуальные предложения для Вас:"
-        )
 
-        batch_size = 5
-        for i in range(0, len(vacancies), batch_size):
-            batch = vacancies[i : i + batch_size]
-            message_text = "\n\n".join([format_vacancy_message(vac) for vac in batch])
+@router.message(Command("start"))
+async def cmd_start(message: Message, command: CommandObject) -> None:
+    """
+    /start - актуальные вакансии, /start sort=salary; min_salary=150000 -
+    сначала с наибольшей зарплатой и не ниже указанной (на руки).
 
-            await message.answer(
-                message_text, parse_mode="HTML", disable_web_page_preview=True
-            )
+    Поиск идёт в фоновом задании чата, поэтому обработчик не ждёт обхода
+    hh.ru; повторный /start с теми же параметрами присоединяется к уже
+    идущему поиску, сообщение о котором уже есть в чате, а с другими -
+    заменяет его.
+    """
+    try:
+        sort, min_salary = parse_listing(command.args)
+    except ValueError as e:
+        await message.answer(f"❌ {e}")
+        return
+
+    # Подписываем чат на автоматические уведомления
+    chat_id = str(message.chat.id)
+    if get_subscriber_store().add(chat_id):
+        logger.info(f"👤 Новый подписчик на уведомления: {chat_id}")
+
+    _, started = get_jobs().start(
+        chat_id, lambda: deliver_listing(chat_id, sort, min_salary), (sort, min_salary)
+    )
+    if not started:
+        logger.info(f"⏳ Чат {chat_id}: поиск уже идёт, /start присоединён к нему")
+
+
+@router.message(Command("stop"))
+async def cmd_stop(message: Message) -> None:
+    if get_subscriber_store().remove(str(message.chat.id)):
+        logger.info(f"👋 Чат {message.chat.id} отписался от уведомлений")
+    await message.answer(
+        "🔕 Ежедневная рассылка отключена. Используйте /start, чтобы подписаться "
+        "снова."
+    )
+
+
+def rejected_by_profile(preferences: Subscription) -> List[str]:
+    """
+    График и занятость из настроек, которые отсеивает общий профиль фильтров
+    """
+    rules = get_filter()
+    return [
+        value for value in preferences.schedule if not rules.allows_schedule(value)
+    ] + [
+        value for value in preferences.employment if not rules.allows_employment(value)
+    ]
+
+
+@router.message(Command("prefs"))
+async def cmd_prefs(message: Message, command: CommandObject) -> None:
+    """
+    /prefs - показать настройки, /prefs reset - сбросить,
+    /prefs keywords=python, django; exclude=senior; salary=150000;
+    schedule=remote; employment=part - задать.
 
-            if i + batch_size < len(vacancies):
-                await asyncio.sleep(1)
+    Настройки только сужают общий профиль фильтров (FILTER_PROFILE): график
+    и занятость, которые он отсеивает, в выдачу не попадут.
+    """
+    store = get_subscriber_store()
+    chat_id = str(message.chat.id)
+    args = (command.args or "").strip()
 
+    if not args:
+        current = store.get_preferences(chat_id) or Subscription(chat_id)
         await message.answer(
-            "✅ Все вакансии загружены! Используйте /start для обновления списка.\n\n"
-            "🤖 Бот будет автоматически отправлять новые вакансии каждый день в "
-            "6:00!\n\n"
+            "⚙️ Ваши настройки:\n\n"
+            f"{current.describe()}\n\n"
+            "Изменить: /prefs keywords=python, django; exclude=senior; "
+            "salary=150000; schedule=remote; employment=part\n"
+            "Сбросить: /prefs reset"
         )
+        return
 
-    except Exception as e:
-        print(f"Ошибка в обработчике start: {e}")
+    if args.lower() == "reset":
+        store.set_preferences(Subscription(chat_id))
+        await message.answer("🔄 Настройки сброшены, вы получаете общую выдачу.")
+        return
+
+    try:
+        preferences = Subscription.parse(chat_id, args)
+    except ValueError as e:
+        await message.answer(f"❌ {e}")
+        return
+
+    store.set_preferences(preferences)
+    logger.info(f"⚙️ Чат {chat_id} обновил настройки")
+    text = f"✅ Настройки сохранены:\n\n{preferences.describe()}"
+    rejected = rejected_by_profile(preferences)
+    if rejected:
+        text += (
+            f"\n\n⚠️ Общий фильтр бота не пропускает: {', '.join(rejected)}. "
+            "Таких вакансий в выдаче не будет."
+        )
+    await message.answer(text)
+
+
+@router.message(Command("search"))
+async def cmd_search(message: Message, command: CommandObject) -> None:
+    """
+    /search python devops remote days=7 - поиск по сохранённым вакансиям,
+    hh.ru при этом не запрашивается
+    """
+    try:
+        query, days = parse_search(command.args)
+    except ValueError as e:
+        await message.answer(f"❌ {e}")
+        return
+    if not query:
         await message.answer(
-            "❌ Произошла ошибка при получении вакансий. Попробуйте позже."
+            "🔎 Укажите запрос: /search python devops remote, "
+            "за последнюю неделю - /search python days=7"
         )
+        return
+
+    vacancies = await get_provider().search(query, days)
+    if vacancies is None:
+        await message.answer("❌ Поиск сейчас недоступен. Попробуйте позже.")
+        return
+    if not vacancies:
+        await message.answer("📭 По запросу ничего не найдено.")
+        return
+
+    await get_broadcaster().send_many(
+        str(message.chat.id),
+        render_vacancy_messages(
+            vacancies,
+            # Заголовок экранирует DigestCache.render
+            SEARCH_HEADER.format(count=len(vacancies), query=query),
+        ),
+    )
 
 
-@dp.message()
+@router.message()
 async def echo_message(message: Message) -> None:
     await message.answer(
         "👋 Привет! Я бот для поиска вакансий Python разработчика.\n\n"
-        "Используйте команду /start для получения актуальных вакансий.\n\n"
+        "Используйте команду /start для получения актуальных вакансий, "
+        "/start sort=salary; min_salary=150000 - по зарплате, "
+        "/search python devops - поиск по найденным ранее.\n\n"
         "🤖 Бот будет автоматически отправлять новые вакансии каждый день в "
         "6:00!\n\n"
     )
 
 
-def setup_scheduler() -> None:
-    # Добавляем задачу на отправку вакансий каждый день в 6:00
-    job = scheduler.add_job(
-        send_daily_vacancies,
-        CronTrigger(hour=PLANNING_HOUR-3, minute=PLANNING_MINUTE),
-        id="daily_vacancies",
-        name="Отправка ежедневных вакансий",
-        replace_existing=True,
-    )
-
-    logger.info(f"⏰ Планировщик настроен: вакансии будут отправляться каждый день в 6:00")
-    logger.info(f"📅 Следующий запуск задачи: {job.next_run_time if hasattr(job, 'next_run_time') else 'Не определено'}")
-    
-    # Добавляем обработчик ошибок планировщика
-    def job_error_listener(event):
-        logger.error(f"❌ Ошибка в задаче планировщика: {event.exception}")
-        logger.error(f"   Задача: {event.job_id}")
-        logger.error(f"   Детали: {event.traceback}")
-
-    scheduler.add_listener(job_error_listener, events.EVENT_JOB_ERROR)
-    logger.info("🔧 Добавлен обработчик ошибок планировщика")
-
-
 async def main() -> None:
+    from app.cache import warm_caches
+    from app.scheduler import start_scheduler
+
+    setup_logging()
     logger.info("🤖 Запуск Telegram бота...")
-    logger.info(f"🔧 Конфигурация: API_HOST={config.API_HOST}, API_PORT={config.API_PORT}")
-    logger.info(f"👤 USER_ID для уведомлений: {config.NOTIFICATION_USER_ID}")
-
-    setup_scheduler()
-
-    # Запускаем планировщик
-    scheduler.start()
-    logger.info("✅ Планировщик запущен")
-    
-    # Выводим информацию о запланированных задачах
-    jobs = scheduler.get_jobs()
-    logger.info(f"📋 Активных задач в планировщике: {len(jobs)}")
-    for job in jobs:
-        next_run = job.next_run_time if hasattr(job, 'next_run_time') else 'Не определено'
-        logger.info(f"  - {job.name} (ID: {job.id}): {next_run}")
+    logger.info(
+        f"🔧 Конфигурация: API_HOST={config.API_HOST}, API_PORT={config.API_PORT}"
+    )
+    logger.info(f"📦 Источник вакансий: {config.VACANCY_PROVIDER}")
+    logger.info(f"👥 Подписчиков на уведомления: {len(get_subscriber_store())}")
 
+    if config.VACANCY_PROVIDER == "inprocess":
+        warm_caches()
+    scheduler = start_scheduler()
     try:
         # Запускаем бота
-        await dp.start_polling(bot)
+        await get_dispatcher().start_polling(get_bot())
     finally:
         # Останавливаем планировщик при завершении
         scheduler.shutdown()
+        await close()
         logger.info("🛑 Планировщик остановлен")
 
 
@@ -0,0 +1,419 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from app.config import config
+from app.metrics import CACHE_REQUESTS
+from app.models import (
+    Vacancy,
+    VacancyRecord,
+    dump_vacancies_json,
+    from_records,
+    to_records,
+    validate_vacancies_json,
+)
+from app.parser import crawl_ranked_vacancies, crawl_top_vacancies
+from app.shared import (
+    LeaderLease,
+    SharedBackend,
+    SharedEntry,
+    get_shared_backend,
+    instance_id,
+)
+from app.snapshot import Snapshot, load_snapshot, snapshot_path, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[Optional[List[Vacancy]]]]
+
+
+def compute_etag(vacancies: List[Vacancy]) -> str:
+    digest = hashlib.sha256()
+    for vacancy in vacancies:
+        digest.update(vacancy.model_dump_json().encode())
+        digest.update(b"\n")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+class VacancyCache:
+    """
+    TTL-кэш результата обхода hh.ru.
+
+    Одновременные промахи ждут одну и ту же загрузку (single-flight).
+    После истечения TTL сразу отдаётся устаревший результат, а обновление
+    запускается в фоне (stale-while-revalidate).
+
+    Загрузчик может сообщать о найденных вакансиях через ``publish``,
+    тогда ``stream`` отдаёт их клиентам ещё до окончания обхода, и
+    о неполном результате через ``mark_partial`` - такой результат
+    считается свежим только ``partial_ttl`` секунд.
+
+    С общим хранилищем (``shared`` или SHARED_BACKEND) результат делится
+    между воркерами: обход выполняет только получивший аренду, остальные
+    ждут его результат и отдают его из хранилища.
+
+    Со ``snapshot`` каждый загруженный результат сохраняется в файл, а
+    первое обращение после запуска отдаёт его сразу: устаревший снимок
+    обновляется в фоне, как любой устаревший результат.
+
+    Между запросами результат хранится компактными VacancyRecord, каждый
+    ``get`` получает свой список Vacancy.
+    """
+
+    def __init__(
+        self,
+        loader: Loader,
+        ttl: float,
+        partial_ttl: Optional[float] = None,
+        shared: Optional[SharedBackend] = None,
+        key: str = "vacancies",
+        lease_ttl: Optional[float] = None,
+        poll_interval: float = 0.5,
+        snapshot: Optional[str] = None,
+    ) -> None:
+        self._loader = loader
+        self.ttl = ttl
+        self.partial_ttl = ttl if partial_ttl is None else min(ttl, partial_ttl)
+        self._shared = shared
+        self.key = key
+        self.lease_ttl = config.CRAWL_LEASE_TTL if lease_ttl is None else lease_ttl
+        self.poll_interval = poll_interval
+        self.snapshot = snapshot
+        self._restoring: Optional["asyncio.Task[None]"] = None
+        self._saving: Optional["asyncio.Task[None]"] = None
+        self._owner = instance_id()
+        self._result_age = 0.0
+        self.complete = True
+        self._load_complete = True
+        self._records: Optional[List[VacancyRecord]] = None
+        self._loaded_at = 0.0
+        self._refresh: Optional["asyncio.Task[Optional[List[Vacancy]]]"] = None
+        self._partial: List[Vacancy] = []
+        self._progress: Optional[asyncio.Event] = None
+        self.etag: Optional[str] = None
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    @property
+    def age(self) -> Optional[float]:
+        if self._records is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    @property
+    def shared(self) -> Optional[SharedBackend]:
+        # Глобальное хранилище подключается при первой загрузке, не при импорте
+        return self._shared if self._shared is not None else get_shared_backend()
+
+    def _ttl_for(self, complete: bool) -> float:
+        return self.ttl if complete else self.partial_ttl
+
+    def is_fresh(self) -> bool:
+        age = self.age
+        return age is not None and age < self._ttl_for(self.complete)
+
+    async def get(
+        self, on_progress: Optional[Callable[[int], None]] = None
+    ) -> Optional[List[Vacancy]]:
+        """
+        Результат из кэша или загрузки; при промахе ``on_progress`` получает
+        число вакансий, найденных к текущему моменту
+        """
+        if self._records is None and self.snapshot is not None:
+            await self._restore(self.snapshot)
+        if self._records is not None:
+            records = self._records
+            if self.is_fresh():
+                self.hits += 1
+                CACHE_REQUESTS.labels(result="hit").inc()
+            else:
+                self.stale_hits += 1
+                CACHE_REQUESTS.labels(result="stale").inc()
+                self._start_refresh()
+            return from_records(records)
+
+        self.misses += 1
+        CACHE_REQUESTS.labels(result="miss").inc()
+        task = self._start_refresh()
+        if on_progress is not None:
+            while not task.done():
+                progress = self._progress_event()
+                on_progress(len(self._partial))
+                await progress.wait()
+        # shield: отмена одного ожидающего не должна отменять общую загрузку
+        return await asyncio.shield(task)
+
+    async def refresh(self) -> Optional[List[Vacancy]]:
+        """
+        Принудительно обновляет кэш, присоединяясь к текущей загрузке
+        """
+        return await asyncio.shield(self._start_refresh())
+
+    async def stream(self) -> AsyncIterator[Vacancy]:
+        """
+        Отдаёт вакансии по одной: из кэша, а при промахе - по мере обхода
+        """
+        if self._records is None and self.snapshot is not None:
+            await self._restore(self.snapshot)
+        if self._records is not None:
+            for vacancy in await self.get() or []:
+                yield vacancy
+            return
+
+        self.misses += 1
+        CACHE_REQUESTS.labels(result="miss").inc()
+        task = self._start_refresh()
+        # После загрузки кэш отпускает список, дочитываем свою ссылку
+        partial = self._partial
+        sent = 0
+        while True:
+            progress = self._progress_event()
+            while sent < len(partial):
+                yield partial[sent]
+                sent += 1
+            if task.done():
+                return
+            await progress.wait()
+
+    def publish(self, vacancy: Vacancy) -> None:
+        """
+        Сообщает ожидающим stream() о новой вакансии текущей загрузки
+        """
+        self._partial.append(vacancy)
+        self._notify()
+
+    def mark_partial(self) -> None:
+        """
+        Помечает результат текущей загрузки как неполный
+        """
+        self._load_complete = False
+
+    def _progress_event(self) -> asyncio.Event:
+        if self._progress is None:
+            self._progress = asyncio.Event()
+        return self._progress
+
+    def _notify(self) -> None:
+        if self._progress is not None:
+            self._progress.set()
+            self._progress = None
+
+    def invalidate(self) -> None:
+        self._records = None
+        self._loaded_at = 0.0
+        self.etag = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "loads": self.loads,
+        }
+
+    def warm(self) -> None:
+        """
+        Начинает читать снимок в фоне, чтобы первый запрос после запуска
+        не ждал чтения и проверки всего файла
+        """
+        if self._records is None and self.snapshot is not None:
+            self._start_restore(self.snapshot)
+
+    def _start_restore(self, path: str) -> "asyncio.Task[None]":
+        if self._restoring is None:
+            self._restoring = asyncio.create_task(self._read_snapshot(path))
+        return self._restoring
+
+    async def _restore(self, path: str) -> None:
+        """
+        Однократно читает снимок с диска; одновременные запросы ждут одно чтение
+        """
+        await asyncio.shield(self._start_restore(path))
+
+    async def _read_snapshot(self, path: str) -> None:
+        started = time.monotonic()
+        snapshot = await asyncio.to_thread(load_snapshot, path)
+        # Загрузка могла завершиться раньше чтения снимка
+        if snapshot is None or not snapshot.vacancies or self._records is not None:
+            return
+        self._records = to_records(snapshot.vacancies)
+        self.complete = snapshot.complete
+        self._loaded_at = time.monotonic() - max(snapshot.age, 0.0)
+        self.etag = snapshot.etag or compute_etag(snapshot.vacancies)
+        logger.info(
+            f"Восстановлено {len(snapshot.vacancies)} вакансий из снимка "
+            f"{path} за {time.monotonic() - started:.2f} с "
+            f"(возраст {snapshot.age:.0f} с)"
+        )
+
+    def _save_snapshot(self, vacancies: List[Vacancy]) -> None:
+        """
+        Пишет снимок в фоне, не задерживая ожидающих загрузку
+        """
+        if self.snapshot is None:
+            return
+        snapshot = Snapshot(
+            vacancies,
+            time.time() - self._result_age,
+            self.complete,
+            self.etag,
+        )
+        self._saving = asyncio.create_task(
+            self._write_snapshot(self.snapshot, snapshot, self._saving)
+        )
+
+    @staticmethod
+    async def _write_snapshot(
+        path: str, snapshot: Snapshot, previous: Optional["asyncio.Task[None]"]
+    ) -> None:
+        # Записи идут по очереди: старый снимок не перезапишет новый
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await asyncio.to_thread(
+                write_snapshot,
+                path,
+                snapshot.vacancies,
+                snapshot.complete,
+                snapshot.etag,
+                snapshot.saved_at,
+            )
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить снимок {path}: {e}")
+
+    def _start_refresh(self) -> "asyncio.Task[Optional[List[Vacancy]]]":
+        if self._refresh is None or self._refresh.done():
+            self._partial = []
+            self._refresh = asyncio.create_task(self._load())
+            self._refresh.add_done_callback(self._log_failure)
+            self._refresh.add_done_callback(lambda task: self._notify())
+        return self._refresh
+
+    async def _load(self) -> Optional[List[Vacancy]]:
+        self.loads += 1
+        self._load_complete = True
+        self._result_age = 0.0
+        shared = self.shared
+        try:
+            if shared is None:
+                result = await self._loader()
+            else:
+                result = await self._load_shared(shared)
+        finally:
+            # Список для stream() больше не нужен кэшу
+            self._partial = []
+        # Неудачная загрузка не затирает последний хороший результат
+        if result:
+            self.complete = self._load_complete
+            self._records = to_records(result)
+            self._loaded_at = time.monotonic() - self._result_age
+            self.etag = compute_etag(result)
+            self._save_snapshot(result)
+        return result
+
+    async def _load_shared(self, shared: SharedBackend) -> Optional[List[Vacancy]]:
+        entry = shared.get(self.key)
+        if entry is not None and entry.age < self._ttl_for(entry.complete):
+            return self._from_shared(entry)
+
+        lease = LeaderLease(shared, f"crawl:{self.key}", self.lease_ttl, self._owner)
+        deadline = time.monotonic() + self.lease_ttl
+        while True:
+            if lease.acquire():
+                try:
+                    result = await self._loader()
+                    if result:
+                        shared.set(
+                            self.key, dump_vacancies_json(result), self._load_complete
+                        )
+                    return result
+                finally:
+                    lease.release()
+
+            # Обход уже идёт в другом воркере: ждём его результат
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(self.poll_interval)
+            latest = shared.get(self.key)
+            if latest is not None and (
+                entry is None or latest.stored_at > entry.stored_at
+            ):
+                return self._from_shared(latest)
+
+        return self._from_shared(entry) if entry is not None else None
+
+    def _from_shared(self, entry: SharedEntry) -> List[Vacancy]:
+        vacancies = validate_vacancies_json(entry.value)
+        if not entry.complete:
+            self.mark_partial()
+        self._result_age = entry.age
+        # Ожидающие stream() получают результат чужого обхода целиком
+        self._partial.extend(vacancies)
+        self._notify()
+        return vacancies
+
+    @staticmethod
+    def _log_failure(task: "asyncio.Task[Optional[List[Vacancy]]]") -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Ошибка при обновлении кэша вакансий: {task.exception()}")
+
+
+async def load_vacancies() -> Optional[List[Vacancy]]:
+    result = await crawl_top_vacancies(on_vacancy=vacancy_cache.publish)
+    if not result.complete:
+        vacancy_cache.mark_partial()
+    return result.vacancies or None
+
+
+async def load_ranked_vacancies() -> Optional[List[Vacancy]]:
+    result = await crawl_ranked_vacancies()
+    if not result.complete:
+        salary_cache.mark_partial()
+    # Порядок известен только в конце обхода, stream() получает всё сразу
+    for vacancy in result.vacancies:
+        salary_cache.publish(vacancy)
+    return result.vacancies or None
+
+
+vacancy_cache = VacancyCache(
+    load_vacancies,
+    ttl=config.CACHE_TTL,
+    partial_ttl=config.CACHE_PARTIAL_TTL,
+    snapshot=snapshot_path("vacancies"),
+)
+
+# RANKED_VACANCIES вакансий с наибольшей зарплатой по всем страницам обхода
+salary_cache = VacancyCache(
+    load_ranked_vacancies,
+    ttl=config.CACHE_TTL,
+    partial_ttl=config.CACHE_PARTIAL_TTL,
+    key="vacancies:salary",
+    snapshot=snapshot_path("vacancies:salary"),
+)
+
+
+def warm_caches() -> None:
+    """
+    Фоновое чтение снимков кэшей выдачи при запуске процесса
+    """
+    vacancy_cache.warm()
+    salary_cache.warm()
+
+
+SORTS = ("salary",)
+
+
+def get_cache(sort: Optional[str] = None) -> VacancyCache:
+    """
+    Кэш выдачи в порядке hh.ru или, с ``sort="salary"``, по зарплате
+    """
+    if sort is None:
+        return vacancy_cache
+    if sort == "salary":
+        return salary_cache
+    raise ValueError(f"Unknown sort: {sort}")
@@ -13,6 +13,70 @@ class Config:
     API_PORT: int = int(os.getenv("PORT", "8000"))
     MAX_VACANCIES: int = int(os.getenv("MAX_VACANCIES", "20"))
     NOTIFICATION_USER_ID: Optional[str] = os.getenv("USER_ID", "")
+    VACANCY_PROVIDER: str = os.getenv("VACANCY_PROVIDER", "inprocess")
+    VACANCY_API_URL: str = os.getenv("VACANCY_API_URL", f"http://{API_HOST}:{API_PORT}")
+    VACANCY_API_TIMEOUT: float = float(os.getenv("VACANCY_API_TIMEOUT", "120"))
+    HH_API_URL: str = os.getenv("HH_API_URL", "https://api.hh.ru/vacancies")
+    CRAWL_CONCURRENCY: int = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+    # Запросы к hh.ru в виде "текст:регион" через запятую
+    CRAWL_QUERIES: str = os.getenv("CRAWL_QUERIES", "python:1")
+    # Сколько страниц выдачи можно запросить за один обход по всем запросам
+    CRAWL_BUDGET: int = int(os.getenv("CRAWL_BUDGET", "40"))
+    # Повторы, адаптивный лимит и размыкатель цепи для запросов к hh.ru
+    HH_RETRY_ATTEMPTS: int = int(os.getenv("HH_RETRY_ATTEMPTS", "3"))
+    HH_RETRY_BASE_DELAY: float = float(os.getenv("HH_RETRY_BASE_DELAY", "0.5"))
+    HH_LATENCY_TARGET: float = float(os.getenv("HH_LATENCY_TARGET", "2.0"))
+    HH_BREAKER_THRESHOLD: int = int(os.getenv("HH_BREAKER_THRESHOLD", "5"))
+    HH_BREAKER_RESET: float = float(os.getenv("HH_BREAKER_RESET", "30"))
+    # Догрузка /vacancies/{id} для прошедших фильтры выдачи (навыки, описание)
+    ENRICH_DETAILS: bool = os.getenv("ENRICH_DETAILS", "false").lower() == "true"
+    ENRICH_CONCURRENCY: int = int(os.getenv("ENRICH_CONCURRENCY", "4"))
+    DETAILS_DB_PATH: str = os.getenv("DETAILS_DB_PATH", "")
+    # Зарплаты сравниваются на руки в этой валюте по локальной таблице курсов
+    SALARY_CURRENCY: str = os.getenv("SALARY_CURRENCY", "RUR")
+    RATES_PATH: str = os.getenv("RATES_PATH", "data/rates.json")
+    # Курсы обновляются из справочника hh.ru не чаще раза в RATES_TTL секунд
+    RATES_TTL: float = float(os.getenv("RATES_TTL", "86400"))
+    # Сколько вакансий с наибольшей зарплатой хранится для sort=salary
+    RANKED_VACANCIES: int = int(os.getenv("RANKED_VACANCIES", "100"))
+    CACHE_TTL: int = int(os.getenv("CACHE_TTL", "600"))
+    # Неполный результат обхода хранится меньше, чтобы быстрее перезапросить
+    CACHE_PARTIAL_TTL: int = int(os.getenv("CACHE_PARTIAL_TTL", "60"))
+    # Последний результат обхода на диске: после перезапуска выдача отдаётся
+    # сразу, а обход идёт в фоне; пусто - снимки не пишутся
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "data/snapshots")
+    DB_PATH: str = os.getenv("DB_PATH", "data/vakanse.db")
+    # История вакансий с полнотекстовым поиском; пусто - DB_PATH
+    HISTORY_DB_PATH: str = os.getenv("HISTORY_DB_PATH", "")
+    # Общее состояние воркеров: "none" (только в процессе) или "sqlite"
+    SHARED_BACKEND: str = os.getenv("SHARED_BACKEND", "none")
+    SHARED_DB_PATH: str = os.getenv("SHARED_DB_PATH", "")
+    # Сколько обход hh.ru может удерживать блокировку, пока другие ждут
+    CRAWL_LEASE_TTL: float = float(os.getenv("CRAWL_LEASE_TTL", "300"))
+    # Запуск задачи по расписанию блокирует её повтор другими воркерами
+    JOB_LEASE_TTL: float = float(os.getenv("JOB_LEASE_TTL", "3600"))
+    TELEGRAM_GLOBAL_RATE: float = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+    TELEGRAM_CHAT_RATE: float = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+    TELEGRAM_CHAT_BURST: float = float(os.getenv("TELEGRAM_CHAT_BURST", "3"))
+    # Как часто /start обновляет сообщение о ходе поиска, секунд
+    PROGRESS_EDIT_INTERVAL: float = float(os.getenv("PROGRESS_EDIT_INTERVAL", "3"))
+    # Что запускает python -m app.main: api, bot, scheduler или all
+    APP_MODE: str = os.getenv("APP_MODE", "all")
+    # Получение обновлений Telegram: "polling" или "webhook"
+    BOT_MODE: str = os.getenv("BOT_MODE", "polling")
+    # Адрес Bot API; для офлайн-проверок - локальная замена
+    TELEGRAM_API_URL: str = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+    # Публичный адрес, по которому Telegram доступен наш FastAPI
+    WEBHOOK_BASE_URL: str = os.getenv("WEBHOOK_BASE_URL", "")
+    WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+    # Пусто - секрет выводится из токена, одинаковый на всех репликах
+    WEBHOOK_SECRET: str = os.getenv("WEBHOOK_SECRET", "")
+    WEBHOOK_MAX_CONCURRENCY: int = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "32"))
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FILE: str = os.getenv("LOG_FILE", "logs/bot.log")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")
+    FILTER_PROFILE: str = os.getenv("FILTER_PROFILE", "default")
+    FILTER_PROFILES_FILE: str = os.getenv("FILTER_PROFILES_FILE", "")
 
     @classmethod
     def validate(cls) -> None:
@@ -28,5 +92,11 @@ class Config:
                 "Get your token from @BotFather in Telegram"
             )
 
+        if cls.BOT_MODE not in ("polling", "webhook"):
+            raise ValueError("BOT_MODE must be either 'polling' or 'webhook'")
+
+        if cls.BOT_MODE == "webhook" and not cls.WEBHOOK_BASE_URL:
+            raise ValueError("WEBHOOK_BASE_URL is required when BOT_MODE=webhook")
+
 
 config = Config()
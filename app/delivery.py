@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.types import Message
+
+from app.config import config
+from app.metrics import API_ERRORS, TELEGRAM_SEND_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Текст сообщения и дополнительные аргументы send_message
+OutgoingMessage = Tuple[str, Dict[str, Any]]
+
+MAX_RETRIES = 3
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket: ``rate`` токенов в секунду, запас ``capacity``.
+
+    Ожидающие обслуживаются по очереди, поэтому лимит соблюдается и при
+    большом числе одновременных отправителей.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Блокирует выдачу токенов, например после RetryAfter от Telegram
+        """
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+@dataclass
+class DeliveryReport:
+    chats: int = 0
+    sent: int = 0
+    failed: int = 0
+    blocked: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+class Broadcaster:
+    """
+    Отправка сообщений с учётом лимитов Telegram.
+
+    Общий лимит на бота и отдельный лимит на каждый чат задаются token
+    bucket'ами. Сообщения одного чата уходят по порядку, разные чаты
+    обрабатываются параллельно пулом воркеров.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: Optional[float] = None,
+        chat_rate: Optional[float] = None,
+        chat_burst: Optional[float] = None,
+        workers: int = 100,
+        on_blocked: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        self.bot = bot
+        global_rate = global_rate or config.TELEGRAM_GLOBAL_RATE
+        self._global = TokenBucket(global_rate, capacity=global_rate)
+        self._chat_rate = chat_rate or config.TELEGRAM_CHAT_RATE
+        self._chat_burst = chat_burst or config.TELEGRAM_CHAT_BURST
+        self._chats: Dict[str, TokenBucket] = {}
+        self._workers = workers
+        self._on_blocked = on_blocked
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self._chat_rate, capacity=self._chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def send(self, chat_id: str, text: str, **kwargs: Any) -> Message:
+        """
+        Отправляет одно сообщение, соблюдая лимиты и RetryAfter
+        """
+        chat_id = str(chat_id)
+        return await self._call(
+            chat_id, lambda: self.bot.send_message(chat_id, text, **kwargs)
+        )
+
+    async def edit(
+        self, chat_id: str, message_id: int, text: str, **kwargs: Any
+    ) -> None:
+        """
+        Заменяет текст отправленного сообщения; правка расходует те же лимиты
+        """
+        chat_id = str(chat_id)
+        await self._call(
+            chat_id,
+            lambda: self.bot.edit_message_text(
+                text, chat_id=chat_id, message_id=message_id, **kwargs
+            ),
+        )
+
+    async def _call(self, chat_id: str, request: Callable[[], Awaitable[T]]) -> T:
+        bucket = self._chat_bucket(chat_id)
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            await self._global.acquire()
+            try:
+                with TELEGRAM_SEND_SECONDS.time():
+                    return await request()
+            except TelegramRetryAfter as e:
+                API_ERRORS.labels(source="telegram").inc()
+                logger.warning(
+                    f"⏳ Flood control для чата {chat_id}: ждём {e.retry_after} с"
+                )
+                bucket.pause(e.retry_after)
+                if attempt == MAX_RETRIES:
+                    raise
+                attempt += 1
+
+    async def send_many(self, chat_id: str, messages: Iterable[OutgoingMessage]) -> int:
+        sent = 0
+        for text, kwargs in messages:
+            await self.send(chat_id, text, **kwargs)
+            sent += 1
+        return sent
+
+    async def broadcast(
+        self, chat_ids: Iterable[str], messages: List[OutgoingMessage]
+    ) -> DeliveryReport:
+        """
+        Рассылает один и тот же набор сообщений всем чатам
+        """
+        started = time.monotonic()
+        report = DeliveryReport()
+        queue: "asyncio.Queue[str]" = asyncio.Queue()
+        for chat_id in chat_ids:
+            queue.put_nowait(str(chat_id))
+        report.chats = queue.qsize()
+
+        async def worker() -> None:
+            while True:
+                try:
+                    chat_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    report.sent += await self.send_many(chat_id, messages)
+                except TelegramForbiddenError:
+                    API_ERRORS.labels(source="telegram").inc()
+                    logger.info(f"🚫 Чат {chat_id} заблокировал бота")
+                    report.blocked.append(chat_id)
+                    if self._on_blocked is not None:
+                        self._on_blocked(chat_id)
+                except Exception as e:
+                    API_ERRORS.labels(source="telegram").inc()
+                    logger.error(f"❌ Ошибка доставки в чат {chat_id}: {e}")
+                    report.failed += 1
+
+        workers = min(self._workers, report.chats)
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        report.elapsed = time.monotonic() - started
+        return report
@@ -0,0 +1,195 @@
+import asyncio
+import html
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import aiohttp
+
+from app.config import config
+from app.metrics import DETAIL_REQUESTS
+from app.storage import connect
+from app.upstream import UpstreamClient, UpstreamError, get_client
+
+logger = logging.getLogger(__name__)
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+
+def strip_html(text: str) -> str:
+    return _SPACE.sub(" ", html.unescape(_TAG.sub(" ", text))).strip()
+
+
+def item_stamp(item: Dict[str, Any]) -> str:
+    """
+    Версия вакансии: при её изменении сохранённые подробности устаревают
+    """
+    return str(item.get("updated_at") or item.get("published_at") or "")
+
+
+@dataclass(frozen=True)
+class VacancyDetails:
+    """
+    Подробности вакансии из /vacancies/{id}: ключевые навыки и описание
+    без разметки
+    """
+
+    key_skills: Tuple[str, ...] = ()
+    description: str = ""
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "VacancyDetails":
+        skills = (skill.get("name") for skill in data.get("key_skills") or ())
+        return cls(
+            key_skills=tuple(name for name in skills if name),
+            description=strip_html(data.get("description") or ""),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"key_skills": list(self.key_skills), "description": self.description},
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, value: str) -> "VacancyDetails":
+        data = json.loads(value)
+        return cls(tuple(data.get("key_skills", ())), data.get("description", ""))
+
+
+class DetailStore:
+    """
+    Дисковый кэш подробностей по ID вакансии.
+
+    Запись действительна, пока версия вакансии (updated_at или
+    published_at из выдачи) совпадает с сохранённой.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._conn = connect(path or config.DETAILS_DB_PATH or config.DB_PATH)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS details ("
+                " id TEXT PRIMARY KEY,"
+                " stamp TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " fetched_at TEXT NOT NULL)"
+            )
+
+    def get_many(self, stamps: Dict[str, str]) -> Dict[str, VacancyDetails]:
+        """
+        Подробности для ID, версия которых совпадает с переданной
+        """
+        if not stamps:
+            return {}
+        placeholders = ",".join("?" * len(stamps))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, stamp, data FROM details WHERE id IN ({placeholders})",
+                tuple(stamps),
+            ).fetchall()
+        return {
+            vacancy_id: VacancyDetails.from_json(data)
+            for vacancy_id, stamp, data in rows
+            if stamps[vacancy_id] == stamp
+        }
+
+    def put(self, vacancy_id: str, stamp: str, details: VacancyDetails) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO details (id, stamp, data, fetched_at)"
+                " VALUES (?, ?, ?, ?)",
+                (
+                    vacancy_id,
+                    stamp,
+                    details.to_json(),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM details").fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class DetailEnricher:
+    """
+    Догружает подробности для вакансий, прошедших фильтры выдачи.
+
+    Уже сохранённые подробности берутся из DetailStore, так что запросы
+    к hh.ru идут только за новыми или изменившимися вакансиями, не больше
+    ``concurrency`` одновременно. Вакансия, подробности которой получить
+    не удалось, остаётся без них.
+    """
+
+    def __init__(
+        self,
+        store: Optional[DetailStore] = None,
+        concurrency: Optional[int] = None,
+        url: Optional[str] = None,
+    ) -> None:
+        self.store = store if store is not None else DetailStore()
+        self.concurrency = max(1, concurrency or config.ENRICH_CONCURRENCY)
+        self.url = (url or config.HH_API_URL).rstrip("/")
+
+    async def enrich(
+        self,
+        session: aiohttp.ClientSession,
+        items: Iterable[Dict[str, Any]],
+        client: Optional[UpstreamClient] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, VacancyDetails]:
+        stamps = {str(item["id"]): item_stamp(item) for item in items if item.get("id")}
+        details = self.store.get_many(stamps)
+        DETAIL_REQUESTS.labels(result="hit").inc(len(details))
+        missing = [vacancy_id for vacancy_id in stamps if vacancy_id not in details]
+        if not missing:
+            return details
+
+        client = client or get_client()
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(vacancy_id: str) -> None:
+            async with slots:
+                try:
+                    data = await client.get_json(
+                        session, f"{self.url}/{vacancy_id}", {}, headers
+                    )
+                except UpstreamError as e:
+                    DETAIL_REQUESTS.labels(result="failed").inc()
+                    logger.warning(
+                        "Не получены подробности вакансии %s: %s", vacancy_id, e
+                    )
+                    return
+            info = VacancyDetails.from_api(data)
+            self.store.put(vacancy_id, stamps[vacancy_id], info)
+            details[vacancy_id] = info
+            DETAIL_REQUESTS.labels(result="fetched").inc()
+
+        await asyncio.gather(*(fetch(vacancy_id) for vacancy_id in missing))
+        return details
+
+
+_enricher: Optional[DetailEnricher] = None
+
+
+def get_enricher() -> Optional[DetailEnricher]:
+    """
+    Общий DetailEnricher, если включён ENRICH_DETAILS, иначе None
+    """
+    global _enricher
+    if not config.ENRICH_DETAILS:
+        return None
+    if _enricher is None:
+        _enricher = DetailEnricher()
+    return _enricher
@@ -0,0 +1,192 @@
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from app.config import config
+
+# Битовые метки наборов правил
+EXCLUDE = 1
+REQUIRE = 2
+FLAG = 4
+
+
+@dataclass(frozen=True)
+class FilterProfile:
+    """
+    Именованный набор правил фильтрации вакансий.
+
+    exclude - слова, при наличии которых вакансия отбрасывается;
+    require - хотя бы одно из них должно быть в заголовке;
+    flag - признаки проектной работы, только помечают вакансию;
+    employment/schedule - допустимые типы занятости и графика, пустой
+    набор допускает любые;
+    skills - хотя бы один из ключевых навыков вакансии и description_exclude -
+    слова, запрещённые в описании; проверяются только при ENRICH_DETAILS.
+    """
+
+    name: str
+    exclude: Tuple[str, ...] = ()
+    require: Tuple[str, ...] = ()
+    flag: Tuple[str, ...] = ()
+    employment: Tuple[str, ...] = ()
+    schedule: Tuple[str, ...] = ()
+    skills: Tuple[str, ...] = ()
+    description_exclude: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "FilterProfile":
+        return cls(
+            name=name,
+            exclude=tuple(data.get("exclude", ())),
+            require=tuple(data.get("require", ())),
+            flag=tuple(data.get("flag", ())),
+            employment=tuple(data.get("employment", ())),
+            schedule=tuple(data.get("schedule", ())),
+            skills=tuple(data.get("skills", ())),
+            description_exclude=tuple(data.get("description_exclude", ())),
+        )
+
+
+DEFAULT_PROFILE = FilterProfile(
+    name="default",
+    exclude=("преподаватель", "js", "наставник", "ментор", "android"),
+    require=(
+        "программист",
+        "разработчик",
+        "DevOps",
+        "сетевой инженер",
+        "системный администратор",
+        "Специалист по информационной безопасности",
+    ),
+    flag=("проект", "временн", "контракт", "аутсорс", "фриланс"),
+    employment=("part", "project"),
+    schedule=("remote",),
+)
+
+
+class CompiledFilter:
+    """
+    Профиль, скомпилированный в одно регулярное выражение.
+
+    Все ключевые слова собраны в одну альтернативу, отсортированную от
+    длинных к коротким. Поиск возобновляется со следующего символа после
+    начала совпадения, поэтому за один проход по заголовку находится самое
+    длинное слово в каждой позиции, включая перекрывающиеся. Метки более
+    коротких слов, являющихся его префиксами, заранее добавлены к метке
+    длинного, так что результат совпадает с проверкой каждого слова
+    через ``in``.
+    """
+
+    def __init__(self, profile: FilterProfile) -> None:
+        self.profile = profile
+
+        labels: Dict[str, int] = {}
+        for words, label in (
+            (profile.exclude, EXCLUDE),
+            (profile.require, REQUIRE),
+            (profile.flag, FLAG),
+        ):
+            for word in words:
+                word = word.lower()
+                if word:
+                    labels[word] = labels.get(word, 0) | label
+
+        keywords = sorted(labels, key=len, reverse=True)
+        self._labels = {word: self._prefix_labels(word, labels) for word in keywords}
+        self._pattern: Optional["re.Pattern[str]"] = None
+        if keywords:
+            self._pattern = re.compile("|".join(map(re.escape, keywords)))
+        self._employment: FrozenSet[str] = frozenset(profile.employment)
+        self._schedule: FrozenSet[str] = frozenset(profile.schedule)
+        self._skills: FrozenSet[str] = frozenset(
+            skill.lower() for skill in profile.skills
+        )
+        banned = [word.lower() for word in profile.description_exclude if word]
+        self._description_exclude: Optional["re.Pattern[str]"] = (
+            re.compile("|".join(map(re.escape, banned))) if banned else None
+        )
+
+    @staticmethod
+    def _prefix_labels(word: str, labels: Dict[str, int]) -> int:
+        mask = 0
+        for other, label in labels.items():
+            if word.startswith(other):
+                mask |= label
+        return mask
+
+    def scan(self, title: str) -> int:
+        """
+        Возвращает битовую маску сработавших наборов правил для заголовка
+        """
+        if self._pattern is None:
+            return 0
+        mask = 0
+        labels = self._labels
+        search = self._pattern.search
+        text = title.lower()
+        match = search(text)
+        while match is not None:
+            mask |= labels[match.group()]
+            if mask & EXCLUDE:
+                return EXCLUDE
+            match = search(text, match.start() + 1)
+        return mask
+
+    def match_title(self, title: str, mask: Optional[int] = None) -> bool:
+        if mask is None:
+            mask = self.scan(title)
+        if mask & EXCLUDE:
+            return False
+        return not self.profile.require or bool(mask & REQUIRE)
+
+    def allows_employment(self, employment: str) -> bool:
+        if not employment or not self._employment:
+            return True
+        return employment in self._employment
+
+    def allows_schedule(self, schedule: str) -> bool:
+        if not schedule or not self._schedule:
+            return True
+        return schedule in self._schedule
+
+    @property
+    def needs_details(self) -> bool:
+        return bool(self._skills) or self._description_exclude is not None
+
+    def match_details(self, key_skills: Iterable[str], description: str = "") -> bool:
+        """
+        Правила, которым нужны подробности вакансии: навыки и описание
+        """
+        if self._skills and self._skills.isdisjoint(s.lower() for s in key_skills):
+            return False
+        exclude = self._description_exclude
+        return exclude is None or exclude.search(description.lower()) is None
+
+
+def load_profiles(path: Optional[str] = None) -> Dict[str, FilterProfile]:
+    """
+    Загружает именованные профили из JSON-файла вида
+    {"имя": {"exclude": [...], "require": [...], ...}}
+    """
+    profiles = {DEFAULT_PROFILE.name: DEFAULT_PROFILE}
+    path = path or config.FILTER_PROFILES_FILE
+    if not path:
+        return profiles
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    for name, rules in data.items():
+        profiles[name] = FilterProfile.from_dict(name, rules)
+    return profiles
+
+
+@lru_cache(maxsize=None)
+def get_filter(name: Optional[str] = None) -> CompiledFilter:
+    name = name or config.FILTER_PROFILE
+    profiles = load_profiles()
+    if name not in profiles:
+        raise ValueError(f"Unknown filter profile: {name}")
+    return CompiledFilter(profiles[name])
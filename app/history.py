@@ -0,0 +1,161 @@
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+from app.config import config
+from app.metrics import SEARCH_SECONDS
+from app.models import Vacancy, validate_vacancies_json
+from app.storage import connect
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# Гласные окончания русских слов отбрасываются, а поиск идёт по префиксу:
+# «разработчика» и «разработчики» находят «разработчик»
+_ENDING = re.compile(r"(?<=[а-яё]{4})[аеёиоуыэюяйь]{1,2}$")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS history ("
+    " id TEXT PRIMARY KEY,"
+    " published_at TEXT NOT NULL,"
+    " title TEXT NOT NULL,"
+    " tags TEXT NOT NULL,"
+    " data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS history_published ON history (published_at)",
+    # Индекс хранит только токены, сами строки берутся из history
+    "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+    " title, tags, content='history', content_rowid='rowid',"
+    " tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN"
+    " INSERT INTO history_fts (rowid, title, tags)"
+    " VALUES (new.rowid, new.title, new.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN"
+    " INSERT INTO history_fts (history_fts, rowid, title, tags)"
+    " VALUES ('delete', old.rowid, old.title, old.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS history_au AFTER UPDATE ON history BEGIN"
+    " INSERT INTO history_fts (history_fts, rowid, title, tags)"
+    " VALUES ('delete', old.rowid, old.title, old.tags);"
+    " INSERT INTO history_fts (rowid, title, tags)"
+    " VALUES (new.rowid, new.title, new.tags); END",
+)
+
+
+def match_query(text: str) -> Optional[str]:
+    """
+    Запрос FTS5 из свободного текста: все слова обязательны, каждое
+    ищется как префикс
+    """
+    words = (_ENDING.sub("", word) for word in _WORD.findall(text.lower()))
+    return " ".join(f'"{word}"*' for word in words) or None
+
+
+def _tags(vacancy: Vacancy) -> str:
+    values = [*(vacancy.key_skills or ()), vacancy.schedule, vacancy.employment]
+    return " ".join(value for value in values if value)
+
+
+def _utc(moment: datetime) -> str:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+class HistoryStore:
+    """
+    История всех вакансий, прошедших фильтры, с полнотекстовым индексом.
+
+    Индекс FTS5 обновляется триггерами вместе с таблицей, поэтому запись
+    результата обхода сразу доступна для поиска. Вакансия, встреченная
+    повторно без изменений, не перезаписывается.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._conn = connect(path or config.HISTORY_DB_PATH or config.DB_PATH)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+
+    def add(self, vacancies: Iterable[Vacancy], now: Optional[datetime] = None) -> int:
+        """
+        Добавляет или обновляет вакансии; возвращает число изменённых строк
+        """
+        stored_at = _utc(now or datetime.now(timezone.utc))
+        rows = [
+            (
+                vacancy.id,
+                _utc(vacancy.published_at) if vacancy.published_at else stored_at,
+                vacancy.title,
+                _tags(vacancy),
+                vacancy.model_dump_json(),
+            )
+            for vacancy in vacancies
+            if vacancy.id is not None
+        ]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "INSERT INTO history (id, published_at, title, tags, data)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET"
+                " published_at = excluded.published_at, title = excluded.title,"
+                " tags = excluded.tags, data = excluded.data"
+                " WHERE history.data != excluded.data",
+                rows,
+            )
+        return cursor.rowcount
+
+    def search(
+        self, text: str, since: Optional[datetime] = None, limit: int = 20
+    ) -> List[Vacancy]:
+        """
+        Вакансии, в заголовке, навыках, графике или занятости которых есть
+        все слова запроса, от новых к старым
+        """
+        query = match_query(text)
+        if query is None:
+            return []
+        with SEARCH_SECONDS.time(), self._lock:
+            rows = self._conn.execute(
+                "SELECT history.data FROM history_fts"
+                " JOIN history ON history.rowid = history_fts.rowid"
+                " WHERE history_fts MATCH ? AND history.published_at >= ?"
+                " ORDER BY history.published_at DESC LIMIT ?",
+                (query, _utc(since) if since else "", limit),
+            ).fetchall()
+        # Строки уже в JSON модели: одна валидация на всю выдачу
+        return validate_vacancies_json(f"[{','.join(row[0] for row in rows)}]")
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM history").fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_store: Optional[HistoryStore] = None
+
+
+def get_history_store() -> HistoryStore:
+    global _store
+    if _store is None:
+        _store = HistoryStore()
+    return _store
+
+
+def record_history(vacancies: List[Vacancy]) -> None:
+    """
+    Сохраняет результат обхода в историю; ошибка записи не прерывает обход
+    """
+    if not vacancies:
+        return
+    try:
+        get_history_store().add(vacancies)
+    except sqlite3.Error as e:
+        logger.warning("Не удалось сохранить вакансии в историю: %s", e)
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Dict, Hashable, Optional, Tuple
+
+from app.metrics import CHAT_JOBS
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Coroutine[Any, Any, None]]
+# Сообщение отмены задания, вытесненного новым заданием того же чата
+REPLACED = "replaced"
+
+
+class ChatJobs:
+    """
+    Фоновые задания бота, не больше одного активного на чат.
+
+    Обработчик команды только ставит задание и сразу возвращается; повторная
+    команда с теми же параметрами, пока задание не завершилось,
+    присоединяется к нему, а не запускает вторую такую же работу. Команда
+    с другими параметрами отменяет текущее задание чата и занимает его место.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[str, Tuple[Hashable, "asyncio.Task[None]"]] = {}
+
+    def get(self, chat_id: str) -> Optional["asyncio.Task[None]"]:
+        entry = self._tasks.get(chat_id)
+        if entry is None or entry[1].done():
+            return None
+        return entry[1]
+
+    def start(
+        self, chat_id: str, job: Job, params: Hashable = None
+    ) -> Tuple["asyncio.Task[None]", bool]:
+        """
+        Запускает задание чата; если оно с теми же параметрами уже идёт,
+        возвращает текущее, а с другими - отменяет его. Второе значение -
+        было ли задание запущено этим вызовом.
+        """
+        entry = self._tasks.get(chat_id)
+        if entry is not None and not entry[1].done():
+            running_params, running = entry
+            if running_params == params:
+                return running, False
+            logger.info(
+                f"🔁 Чат {chat_id}: задание заменено новым с другими параметрами"
+            )
+            running.cancel(REPLACED)
+        task = asyncio.create_task(job())
+        self._tasks[chat_id] = (params, task)
+        CHAT_JOBS.set(len(self._tasks))
+        task.add_done_callback(lambda done: self._finished(chat_id, done))
+        return task, True
+
+    def _finished(self, chat_id: str, task: "asyncio.Task[None]") -> None:
+        entry = self._tasks.get(chat_id)
+        if entry is not None and entry[1] is task:
+            del self._tasks[chat_id]
+        CHAT_JOBS.set(len(self._tasks))
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"❌ Ошибка в фоновом задании чата {chat_id}: {task.exception()}"
+            )
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self) -> None:
+        """
+        Дожидается завершения уже запущенных заданий
+        """
+        while self._tasks:
+            tasks = [task for _, task in self._tasks.values()]
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def cancel(self) -> None:
+        tasks = [task for _, task in self._tasks.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
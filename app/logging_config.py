@@ -0,0 +1,111 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator, Optional
+
+from app.config import config
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(crawl_id)s] %(message)s"
+
+# Идентификатор текущего обхода, попадает во все записи лога внутри него
+crawl_id_var: ContextVar[str] = ContextVar("crawl_id", default="-")
+
+_listener: Optional[QueueListener] = None
+
+
+class CorrelationFilter(logging.Filter):
+    """
+    Добавляет к записи crawl_id из контекста вызывающей задачи
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.crawl_id = crawl_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "crawl_id": getattr(record, "crawl_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+@contextmanager
+def crawl_context(crawl_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Задаёт crawl_id для всех записей лога внутри блока
+    """
+    crawl_id = crawl_id or uuid.uuid4().hex[:8]
+    token = crawl_id_var.set(crawl_id)
+    try:
+        yield crawl_id
+    finally:
+        crawl_id_var.reset(token)
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    log_file: Optional[str] = None,
+    fmt: Optional[str] = None,
+) -> None:
+    """
+    Настраивает неблокирующий вывод логов.
+
+    Корневой логгер пишет только в очередь; форматирование и запись в файл
+    и stdout выполняет фоновый поток QueueListener, поэтому вызовы логгера
+    в event loop не ждут диска. Повторный вызов ничего не делает.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or config.LOG_LEVEL).upper()
+    log_file = config.LOG_FILE if log_file is None else log_file
+    fmt = fmt or config.LOG_FORMAT
+
+    formatter: logging.Formatter = (
+        JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        directory = os.path.dirname(log_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(CorrelationFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Дописывает оставшиеся записи и останавливает фоновый поток
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,60 +1,302 @@
 import asyncio
+import base64
+import binascii
+import sys
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional, Tuple
 
-import uvicorn
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
-from app.bot import bot, dp, scheduler, setup_scheduler
+from app.cache import VacancyCache, get_cache, warm_caches
 from app.config import config
-from app.models import Vacancy
-from app.parser import get_top_vacancies
+from app.logging_config import setup_logging
+from app.metrics import REGISTRY, VACANCIES_REQUEST_SECONDS
+from app.models import Vacancy, dump_vacancies_json
+from app.parser import close_session
+from app.providers import search_history
+from app.salary import at_least, pays_at_least
 
-app = FastAPI()
+if TYPE_CHECKING:
+    from app.webhook import WebhookHandler
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
-@app.get("/health", summary="CHECK")
+# Режимы запуска: только API, только бот, только планировщик или всё вместе
+MODES = ("api", "bot", "scheduler", "all")
+
+router = APIRouter()
+
+
+def create_app(webhook: bool = False) -> FastAPI:
+    """
+    Собирает FastAPI-приложение.
+
+    aiogram импортируется только с ``webhook=True``: тогда обновления
+    Telegram приходят на маршрут этого же приложения.
+    """
+    handler: Optional["WebhookHandler"] = None
+    if webhook:
+        from app.bot import get_bot, get_dispatcher
+        from app.webhook import WebhookHandler
+
+        handler = WebhookHandler(get_dispatcher(), get_bot())
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        warm_caches()
+        yield
+        if handler is not None:
+            await handler.drain()
+        await close_session()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(router)
+    app.state.webhook = handler
+    if handler is not None:
+        handler.mount(app)
+    return app
+
+
+_app: Optional[FastAPI] = None
+
+
+def __getattr__(name: str) -> Any:
+    # ``uvicorn app.main:app``: приложение создаётся при первом обращении
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app(webhook=config.BOT_MODE == "webhook")
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@router.get("/health", summary="CHECK")
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.get("/vacancies", response_model=list[Vacancy])
-def vacancies() -> list[Vacancy]:
-    result = get_top_vacancies()
-    return result or []
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def encode_cursor(offset: int, etag: Optional[str]) -> str:
+    """
+    Курсор следующей страницы: смещение и ETag результата, к которому оно
+    относится
+    """
+    raw = f"{offset}:{etag or ''}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        offset, sep, etag = raw.partition(":")
+        if not sep:
+            raise ValueError(raw)
+        value = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if value < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, etag
+
+
+def check_cursor(etag: str, current: Optional[str]) -> None:
+    """
+    Курсор от другого набора результатов (кэш обновился или истёк) даст
+    пропуски и повторы: клиент должен начать выдачу заново
+    """
+    if etag != (current or ""):
+        raise HTTPException(
+            status_code=410, detail="Cursor is stale, start from the first page"
+        )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def json_response(
+    vacancies: list[Vacancy], headers: Optional[dict[str, str]] = None
+) -> Response:
+    """
+    Сериализует список одним вызовом pydantic-core, минуя jsonable_encoder
+    FastAPI; response_model у маршрутов остаётся для схемы OpenAPI
+    """
+    return Response(
+        dump_vacancies_json(vacancies), media_type="application/json", headers=headers
+    )
 
 
-async def run_bot() -> None:
+async def stream_ndjson(
+    cache: VacancyCache,
+    offset: int,
+    limit: Optional[int],
+    min_salary: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Отдаёт вакансии построчно в NDJSON по мере того, как они проходят фильтры
+    """
+    index = 0
+    sent = 0
+    async for vacancy in cache.stream():
+        if min_salary is not None and not pays_at_least(vacancy, min_salary):
+            continue
+        if index >= offset:
+            yield vacancy.model_dump_json().encode() + b"\n"
+            sent += 1
+            if limit is not None and sent >= limit:
+                return
+        index += 1
+
+
+@router.get("/vacancies", response_model=list[Vacancy])
+async def vacancies(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    format: Optional[str] = None,
+    sort: Optional[str] = Query(None, pattern="^salary$"),
+    min_salary: Optional[int] = Query(None, ge=0),
+) -> Any:
+    with VACANCIES_REQUEST_SECONDS.time():
+        return await _vacancies(request, limit, cursor, format, sort, min_salary)
+
+
+async def _vacancies(
+    request: Request,
+    limit: Optional[int],
+    cursor: Optional[str],
+    format: Optional[str],
+    sort: Optional[str] = None,
+    min_salary: Optional[int] = None,
+) -> Any:
+    offset, cursor_etag = decode_cursor(cursor) if cursor else (0, None)
+    if_none_match = request.headers.get("if-none-match")
+    cache = get_cache(sort)
+
+    if format == "ndjson" or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        headers = {}
+        if cursor_etag is not None:
+            check_cursor(cursor_etag, cache.etag)
+        # ETag известен только если результат уже есть в кэше
+        if cache.etag is not None and cache.age is not None:
+            if etag_matches(if_none_match, cache.etag):
+                return Response(status_code=304, headers={"ETag": cache.etag})
+            headers["ETag"] = cache.etag
+        return StreamingResponse(
+            stream_ndjson(cache, offset, limit, min_salary),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
+        )
+
+    result = await cache.get() or []
+    if min_salary is not None:
+        result = at_least(result, min_salary)
+
+    # Часть страниц hh.ru не получена или отдан последний полный результат
+    headers = {"X-Crawl-Complete": "true" if cache.complete else "false"}
+
+    # ETag зависит только от кэша: фильтр min_salary входит в URL запроса
+    etag = cache.etag
+    if cursor_etag is not None:
+        check_cursor(cursor_etag, etag)
+    if etag is not None:
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        headers["ETag"] = etag
+
+    end = len(result) if limit is None else offset + limit
+    if end < len(result):
+        headers["X-Next-Cursor"] = encode_cursor(end, etag)
+    return json_response(result[offset:end], headers)
+
+
+@router.get("/search", response_model=list[Vacancy])
+def search(
+    q: str = Query(..., min_length=1),
+    days: Optional[int] = Query(None, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+) -> Response:
+    """
+    Полнотекстовый поиск по истории найденных вакансий, без обхода hh.ru
+    """
+    return json_response(search_history(q, days, limit))
+
+
+async def run_bot(webhook: Optional["WebhookHandler"] = None) -> None:
+    from app.bot import get_bot, get_dispatcher
+
+    if webhook is not None:
+        print("🔗 Регистрация вебхука Telegram...")
+        await webhook.register()
+        return
     print("🤖 Запуск Telegram бота...")
-    await dp.start_polling(bot)
+    await get_dispatcher().start_polling(get_bot())
+
 
+async def run_api(app: FastAPI) -> None:
+    import uvicorn
 
-async def run_api() -> None:
     uvicorn_config = uvicorn.Config(app, host=config.API_HOST, port=config.API_PORT)
     server = uvicorn.Server(uvicorn_config)
     await server.serve()
 
 
 async def run_scheduler() -> None:
-    print("📅 Запуск планировщика задач...")
-
-    setup_scheduler()
-    scheduler.start()
-    print("✅ Планировщик запущен")
+    from app.scheduler import start_scheduler
 
+    print("📅 Запуск планировщика задач...")
+    scheduler = start_scheduler()
     try:
-        while True:
-            await asyncio.sleep(1)
-    except KeyboardInterrupt:
+        await asyncio.Event().wait()
+    finally:
         scheduler.shutdown()
 
 
-async def main() -> None:
-    print("🚀 Запуск приложения...")
-    print(f"📡 API будет доступен на http://{config.API_HOST}:{config.API_PORT}")
-    print("🤖 Telegram бот запускается...")
-    print("📅 Планировщик задач запускается...")
+async def main(mode: Optional[str] = None) -> None:
+    mode = mode or config.APP_MODE
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {', '.join(MODES)}")
+
+    setup_logging()
+    print(f"🚀 Запуск приложения в режиме {mode}...")
+
+    with_bot = mode in ("bot", "all")
+    # Вебхук принимается самим API, поэтому бот в этом режиме поднимает и его
+    webhook = with_bot and config.BOT_MODE == "webhook"
+    app = create_app(webhook=webhook) if mode in ("api", "all") or webhook else None
+
+    runners = []
+    if app is not None:
+        print(f"📡 API будет доступен на http://{config.API_HOST}:{config.API_PORT}")
+        runners.append(run_api(app))
+    if with_bot:
+        print("🤖 Telegram бот запускается...")
+        runners.append(run_bot(app.state.webhook if app is not None else None))
+    if mode in ("scheduler", "all"):
+        print("📅 Планировщик задач запускается...")
+        runners.append(run_scheduler())
+
+    try:
+        await asyncio.gather(*runners)
+    finally:
+        if mode != "api":
+            from app.bot import close
 
-    await asyncio.gather(run_api(), run_bot(), run_scheduler())
+            await close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))
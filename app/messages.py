@@ -0,0 +1,127 @@
+import hashlib
+import html
+import re
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.models import Vacancy
+
+# Telegram ограничивает длину текста после разбора разметки, в UTF-16
+TELEGRAM_MESSAGE_LIMIT = 4096
+# и число сущностей (жирный текст, ссылки) в одном сообщении
+TELEGRAM_ENTITY_LIMIT = 100
+
+BLOCK_SEPARATOR = "\n\n"
+
+_TAG_RE = re.compile(r"<[^>]*>")
+_OPENING_TAG_RE = re.compile(r"<[a-zA-Z]")
+
+
+def format_vacancy_message(vacancy: Vacancy) -> str:
+    """
+    Форматирует вакансию для отображения в Telegram
+    """
+    return (
+        f"🏢 <b>{html.escape(vacancy.title, quote=False)}</b>\n"
+        f"💰 <b>Зарплата:</b> {html.escape(vacancy.salary, quote=False)}\n"
+        f"🔗 <a href='{html.escape(str(vacancy.url))}'>Открыть вакансию</a>\n"
+        f"{'─' * 34}"
+    )
+
+
+def visible_length(html_text: str) -> int:
+    """
+    Длина текста так, как её считает Telegram: без тегов, с раскрытыми
+    HTML-сущностями, в кодовых единицах UTF-16
+    """
+    text = html.unescape(_TAG_RE.sub("", html_text))
+    return len(text.encode("utf-16-le")) // 2
+
+
+def pack_messages(
+    blocks: Iterable[str],
+    limit: int = TELEGRAM_MESSAGE_LIMIT,
+    entity_limit: int = TELEGRAM_ENTITY_LIMIT,
+    separator: str = BLOCK_SEPARATOR,
+) -> List[str]:
+    """
+    Жадно собирает блоки в как можно меньшее число сообщений, не превышая
+    лимиты Telegram на длину и число сущностей. Блоки не разрываются.
+    """
+    separator_length = visible_length(separator)
+    messages: List[str] = []
+    current: List[str] = []
+    length = 0
+    entities = 0
+
+    for block in blocks:
+        block_length = visible_length(block)
+        block_entities = len(_OPENING_TAG_RE.findall(block))
+        added = block_length + (separator_length if current else 0)
+        if current and (
+            length + added > limit or entities + block_entities > entity_limit
+        ):
+            messages.append(separator.join(current))
+            current, length, entities = [], 0, 0
+            added = block_length
+        current.append(block)
+        length += added
+        entities += block_entities
+
+    if current:
+        messages.append(separator.join(current))
+    return messages
+
+
+def result_key(vacancies: Sequence[Vacancy]) -> str:
+    digest = hashlib.sha256()
+    for vacancy in vacancies:
+        digest.update(f"{vacancy.id}|{vacancy.url}|{vacancy.title}|".encode())
+        digest.update(f"{vacancy.salary}\n".encode())
+    return digest.hexdigest()
+
+
+class DigestCache:
+    """
+    LRU-кэш готовых к отправке сообщений для набора вакансий.
+
+    Ключ включает содержимое набора, поэтому при изменении данных
+    сообщения собираются заново, а повторные /start и рассылки
+    используют уже собранные.
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Tuple[str, str, str], List[str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(
+        self,
+        vacancies: Sequence[Vacancy],
+        header: str = "",
+        footer: str = "",
+        key: Optional[str] = None,
+    ) -> List[str]:
+        cache_key = (key or result_key(vacancies), header, footer)
+        chunks = self._items.get(cache_key)
+        if chunks is not None:
+            self.hits += 1
+            self._items.move_to_end(cache_key)
+            return chunks
+
+        self.misses += 1
+        blocks = [format_vacancy_message(vacancy) for vacancy in vacancies]
+        if header:
+            blocks.insert(0, html.escape(header, quote=False))
+        if footer:
+            blocks.append(html.escape(footer, quote=False))
+        chunks = pack_messages(blocks)
+
+        self._items[cache_key] = chunks
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return chunks
+
+
+digest_cache = DigestCache()
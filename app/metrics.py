@@ -0,0 +1,278 @@
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Registry:
+    """
+    Набор метрик, отдаваемых в текстовом формате Prometheus
+    """
+
+    def __init__(self) -> None:
+        self._metrics: List["Metric"] = []
+
+    def register(self, metric: "Metric") -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[Registry] = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def _child(self, values: LabelValues) -> object:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def labels(self, **labels: str) -> _Value:
+        return self._child(self._key(labels))  # type: ignore[return-value]
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def value(self, **labels: str) -> float:
+        return self.labels(**labels).value
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} "
+            f"{_format_value(child.value)}"  # type: ignore[attr-defined]
+            for values, child in self._children.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        self.counts[bisect_left(self.bounds, value)] += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional[Registry] = REGISTRY,
+    ) -> None:
+        bounds = tuple(sorted(buckets))
+        if not bounds or bounds[-1] != math.inf:
+            bounds += (math.inf,)
+        self.buckets = bounds
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def labels(self, **labels: str) -> _HistogramValue:
+        return self._child(self._key(labels))  # type: ignore[return-value]
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> ContextManager[None]:
+        return self.labels().time()
+
+    def samples(self) -> List[str]:
+        lines: List[str] = []
+        names = self.labelnames + ("le",)
+        for values, child in self._children.items():
+            assert isinstance(child, _HistogramValue)
+            cumulative = 0
+            for bound, count in zip(child.bounds, child.counts):
+                cumulative += count
+                labels = _format_labels(names, values + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+# Метрики приложения
+HH_PAGE_SECONDS = Histogram(
+    "vakanse_hh_page_seconds", "Latency of a single hh.ru result page request"
+)
+CRAWL_SECONDS = Histogram(
+    "vakanse_crawl_seconds",
+    "Total duration of a hh.ru crawl",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+VACANCIES_REQUEST_SECONDS = Histogram(
+    "vakanse_vacancies_request_seconds", "Latency of the /vacancies handler"
+)
+SEARCH_SECONDS = Histogram(
+    "vakanse_search_seconds",
+    "Latency of a full-text search over the vacancy history",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+TELEGRAM_SEND_SECONDS = Histogram(
+    "vakanse_telegram_send_seconds",
+    "Latency of Telegram send_message and edit_message_text calls",
+)
+CRAWL_PAGES = Counter(
+    "vakanse_crawl_pages_total", "hh.ru result pages requested, by query", ["query"]
+)
+ITEMS_SCANNED = Counter(
+    "vakanse_items_scanned_total", "hh.ru items passed through the filters"
+)
+ITEMS_REJECTED = Counter(
+    "vakanse_items_rejected_total", "hh.ru items rejected, by filter rule", ["rule"]
+)
+DETAIL_REQUESTS = Counter(
+    "vakanse_detail_requests_total",
+    "Vacancy detail lookups, by result (hit, fetched, failed)",
+    ["result"],
+)
+CACHE_REQUESTS = Counter(
+    "vakanse_cache_requests_total", "Vacancy cache lookups, by result", ["result"]
+)
+API_ERRORS = Counter(
+    "vakanse_api_errors_total", "Errors talking to external APIs", ["source"]
+)
+API_RETRIES = Counter(
+    "vakanse_api_retries_total", "Retried requests to external APIs", ["source"]
+)
+HH_CONCURRENCY_LIMIT = Gauge(
+    "vakanse_hh_concurrency_limit", "Current adaptive limit of parallel hh.ru requests"
+)
+CIRCUIT_OPEN = Gauge(
+    "vakanse_circuit_open", "1 while the circuit breaker is open", ["source"]
+)
+WEBHOOK_UPDATES = Counter(
+    "vakanse_webhook_updates_total", "Telegram webhook updates, by result", ["result"]
+)
+WEBHOOK_IN_FLIGHT = Gauge(
+    "vakanse_webhook_in_flight", "Telegram updates being processed right now"
+)
+CHAT_JOBS = Gauge(
+    "vakanse_chat_jobs", "Background /start jobs running right now, one per chat"
+)
+SCHEDULER_LAG_SECONDS = Gauge(
+    "vakanse_scheduler_lag_seconds",
+    "Delay between scheduled and actual start of a job",
+    ["job"],
+)
@@ -1,7 +1,136 @@
-from pydantic import BaseModel, HttpUrl
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Union
+
+from pydantic import BaseModel, HttpUrl, TypeAdapter
 
 
 class Vacancy(BaseModel):
     title: str
     url: HttpUrl
     salary: str
+    id: Optional[str] = None
+    published_at: Optional[datetime] = None
+    # Атрибуты для персональных фильтров подписчиков
+    salary_from: Optional[int] = None
+    salary_to: Optional[int] = None
+    currency: Optional[str] = None
+    # Верхняя граница зарплаты на руки в SALARY_CURRENCY
+    salary_net: Optional[int] = None
+    schedule: Optional[str] = None
+    employment: Optional[str] = None
+    # Из подробностей вакансии, если включена догрузка
+    key_skills: Optional[List[str]] = None
+
+
+FIELDS = tuple(Vacancy.model_fields)
+
+# trusted_vacancy заполняет состояние модели так же, как model_construct
+# в pydantic 2.x; при другой раскладке BaseModel остаётся model_construct
+_TRUSTED = BaseModel.__slots__ == (
+    "__dict__",
+    "__pydantic_fields_set__",
+    "__pydantic_extra__",
+    "__pydantic_private__",
+)
+
+
+def trusted_vacancy(
+    values: Dict[str, Any],
+    _new: Any = object.__new__,
+    _set: Any = object.__setattr__,
+    _fields: FrozenSet[str] = frozenset(FIELDS),
+) -> Vacancy:
+    """
+    Создаёт Vacancy из уже проверенных данных без валидации.
+
+    ``values`` должен содержать все поля уже в итоговых типах (url -
+    HttpUrl). В pydantic 2.11 ``model_construct`` медленнее обычной
+    валидации из-за обработки значений по умолчанию, поэтому состояние
+    модели заполняется напрямую.
+    """
+    if not _TRUSTED:
+        return Vacancy.model_construct(**values)
+    vacancy: Vacancy = _new(Vacancy)
+    _set(vacancy, "__dict__", values)
+    _set(vacancy, "__pydantic_fields_set__", set(_fields))
+    _set(vacancy, "__pydantic_extra__", None)
+    _set(vacancy, "__pydantic_private__", None)
+    return vacancy
+
+
+# Адаптер строится один раз: валидация и сериализация списка целиком
+# выполняются одним вызовом в pydantic-core
+VACANCY_LIST: TypeAdapter[List[Vacancy]] = TypeAdapter(List[Vacancy])
+
+
+def validate_vacancies(items: Iterable[Dict[str, Any]]) -> List[Vacancy]:
+    return VACANCY_LIST.validate_python(list(items))
+
+
+def validate_vacancies_json(data: Union[str, bytes]) -> List[Vacancy]:
+    """
+    Разбирает JSON-массив вакансий сразу в модели, минуя промежуточные dict
+    """
+    return VACANCY_LIST.validate_json(data)
+
+
+def dump_vacancies_json(vacancies: List[Vacancy]) -> bytes:
+    return VACANCY_LIST.dump_json(vacancies)
+
+
+class VacancyRecord:
+    """
+    Компактное представление вакансии для коллекций, долго живущих в памяти.
+
+    Занимает в несколько раз меньше памяти, чем Vacancy, и переводится
+    в неё без повторной валидации.
+    """
+
+    __slots__ = FIELDS
+
+    title: str
+    url: HttpUrl
+    salary: str
+    id: Optional[str]
+    published_at: Optional[datetime]
+    salary_from: Optional[int]
+    salary_to: Optional[int]
+    currency: Optional[str]
+    salary_net: Optional[int]
+    schedule: Optional[str]
+    employment: Optional[str]
+    key_skills: Optional[List[str]]
+
+    def __init__(self, **values: Any) -> None:
+        for name in FIELDS:
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def from_vacancy(cls, vacancy: Vacancy) -> "VacancyRecord":
+        record = cls.__new__(cls)
+        for name, value in vacancy.__dict__.items():
+            setattr(record, name, value)
+        return record
+
+    def to_vacancy(self) -> Vacancy:
+        return trusted_vacancy(dict(zip(FIELDS, _values(self))))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VacancyRecord):
+            return NotImplemented
+        return _values(self) == _values(other)
+
+    def __repr__(self) -> str:
+        return f"VacancyRecord(id={self.id!r}, title={self.title!r})"
+
+
+_values = attrgetter(*FIELDS)
+
+
+def to_records(vacancies: Iterable[Vacancy]) -> List[VacancyRecord]:
+    return [VacancyRecord.from_vacancy(vacancy) for vacancy in vacancies]
+
+
+def from_records(records: Iterable[VacancyRecord]) -> List[Vacancy]:
+    return [record.to_vacancy() for record in records]
@@ -1,148 +1,735 @@
-import json
-from typing import List, Optional, Union
+import asyncio
+import logging
+from collections import deque
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+import aiohttp
+from pydantic import ValidationError
+
+from app.config import config
+from app.details import DetailEnricher, get_enricher
+from app.filters import EXCLUDE, FLAG, CompiledFilter, get_filter
+from app.history import record_history
+from app.logging_config import crawl_context
+from app.metrics import (
+    API_ERRORS,
+    CRAWL_PAGES,
+    CRAWL_SECONDS,
+    HH_PAGE_SECONDS,
+    ITEMS_REJECTED,
+    ITEMS_SCANNED,
+)
+from app.models import (
+    Vacancy,
+    VacancyRecord,
+    from_records,
+    to_records,
+    validate_vacancies,
+)
+from app.queries import (
+    PER_PAGE,
+    CrawlDelta,
+    CrawlResult,
+    CrawlState,
+    QuerySpec,
+    parse_queries,
+)
+from app.salary import TopK, normalize_salary, refresh_rates
+from app.storage import SeenStore, get_seen_store
+from app.upstream import CircuitOpenError, UpstreamClient, UpstreamError, get_client
+
+logger = logging.getLogger(__name__)
+
+# hh.ru отдаёт не больше 2000 результатов на запрос: 20 страниц по 100
+MAX_PAGES = 2000 // PER_PAGE
+REQUEST_TIMEOUT = 15
+# Запас по времени при инкрементальном обходе: hh.ru индексирует вакансии
+# с задержкой, повторы отсекаются по ID в SeenStore
+CRAWL_OVERLAP = timedelta(hours=1)
+# Сколько найденных вакансий накапливается перед записью в историю
+HISTORY_BATCH = 500
+
+headers = {
+    "Accept": "application/json",
+}
+
+_session: Optional[aiohttp.ClientSession] = None
+
+# Последний полный результат; отдаётся, пока hh.ru недоступен. Вакансии
+# лежат отдельно компактными записями
+_last_good: Optional[CrawlResult] = None
+_last_good_records: List[VacancyRecord] = []
+
+# Счётчики отказов заранее привязаны к меткам, чтобы не искать их в цикле
+_rejected = {
+    rule: ITEMS_REJECTED.labels(rule=rule)
+    for rule in (
+        "exclude",
+        "require",
+        "employment",
+        "schedule",
+        "no_url",
+        "details",
+        "error",
+    )
+}
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Возвращает общую пуловую сессию для запросов к hh.ru
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=config.CRAWL_CONCURRENCY),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            headers=headers,
+        )
+    return _session
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def format_salary(salary_info: Optional[dict[str, Any]]) -> str:
+    if not salary_info:
+        return "Зарплата не указана"
+
+    salary_from = salary_info.get("from")
+    salary_to = salary_info.get("to")
+    salary_currency = salary_info.get("currency", "RUB")
+
+    if salary_from and salary_to:
+        return f"{salary_from}-{salary_to} {salary_currency}"
+    if salary_from:
+        return f"от {salary_from} {salary_currency}"
+    if salary_to:
+        return f"до {salary_to} {salary_currency}"
+    return "Зарплата не указана"
+
+
+def parse_published_at(item: dict[str, Any]) -> Optional[datetime]:
+    value = item.get("published_at")
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return None
 
-import requests
 
-from app.models import Vacancy
+def accept_item(
+    item: dict[str, Any], rules: Optional[CompiledFilter] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Применяет фильтры к элементу выдачи hh.ru и возвращает поля Vacancy
+    """
+    rules = rules or get_filter()
+    ITEMS_SCANNED.inc()
+    try:
+        title = item.get("name", "")
 
+        mask = rules.scan(title)
+        if not rules.match_title(title, mask):
+            _rejected["exclude" if mask & EXCLUDE else "require"].inc()
+            return None
 
-def get_top_vacancies() -> Optional[List[Vacancy]]:
+        if mask & FLAG:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Найдена проектная вакансия в заголовке: %s", title)
 
-    search_text = "python"
-    excluded_words = ["преподаватель", "js", "наставник", "ментор", "android"]
-    specializations = [
-        "программист",
-        "разработчик",
-        "DevOps",
-        "сетевой инженер",
-        "системный администратор",
-        "Специалист по информационной безопасности",
-    ]
-    allowed_employment_types = ["part", "project"]
-    allowed_schedule_types = ["remote"]
+        experience = item.get("experience", {}).get("id", "")
+        employment = item.get("employment", {}).get("id", "")
+        schedule = item.get("schedule", {}).get("id", "")
 
-    vacancies: List[Vacancy] = []
+        if not rules.allows_employment(employment):
+            _rejected["employment"].inc()
+            return None
 
-    api_url = "https://api.hh.ru/vacancies"
+        if not rules.allows_schedule(schedule):
+            _rejected["schedule"].inc()
+            return None
 
-    params: dict[str, Union[str, int]] = {
-        "text": search_text,
-        "area": "1",  # Россия
-        "per_page": "100",
-        "page": 0,
-        "order_by": "publication_time",  # Сортировка по дате публикации
-    }
+        url = item.get("alternate_url", "")
+        if not url:
+            logger.warning("Не найден URL для вакансии: %s", title)
+            _rejected["no_url"].inc()
+            return None
 
-    headers = {
-        "Accept": "application/json",
-    }
+        salary_info = item.get("salary") or {}
+        salary = format_salary(salary_info)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Обрабатываем вакансию: %s; зарплата: %s; опыт: %s, "
+                "занятость: %s, график: %s",
+                title,
+                salary,
+                experience,
+                employment,
+                schedule,
+            )
+
+        return {
+            "title": title,
+            "url": url,
+            "salary": salary,
+            "id": item.get("id"),
+            "published_at": parse_published_at(item),
+            "salary_from": salary_info.get("from"),
+            "salary_to": salary_info.get("to"),
+            "currency": salary_info.get("currency"),
+            "salary_net": normalize_salary(salary_info),
+            "schedule": schedule or None,
+            "employment": employment or None,
+        }
 
-    try:
-        page = 0
-        max_pages = 20
+    except Exception as e:
+        logger.warning("Ошибка при обработке вакансии: %s", e)
+        _rejected["error"].inc()
+        return None
 
-        while page < max_pages and len(vacancies) < 20:
-            params["page"] = page
-            print(f"Обрабатываем страницу {page + 1}...")
 
-            response = requests.get(api_url, params=params, headers=headers, timeout=15)
-            response.raise_for_status()
+def build_vacancies(accepted: List[dict[str, Any]]) -> List[Vacancy]:
+    """
+    Валидирует принятые элементы страницы одним вызовом TypeAdapter.
 
-            data = response.json()
+    Если в пачке есть некорректный элемент, она проверяется поэлементно
+    и отбрасывается только он.
+    """
+    if not accepted:
+        return []
+    try:
+        return validate_vacancies(accepted)
+    except ValidationError:
+        pass
 
-            if "items" not in data or not data["items"]:
-                print(f"Не найдены вакансии на странице {page + 1}")
-                break
+    vacancies: List[Vacancy] = []
+    for fields in accepted:
+        try:
+            vacancies.append(Vacancy(**fields))
+        except ValidationError as e:
+            logger.warning("Ошибка при обработке вакансии: %s", e)
+            _rejected["error"].inc()
+    return vacancies
 
-            for item in data["items"]:
-                try:
-                    title = item.get("name", "")
-
-                    title_lower = title.lower()
-                    if any(word.lower() in title_lower for word in excluded_words):
-                        continue
-
-                    if not any(spec.lower() in title_lower for spec in specializations):
-                        continue
-
-                    project_keywords = [
-                        "проект",
-                        "временн",
-                        "контракт",
-                        "аутсорс",
-                        "фриланс",
-                    ]
-                    if any(keyword in title_lower for keyword in project_keywords):
-                        print(f"Найдена проектная вакансия в заголовке: {title}")
-
-                    experience = item.get("experience", {}).get("id", "")
-                    employment = item.get("employment", {}).get("id", "")
-                    schedule = item.get("schedule", {}).get("id", "")
-
-                    if employment and employment not in allowed_employment_types:
-                        continue
-
-                    if schedule and schedule not in allowed_schedule_types:
-                        continue
-
-                    url = item.get("alternate_url", "")
-                    if not url:
-                        print(f"Не найден URL для вакансии: {title}")
-                        continue
-
-                    # Получаем зарплату
-                    salary_info = item.get("salary", {})
-                    if salary_info:
-                        salary_from = salary_info.get("from")
-                        salary_to = salary_info.get("to")
-                        salary_currency = salary_info.get("currency", "RUB")
-
-                        if salary_from and salary_to:
-                            salary = f"{salary_from}-{salary_to} {salary_currency}"
-                        elif salary_from:
-                            salary = f"от {salary_from} {salary_currency}"
-                        elif salary_to:
-                            salary = f"до {salary_to} {salary_currency}"
-                        else:
-                            salary = "Зарплата не указана"
-                    else:
-                        salary = "Зарплата не указана"
-
-                    print(f"Обрабатываем вакансию: {title}")
-                    print(f"Зарплата: {salary}")
-                    print(
-                        f"Опыт: {experience}, Занятость: {employment}, "
-                        f"График: {schedule}"
-                    )
 
-                    vacancy = Vacancy(title=title, url=url, salary=salary)
+async def apply_details(
+    enricher: DetailEnricher,
+    session: aiohttp.ClientSession,
+    items: List[dict[str, Any]],
+    accepted: List[dict[str, Any]],
+    rules: CompiledFilter,
+    client: Optional[UpstreamClient] = None,
+) -> List[dict[str, Any]]:
+    """
+    Дополняет поля вакансий подробностями и отсеивает не прошедшие правила
+    навыков и описания; вакансии без подробностей остаются как есть
+    """
+    details = await enricher.enrich(session, items, client, headers)
+    kept: List[dict[str, Any]] = []
+    for fields in accepted:
+        info = details.get(str(fields["id"])) if fields["id"] else None
+        if info is not None:
+            if not rules.match_details(info.key_skills, info.description):
+                _rejected["details"].inc()
+                continue
+            fields["key_skills"] = list(info.key_skills)
+        kept.append(fields)
+    return kept
+
+
+def parse_item(
+    item: dict[str, Any], rules: Optional[CompiledFilter] = None
+) -> Optional[Vacancy]:
+    """
+    Применяет фильтры к элементу выдачи hh.ru и строит Vacancy
+    """
+    fields = accept_item(item, rules)
+    if fields is None:
+        return None
+    vacancies = build_vacancies([fields])
+    return vacancies[0] if vacancies else None
+
+
+async def fetch_page(
+    session: aiohttp.ClientSession,
+    page: int,
+    query: Optional[QuerySpec] = None,
+    client: Optional[UpstreamClient] = None,
+) -> dict[str, Any]:
+    """
+    Запрашивает страницу выдачи; повторы и лимиты - на стороне UpstreamClient
+    """
+    query = query or parse_queries()[0]
+    client = client or get_client()
+    logger.debug("Запрашиваем страницу %d запроса %s", page + 1, query.name)
+    try:
+        with HH_PAGE_SECONDS.time():
+            return await client.get_json(
+                session, config.HH_API_URL, query.params(page), headers
+            )
+    except UpstreamError:
+        API_ERRORS.labels(source="hh").inc()
+        raise
+
+
+async def iter_top_vacancies(
+    session: Optional[aiohttp.ClientSession] = None,
+    limit: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    rules: Optional[CompiledFilter] = None,
+    since: Optional[datetime] = None,
+    query: Optional[QuerySpec] = None,
+    state: Optional[CrawlState] = None,
+    enricher: Optional[DetailEnricher] = None,
+    max_pages: Optional[int] = None,
+) -> AsyncIterator[Vacancy]:
+    """
+    Обходит страницы одного запроса hh.ru и отдаёт вакансии в порядке выдачи.
+
+    Страницы запрашиваются окном до ``concurrency`` штук, но разбираются
+    строго по порядку, поэтому результат совпадает с последовательным
+    обходом. Обход прекращается, как только набрана квота, пришла
+    пустая страница или (если задан ``since``) встретилась вакансия,
+    опубликованная раньше ``since``; оставшиеся запросы отменяются.
+    ``max_pages`` ограничивает глубину обхода (не больше MAX_PAGES).
+
+    Общий ``state`` ограничивает страницы и параллельные запросы сразу
+    для нескольких обходов и отсекает вакансии, уже найденные другими.
+    Страница, не полученная после повторов, пропускается и учитывается
+    в ``state``; при разомкнутой цепи обход запроса прекращается.
+
+    С ``enricher`` (или ENRICH_DETAILS) для прошедших фильтры выдачи
+    догружаются подробности, и к ним применяются правила навыков и описания.
+    """
+    session = session or get_session()
+    rules = rules or get_filter()
+    limit = limit or config.MAX_VACANCIES
+    concurrency = max(1, concurrency or config.CRAWL_CONCURRENCY)
+    query = query or parse_queries()[0]
+    state = state or CrawlState(budget=MAX_PAGES, concurrency=concurrency)
+    enricher = enricher or get_enricher()
+
+    depth = min(max_pages or MAX_PAGES, MAX_PAGES)
+    next_page = 0
+    found = 0
+    pending: Deque["asyncio.Task[dict[str, Any]]"] = deque()
+
+    async def fetch(page: int) -> dict[str, Any]:
+        async with state.slot:
+            return await fetch_page(session, page, query, state.client)
+
+    def schedule() -> None:
+        nonlocal next_page
+        while len(pending) < concurrency and next_page < depth:
+            if not state.take_page(query):
+                return
+            pending.append(asyncio.create_task(fetch(next_page)))
+            next_page += 1
 
-                    vacancies.append(vacancy)
-                    print(f"Добавлена вакансия: {title}")
+    try:
+        schedule()
+        page = 0
+        while pending:
+            try:
+                data = await pending.popleft()
+            except UpstreamError as e:
+                state.fail(query)
+                logger.warning(
+                    "Страница %d запроса %s не получена: %s", page + 1, query.name, e
+                )
+                if isinstance(e, CircuitOpenError):
+                    break
+                page += 1
+                schedule()
+                continue
+
+            items = data.get("items")
+            if not items:
+                logger.info(
+                    "Не найдены вакансии на странице %d запроса %s",
+                    page + 1,
+                    query.name,
+                )
+                break
 
-                    if len(vacancies) >= 20:
+            # Не запрашиваем страницы дальше последней существующей
+            total_pages = data.get("pages")
+            if isinstance(total_pages, int) and total_pages < depth:
+                depth = total_pages
+
+            # Фильтры - поэлементно, построение моделей - одной пачкой
+            accepted: List[dict[str, Any]] = []
+            candidates: List[dict[str, Any]] = []
+            reached_since = False
+            for item in items:
+                # Выдача отсортирована по дате публикации, дальше только старое
+                if since is not None:
+                    published_at = parse_published_at(item)
+                    if published_at is not None and published_at < since:
+                        reached_since = True
                         break
 
-                except Exception as e:
-                    print(f"Ошибка при обработке вакансии: {e}")
+                # Повторы из других запросов отбрасываются до разбора
+                if not state.claim(item.get("id")):
                     continue
 
-            page += 1
+                fields = accept_item(item, rules)
+                if fields is not None:
+                    accepted.append(fields)
+                    candidates.append(item)
+                    # С догрузкой часть кандидатов ещё может отсеяться
+                    if enricher is None and found + len(accepted) >= limit:
+                        break
 
-        print(f"Всего найдено подходящих вакансий: {len(vacancies)}")
+            if enricher is not None and accepted:
+                accepted = await apply_details(
+                    enricher, session, candidates, accepted, rules, state.client
+                )
 
-        if not vacancies:
-            print("Не найдено вакансий")
-            return None
+            for vacancy in build_vacancies(accepted):
+                yield vacancy
+                found += 1
+                if found >= limit:
+                    return
+            if reached_since:
+                return
 
-    except requests.RequestException as e:
-        print(f"Ошибка при запросе к API hh.ru: {e}")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"Ошибка при парсинге JSON: {e}")
-        return None
-    except Exception as e:
-        print(f"Неожиданная ошибка: {e}")
+            page += 1
+            schedule()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def crawl_queries(
+    queries: Optional[List[QuerySpec]] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    limit: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    since: Optional[datetime] = None,
+    budget: Optional[int] = None,
+    on_vacancy: Optional[Callable[[Vacancy], None]] = None,
+    state: Optional[CrawlState] = None,
+    keep: bool = True,
+    max_pages: Optional[int] = None,
+) -> List[Vacancy]:
+    """
+    Обходит несколько запросов одновременно под общим бюджетом страниц.
+
+    Каждый запрос набирает до ``limit`` вакансий; не больше
+    ``concurrency`` страниц запрашиваются одновременно по всем запросам.
+    Вакансии из нескольких запросов попадают в результат один раз.
+    Результат упорядочен по запросам, внутри запроса - по выдаче hh.ru.
+    С ``keep=False`` вакансии только передаются в ``on_vacancy``, а
+    результат пуст. Отчёт о страницах и повторах остаётся в ``state``.
+    Все найденные вакансии пачками сохраняются в историю для поиска.
+    """
+    queries = queries or parse_queries()
+    concurrency = max(1, concurrency or config.CRAWL_CONCURRENCY)
+    state = state or CrawlState(budget, concurrency)
+    results: Dict[str, List[Vacancy]] = {query.name: [] for query in queries}
+
+    # Курсы валют для нормализации зарплат, если локальная копия устарела
+    await refresh_rates(session or get_session(), state.client, headers)
+
+    history: List[VacancyRecord] = []
+
+    async def run(query: QuerySpec) -> None:
+        found = results[query.name]
+        count = 0
+        async for vacancy in iter_top_vacancies(
+            session,
+            limit,
+            concurrency,
+            since=since,
+            query=query,
+            state=state,
+            max_pages=max_pages,
+        ):
+            count += 1
+            if keep:
+                found.append(vacancy)
+            if on_vacancy is not None:
+                on_vacancy(vacancy)
+            history.append(VacancyRecord.from_vacancy(vacancy))
+            if len(history) >= HISTORY_BATCH:
+                record_history(from_records(history))
+                history.clear()
+        state.found[query.name] = count
+
+    tasks = [asyncio.create_task(run(query)) for query in queries]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Найденное до ошибки тоже попадает в историю
+        record_history(from_records(history))
+
+    for query in queries:
+        CRAWL_PAGES.labels(query=query.name).inc(state.pages.get(query.name, 0))
+    logger.info("Обход hh.ru: %s", state.summary())
+    return [vacancy for found in results.values() for vacancy in found]
+
+
+def _fallback(result: Optional[CrawlResult] = None) -> CrawlResult:
+    if _last_good is None:
+        return result or CrawlResult([], complete=False)
+    logger.warning("Отдаём последний полный результат обхода hh.ru")
+    return replace(
+        _last_good,
+        vacancies=from_records(_last_good_records),
+        complete=False,
+        stale=True,
+    )
+
+
+async def crawl_top_vacancies(
+    session: Optional[aiohttp.ClientSession] = None,
+    limit: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    on_vacancy: Optional[Callable[[Vacancy], None]] = None,
+    queries: Optional[List[QuerySpec]] = None,
+    client: Optional[UpstreamClient] = None,
+) -> CrawlResult:
+    """
+    Обход hh.ru, возвращающий всё, что удалось собрать.
+
+    Ошибки отдельных страниц не обнуляют результат: он помечается как
+    неполный. Пока цепь разомкнута или если из-за ошибок не найдено
+    ничего, отдаётся последний полный результат с пометкой stale.
+    """
+    global _last_good, _last_good_records
+    client = client or get_client()
+    concurrency = max(1, concurrency or config.CRAWL_CONCURRENCY)
+
+    with crawl_context():
+        if client.breaker.is_open:
+            return _fallback()
+
+        state = CrawlState(concurrency=concurrency, client=client)
+        try:
+            with CRAWL_SECONDS.time():
+                vacancies = await crawl_queries(
+                    queries,
+                    session,
+                    limit,
+                    concurrency,
+                    on_vacancy=on_vacancy,
+                    state=state,
+                )
+        except Exception as e:
+            logger.exception("Неожиданная ошибка при обходе hh.ru: %s", e)
+            return _fallback()
+
+        logger.info("Всего найдено подходящих вакансий: %d", len(vacancies))
+        result = CrawlResult(
+            vacancies,
+            complete=state.complete,
+            pages=dict(state.pages),
+            failed_pages=state.failed_pages,
+        )
+        if not result.complete:
+            if not vacancies:
+                return _fallback(result)
+            logger.warning(
+                "Результат неполный: не получено страниц %d", state.failed_pages
+            )
+        elif vacancies:
+            _last_good = replace(result, vacancies=[])
+            _last_good_records = to_records(vacancies)
+        return result
+
+
+def salary_key(vacancy: Vacancy) -> int:
+    return vacancy.salary_net or 0
+
+
+async def crawl_ranked_vacancies(
+    k: Optional[int] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    concurrency: Optional[int] = None,
+    queries: Optional[List[QuerySpec]] = None,
+    client: Optional[UpstreamClient] = None,
+) -> CrawlResult:
+    """
+    Обходит все страницы бюджета и оставляет ``k`` вакансий с наибольшей
+    зарплатой на руки.
+
+    Обход не останавливается на первых MAX_VACANCIES совпадениях: вакансии
+    с известной зарплатой по мере разбора страниц проходят через TopK, так
+    что в памяти их одновременно не больше ``k``.
+    """
+    k = k or config.RANKED_VACANCIES
+    client = client or get_client()
+    concurrency = max(1, concurrency or config.CRAWL_CONCURRENCY)
+    ranking: TopK[Vacancy] = TopK(k, salary_key)
+
+    def rank(vacancy: Vacancy) -> None:
+        if vacancy.salary_net is not None:
+            ranking.push(vacancy)
+
+    with crawl_context():
+        if client.breaker.is_open:
+            return CrawlResult([], complete=False)
+
+        state = CrawlState(concurrency=concurrency, client=client)
+        try:
+            with CRAWL_SECONDS.time():
+                await crawl_queries(
+                    queries,
+                    session,
+                    MAX_PAGES * PER_PAGE,
+                    concurrency,
+                    on_vacancy=rank,
+                    state=state,
+                    keep=False,
+                )
+        except Exception as e:
+            logger.exception("Неожиданная ошибка при обходе hh.ru: %s", e)
+            return CrawlResult([], complete=False)
+
+        logger.info(
+            "Найдено вакансий: %d, лучших по зарплате: %d",
+            sum(state.found.values()),
+            len(ranking),
+        )
+        return CrawlResult(
+            ranking.result(),
+            complete=state.complete,
+            pages=dict(state.pages),
+            failed_pages=state.failed_pages,
+        )
+
+
+async def fetch_top_vacancies(
+    session: Optional[aiohttp.ClientSession] = None,
+    limit: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    on_vacancy: Optional[Callable[[Vacancy], None]] = None,
+    queries: Optional[List[QuerySpec]] = None,
+) -> Optional[List[Vacancy]]:
+    """
+    Список вакансий (возможно неполный) или None, если нет ни одной
+    """
+    result = await crawl_top_vacancies(session, limit, concurrency, on_vacancy, queries)
+    if not result.vacancies:
+        logger.info("Не найдено вакансий")
         return None
+    return result.vacancies
+
+
+async def fetch_new_vacancies(
+    store: Optional[SeenStore] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    queries: Optional[List[QuerySpec]] = None,
+) -> Optional[CrawlDelta]:
+    """
+    Инкрементальный обход: только вакансии, которых ещё нет в SeenStore.
+
+    Каждый запрос обходится до вакансий старше своего последнего обхода;
+    квоты MAX_VACANCIES здесь нет, иначе новое сверх неё терялось бы.
+    Запрос, который ещё ни разу не обходился, читает одну страницу: она
+    засевает SeenStore, а более старая выдача новой не считается.
+    Время обхода запроса сдвигается, даже если бюджет страниц кончился
+    раньше границы: иначе каждый следующий обход упирался бы в тот же
+    бюджет. Не сдвигается оно только у запросов с не полученными
+    страницами - пропущенное попадёт в следующий обход.
+
+    SeenStore не меняется: новые вакансии и время обхода записываются
+    commit_new_vacancies после доставки. Возвращает None, если hh.ru
+    недоступен.
+    """
+    with crawl_context():
+        store = store or get_seen_store()
+        queries = queries or parse_queries()
+        started_at = datetime.now(timezone.utc)
+
+        # Запросы с общей границей обходятся вместе; без границы - засев
+        previous = store.last_crawl()
+        cursors = {q.name: store.last_crawl(q.name) or previous for q in queries}
+        groups: Dict[Optional[datetime], List[QuerySpec]] = {}
+        for query in queries:
+            groups.setdefault(cursors[query.name], []).append(query)
+
+        state = CrawlState(concurrency=config.CRAWL_CONCURRENCY)
+        found: List[Vacancy] = []
+        try:
+            with CRAWL_SECONDS.time():
+                for cursor, group in groups.items():
+                    found += await crawl_queries(
+                        group,
+                        session=session,
+                        limit=MAX_PAGES * PER_PAGE,
+                        since=cursor - CRAWL_OVERLAP if cursor else None,
+                        state=state,
+                        max_pages=None if cursor else 1,
+                    )
+        except (aiohttp.ClientError, asyncio.TimeoutError, UpstreamError) as e:
+            logger.error("Ошибка при инкрементальном обходе hh.ru: %s", e)
+            return None
 
-    return vacancies
+        if not state.complete and not found:
+            logger.error("hh.ru недоступен, инкрементальный обход не выполнен")
+            return None
+
+        delta = CrawlDelta(store.unseen(found), started_at)
+        for query in queries:
+            cursor = cursors[query.name]
+            if query.name not in state.failed:
+                delta.cursors[query.name] = started_at
+            elif cursor is not None:
+                # Общее время сдвинется, а граница этого запроса - нет
+                delta.cursors[query.name] = cursor
+
+        if state.failed:
+            logger.warning(
+                "Обход неполный (%s), время обхода не обновится для: %s",
+                state.summary(),
+                ", ".join(sorted(state.failed)),
+            )
+        elif state.exhausted:
+            logger.warning(
+                "Бюджет страниц исчерпан (%s), часть вакансий с прошлого обхода"
+                " могла быть пропущена",
+                state.summary(),
+            )
+        logger.info("Новых вакансий: %d из %d", len(delta.vacancies), len(found))
+        return delta
+
+
+def commit_new_vacancies(delta: CrawlDelta, store: Optional[SeenStore] = None) -> None:
+    """
+    Записывает вакансии обхода как увиденные и сдвигает время обхода
+    """
+    store = store or get_seen_store()
+    store.add_new(delta.vacancies, now=delta.started_at)
+    for name, moment in delta.cursors.items():
+        store.set_last_crawl(moment, name)
+    store.set_last_crawl(delta.started_at)
+
+
+def get_top_vacancies() -> Optional[List[Vacancy]]:
+    """
+    Синхронная обёртка над fetch_top_vacancies для вызова вне event loop
+    """
+
+    async def run() -> Optional[List[Vacancy]]:
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT), headers=headers
+        ) as session:
+            return await fetch_top_vacancies(session)
+
+    return asyncio.run(run())
@@ -0,0 +1,170 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Protocol, Union
+
+import aiohttp
+
+from app.cache import VacancyCache, get_cache
+from app.config import config
+from app.history import get_history_store
+from app.metrics import API_ERRORS
+from app.models import Vacancy, validate_vacancies_json
+from app.salary import at_least
+
+logger = logging.getLogger(__name__)
+
+
+class VacancyProvider(Protocol):
+    """
+    Источник вакансий для бота.
+
+    None означает ошибку получения, пустой список - что вакансий нет.
+    sort="salary" - вакансии с наибольшей зарплатой по всему обходу,
+    min_salary - нижняя граница зарплаты на руки. Пока идёт обход,
+    ``on_progress`` получает число уже найденных вакансий, если источник
+    это умеет.
+    """
+
+    async def get_vacancies(
+        self,
+        sort: Optional[str] = None,
+        min_salary: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> Optional[List[Vacancy]]: ...
+
+    async def search(
+        self, query: str, days: Optional[int] = None, limit: int = 20
+    ) -> Optional[List[Vacancy]]: ...
+
+    async def close(self) -> None: ...
+
+
+class InProcessProvider:
+    """
+    Берёт вакансии напрямую из кэша и парсера того же процесса
+    """
+
+    def __init__(
+        self,
+        cache: Optional[VacancyCache] = None,
+        ranked: Optional[VacancyCache] = None,
+    ) -> None:
+        self._cache = cache or get_cache()
+        self._ranked = ranked or get_cache("salary")
+
+    async def get_vacancies(
+        self,
+        sort: Optional[str] = None,
+        min_salary: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> Optional[List[Vacancy]]:
+        if sort not in (None, "salary"):
+            raise ValueError(f"Unknown sort: {sort}")
+        cache = self._ranked if sort == "salary" else self._cache
+        vacancies = await cache.get(on_progress)
+        if vacancies is not None and min_salary is not None:
+            vacancies = at_least(vacancies, min_salary)
+        return vacancies
+
+    async def search(
+        self, query: str, days: Optional[int] = None, limit: int = 20
+    ) -> Optional[List[Vacancy]]:
+        return search_history(query, days, limit)
+
+    async def close(self) -> None:
+        pass
+
+
+class RemoteProvider:
+    """
+    Запрашивает вакансии у HTTP API через одну долгоживущую сессию
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        pool_size: int = 10,
+    ) -> None:
+        self.base_url = (base_url or config.VACANCY_API_URL).rstrip("/")
+        self._timeout = aiohttp.ClientTimeout(
+            total=timeout or config.VACANCY_API_TIMEOUT, connect=5
+        )
+        self._pool_size = pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._pool_size, keepalive_timeout=60
+                ),
+                timeout=self._timeout,
+            )
+        return self._session
+
+    async def _fetch(
+        self, path: str, params: Optional[Dict[str, Union[str, int]]] = None
+    ) -> Optional[List[Vacancy]]:
+        api_url = f"{self.base_url}{path}"
+        try:
+            logger.info(f"Запрос к API: {api_url}")
+            async with self._get_session().get(api_url, params=params) as response:
+                if response.status != 200:
+                    API_ERRORS.labels(source="vacancy_api").inc()
+                    logger.error(f"API вернул статус {response.status}")
+                    return None
+                # Тело разбирается сразу в модели, без промежуточных dict
+                vacancies = validate_vacancies_json(await response.read())
+                logger.info(f"Получено {len(vacancies)} вакансий из API")
+                return vacancies
+        except Exception as e:
+            API_ERRORS.labels(source="vacancy_api").inc()
+            logger.error(f"Ошибка при получении вакансий из API: {e}")
+            return None
+
+    async def get_vacancies(
+        self,
+        sort: Optional[str] = None,
+        min_salary: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> Optional[List[Vacancy]]:
+        # Ход обхода в другом процессе не виден: ответ приходит целиком
+        params: Dict[str, Union[str, int]] = {}
+        if sort is not None:
+            params["sort"] = sort
+        if min_salary is not None:
+            params["min_salary"] = min_salary
+        return await self._fetch("/vacancies", params)
+
+    async def search(
+        self, query: str, days: Optional[int] = None, limit: int = 20
+    ) -> Optional[List[Vacancy]]:
+        params: Dict[str, Union[str, int]] = {"q": query, "limit": limit}
+        if days is not None:
+            params["days"] = days
+        return await self._fetch("/search", params)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def search_history(
+    query: str, days: Optional[int] = None, limit: int = 20
+) -> List[Vacancy]:
+    """
+    Поиск по локальной истории вакансий; hh.ru не запрашивается
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+    return get_history_store().search(query, since, limit)
+
+
+def create_provider(kind: Optional[str] = None) -> VacancyProvider:
+    kind = kind or config.VACANCY_PROVIDER
+    if kind == "inprocess":
+        return InProcessProvider()
+    if kind == "remote":
+        return RemoteProvider()
+    raise ValueError(f"Unknown vacancy provider: {kind}")
@@ -0,0 +1,164 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from app.config import config
+from app.models import Vacancy
+from app.upstream import UpstreamClient, get_client
+
+PER_PAGE = 100
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    """
+    Один поисковый запрос к hh.ru: текст и регион
+    """
+
+    text: str
+    area: str = "1"
+
+    @property
+    def name(self) -> str:
+        return f"{self.text}@{self.area}"
+
+    def params(self, page: int) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "area": self.area,
+            "per_page": str(PER_PAGE),
+            "page": page,
+            "order_by": "publication_time",  # Сортировка по дате публикации
+        }
+
+
+def parse_queries(value: Optional[str] = None) -> List[QuerySpec]:
+    """
+    Разбирает список запросов вида ``python:1,devops:1,golang:2``;
+    регион по умолчанию - 1
+    """
+    value = config.CRAWL_QUERIES if value is None else value
+    queries: List[QuerySpec] = []
+    for part in value.split(","):
+        text, _, area = part.strip().partition(":")
+        text = text.strip()
+        if not text:
+            continue
+        query = QuerySpec(text=text, area=area.strip() or "1")
+        if query not in queries:
+            queries.append(query)
+    if not queries:
+        raise ValueError("CRAWL_QUERIES must contain at least one query")
+    return queries
+
+
+class CrawlState:
+    """
+    Общее состояние обхода нескольких запросов.
+
+    Ограничивает суммарное число запрошенных страниц (``budget``) и число
+    одновременных запросов, отсекает повторы вакансий по ID hh.ru до
+    фильтрации и считает страницы по каждому запросу, в том числе
+    не полученные из-за ошибок.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[int] = None,
+        concurrency: int = 1,
+        client: Optional[UpstreamClient] = None,
+    ) -> None:
+        self.budget = config.CRAWL_BUDGET if budget is None else budget
+        self.client = client or get_client()
+        self.pages: Dict[str, int] = {}
+        self.found: Dict[str, int] = {}
+        self.duplicates = 0
+        self.failed_pages = 0
+        # Запросы, часть страниц которых не получена
+        self.failed: Set[str] = set()
+        self.exhausted = False
+        self._requested = 0
+        self._seen: Set[str] = set()
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    @property
+    def requested(self) -> int:
+        return self._requested
+
+    @property
+    def complete(self) -> bool:
+        return self.failed_pages == 0
+
+    def take_page(self, query: QuerySpec) -> bool:
+        """
+        Резервирует страницу из общего бюджета
+        """
+        if self._requested >= self.budget:
+            self.exhausted = True
+            return False
+        self._requested += 1
+        self.pages[query.name] = self.pages.get(query.name, 0) + 1
+        return True
+
+    def fail(self, query: QuerySpec) -> None:
+        """
+        Учитывает страницу запроса, не полученную после повторов
+        """
+        self.failed_pages += 1
+        self.failed.add(query.name)
+
+    def claim(self, vacancy_id: Optional[str]) -> bool:
+        """
+        True, если вакансия с этим ID встретилась впервые
+        """
+        if vacancy_id is None:
+            return True
+        if vacancy_id in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(vacancy_id)
+        return True
+
+    @property
+    def slot(self) -> asyncio.Semaphore:
+        return self._semaphore
+
+    def summary(self) -> str:
+        pages = ", ".join(f"{name}={count}" for name, count in self.pages.items())
+        return (
+            f"страниц {self._requested}/{self.budget} ({pages}), "
+            f"повторов {self.duplicates}"
+            + (f", не получено {self.failed_pages}" if self.failed_pages else "")
+            + (", бюджет исчерпан" if self.exhausted else "")
+        )
+
+
+@dataclass
+class CrawlResult:
+    """
+    Результат обхода hh.ru.
+
+    complete=False - часть страниц не удалось получить, вакансии неполные;
+    stale=True - hh.ru недоступен и отдан последний полный результат.
+    """
+
+    vacancies: List[Vacancy]
+    complete: bool = True
+    stale: bool = False
+    pages: Dict[str, int] = field(default_factory=dict)
+    failed_pages: int = 0
+
+
+@dataclass
+class CrawlDelta:
+    """
+    Новые вакансии инкрементального обхода.
+
+    В SeenStore они и новое время обхода запросов (``cursors``) попадают
+    только через commit_new_vacancies, после того как рассылка доставлена.
+    """
+
+    vacancies: List[Vacancy]
+    started_at: datetime
+    cursors: Dict[str, datetime] = field(default_factory=dict)
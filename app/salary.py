@@ -0,0 +1,229 @@
+import heapq
+import json
+import logging
+import os
+import time
+from itertools import count
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import aiohttp
+
+from app.config import config
+from app.models import Vacancy
+from app.upstream import UpstreamClient, UpstreamError, get_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# НДФЛ: зарплата «до вычета налогов» приводится к сумме на руки
+INCOME_TAX = 0.13
+
+# Курсы по умолчанию в формате справочника hh.ru: единиц валюты за рубль
+DEFAULT_RATES: Dict[str, float] = {
+    "RUR": 1.0,
+    "USD": 0.0125,
+    "EUR": 0.0115,
+    "KZT": 6.1,
+    "BYR": 0.039,
+    "UAH": 0.5,
+    "UZS": 150.0,
+    "AZN": 0.021,
+    "GEL": 0.033,
+    "KGS": 1.05,
+}
+
+# hh.ru обозначает рубль как RUR, но в строке зарплаты встречается и RUB
+ALIASES = {"RUB": "RUR"}
+
+
+class RateTable:
+    """
+    Курсы валют: сколько единиц валюты стоит один рубль, как в
+    справочнике hh.ru /dictionaries.
+    """
+
+    def __init__(
+        self, rates: Optional[Dict[str, float]] = None, fetched_at: float = 0.0
+    ) -> None:
+        self.rates = dict(DEFAULT_RATES if rates is None else rates)
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def from_dictionaries(cls, data: Dict[str, Any]) -> "RateTable":
+        rates = {
+            currency["code"]: float(currency["rate"])
+            for currency in data.get("currency") or ()
+            if currency.get("code") and currency.get("rate")
+        }
+        return cls(rates, time.time())
+
+    @classmethod
+    def load(cls, path: str) -> "RateTable":
+        """
+        Таблица из локального файла; без файла - курсы по умолчанию
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(data["rates"], data.get("fetched_at", 0.0))
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Не удалось прочитать курсы валют %s: %s", path, e)
+            return cls()
+
+    def save(self, path: str) -> None:
+        """
+        Записывает таблицу через временный файл, чтобы не оставить её
+        недописанной
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"rates": self.rates, "fetched_at": self.fetched_at}, f)
+        os.replace(tmp, path)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def convert(
+        self, amount: float, currency: str, to: Optional[str] = None
+    ) -> Optional[float]:
+        """
+        Сумма в валюте ``to`` (по умолчанию SALARY_CURRENCY) или None,
+        если курс неизвестен
+        """
+        to = to or config.SALARY_CURRENCY
+        source = self.rates.get(ALIASES.get(currency, currency))
+        target = self.rates.get(ALIASES.get(to, to))
+        if not source or not target:
+            return None
+        return amount / source * target
+
+
+_rates: Optional[RateTable] = None
+
+
+def get_rates() -> RateTable:
+    """
+    Курсы из RATES_PATH, загружаются при первом обращении
+    """
+    global _rates
+    if _rates is None:
+        _rates = RateTable.load(config.RATES_PATH)
+    return _rates
+
+
+def dictionaries_url() -> str:
+    return f"{config.HH_API_URL.rstrip('/').rsplit('/', 1)[0]}/dictionaries"
+
+
+async def refresh_rates(
+    session: aiohttp.ClientSession,
+    client: Optional[UpstreamClient] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> RateTable:
+    """
+    Обновляет курсы из справочника hh.ru, если локальная копия старше
+    RATES_TTL. При ошибке остаются прежние курсы.
+    """
+    global _rates
+    rates = get_rates()
+    if config.RATES_TTL <= 0 or rates.age < config.RATES_TTL:
+        return rates
+
+    client = client or get_client()
+    try:
+        data = await client.get_json(session, dictionaries_url(), {}, headers)
+    except UpstreamError as e:
+        logger.warning("Не удалось обновить курсы валют: %s", e)
+        return rates
+
+    fresh = RateTable.from_dictionaries(data)
+    if not fresh.rates:
+        return rates
+    try:
+        fresh.save(config.RATES_PATH)
+    except OSError as e:
+        logger.warning("Не удалось сохранить курсы валют: %s", e)
+    _rates = fresh
+    return fresh
+
+
+def normalize_salary(
+    salary_info: Dict[str, Any], rates: Optional[RateTable] = None
+) -> Optional[int]:
+    """
+    Верхняя граница зарплаты на руки в SALARY_CURRENCY.
+
+    Зарплата до вычета налогов (``gross``) уменьшается на НДФЛ. None, если
+    сумма не указана или курс валюты неизвестен.
+    """
+    bounds = [b for b in (salary_info.get("from"), salary_info.get("to")) if b]
+    if not bounds:
+        return None
+    rates = rates or get_rates()
+    amount = rates.convert(max(bounds), salary_info.get("currency") or "RUR")
+    if amount is None:
+        return None
+    if salary_info.get("gross"):
+        amount *= 1 - INCOME_TAX
+    return round(amount)
+
+
+def pays_at_least(vacancy: Vacancy, min_salary: int) -> bool:
+    """
+    Зарплата на руки не ниже ``min_salary``; вакансия без зарплаты не проходит
+    """
+    return vacancy.salary_net is not None and vacancy.salary_net >= min_salary
+
+
+def at_least(vacancies: Iterable[Vacancy], min_salary: int) -> List[Vacancy]:
+    return [vacancy for vacancy in vacancies if pays_at_least(vacancy, min_salary)]
+
+
+class TopK(Generic[T]):
+    """
+    k лучших элементов потока по ключу.
+
+    Хранит min-кучу из k элементов: O(n log k) времени и O(k) памяти на
+    весь поток. При равном ключе выше тот, что пришёл раньше.
+    """
+
+    def __init__(self, k: int, key: Callable[[T], Any]) -> None:
+        self.k = k
+        self.key = key
+        # Порядковый номер со знаком минус: при равном ключе первым
+        # вытесняется пришедший позже, а до сравнения элементов не доходит
+        self._heap: List[Tuple[Any, int, T]] = []
+        self._order = count()
+
+    def push(self, item: T) -> None:
+        entry = (self.key(item), -next(self._order), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif self._heap and entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def result(self) -> List[T]:
+        """
+        Элементы от лучшего к худшему
+        """
+        return [item for *_, item in sorted(self._heap, reverse=True)]
@@ -0,0 +1,90 @@
+import logging
+from datetime import datetime
+
+from apscheduler import events
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from app.bot import send_daily_vacancies
+from app.config import config
+from app.metrics import SCHEDULER_LAG_SECONDS
+from app.shared import LeaderLease, get_shared_backend
+
+logger = logging.getLogger(__name__)
+
+PLANNING_HOUR = 6
+PLANNING_MINUTE = 0
+
+
+async def run_daily_vacancies() -> None:
+    """
+    Рассылка выполняется одним воркером.
+
+    Запуск берёт аренду на JOB_LEASE_TTL и не освобождает её: воркеры,
+    сработавшие в то же утро позже, видят занятую аренду и пропускают запуск.
+    """
+    backend = get_shared_backend()
+    if backend is not None:
+        lease = LeaderLease(backend, "job:daily_vacancies", config.JOB_LEASE_TTL)
+        if not lease.acquire():
+            logger.info("⏭️ Рассылку уже выполняет другой воркер")
+            return
+    await send_daily_vacancies()
+
+
+def create_scheduler() -> AsyncIOScheduler:
+    """
+    Планировщик с ежедневной рассылкой вакансий
+    """
+    scheduler = AsyncIOScheduler()
+
+    # Добавляем задачу на отправку вакансий каждый день в 6:00
+    job = scheduler.add_job(
+        run_daily_vacancies,
+        CronTrigger(hour=PLANNING_HOUR - 3, minute=PLANNING_MINUTE),
+        id="daily_vacancies",
+        name="Отправка ежедневных вакансий",
+        replace_existing=True,
+    )
+
+    logger.info(
+        "⏰ Планировщик настроен: вакансии будут отправляться каждый день в 6:00"
+    )
+    next_run = getattr(job, "next_run_time", None) or "Не определено"
+    logger.info(f"📅 Следующий запуск задачи: {next_run}")
+
+    # Добавляем обработчик ошибок планировщика
+    def job_error_listener(event: events.JobExecutionEvent) -> None:
+        logger.error(f"❌ Ошибка в задаче планировщика: {event.exception}")
+        logger.error(f"   Задача: {event.job_id}")
+        logger.error(f"   Детали: {event.traceback}")
+
+    scheduler.add_listener(job_error_listener, events.EVENT_JOB_ERROR)
+    logger.info("🔧 Добавлен обработчик ошибок планировщика")
+
+    # Задержка между плановым и фактическим запуском задачи
+    def job_submitted_listener(event: events.JobSubmissionEvent) -> None:
+        if event.scheduled_run_times:
+            scheduled = event.scheduled_run_times[-1]
+            lag = (datetime.now(scheduled.tzinfo) - scheduled).total_seconds()
+            SCHEDULER_LAG_SECONDS.labels(job=event.job_id).set(max(lag, 0.0))
+
+    scheduler.add_listener(job_submitted_listener, events.EVENT_JOB_SUBMITTED)
+    return scheduler
+
+
+def start_scheduler() -> AsyncIOScheduler:
+    """
+    Создаёт и запускает планировщик в текущем event loop
+    """
+    scheduler = create_scheduler()
+    scheduler.start()
+    logger.info("✅ Планировщик запущен")
+
+    # Выводим информацию о запланированных задачах
+    jobs = scheduler.get_jobs()
+    logger.info(f"📋 Активных задач в планировщике: {len(jobs)}")
+    for job in jobs:
+        next_run = getattr(job, "next_run_time", None) or "Не определено"
+        logger.info(f"  - {job.name} (ID: {job.id}): {next_run}")
+    return scheduler
@@ -0,0 +1,171 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+from app.config import config
+from app.storage import connect
+
+
+@dataclass(frozen=True)
+class SharedEntry:
+    """
+    Значение из общего хранилища и момент записи (время UNIX)
+    """
+
+    value: bytes
+    stored_at: float
+    complete: bool = True
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class SharedBackend(Protocol):
+    """
+    Состояние, общее для всех воркеров: кэш результатов и аренды.
+
+    Аренда (lease) - блокировка с владельцем и сроком: пока срок не истёк,
+    получить её может только тот же владелец, что позволяет продлевать её.
+    """
+
+    def get(self, key: str) -> Optional[SharedEntry]: ...
+
+    def set(self, key: str, value: bytes, complete: bool = True) -> None: ...
+
+    def acquire(self, name: str, owner: str, ttl: float) -> bool: ...
+
+    def release(self, name: str, owner: str) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SQLiteBackend:
+    """
+    Общее состояние в SQLite-файле для воркеров и контейнеров одного хоста
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._conn = connect(path or config.SHARED_DB_PATH or config.DB_PATH)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " complete INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " name TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " expires REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[SharedEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, complete FROM shared_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return SharedEntry(bytes(row[0]), row[1], bool(row[2])) if row else None
+
+    def set(self, key: str, value: bytes, complete: bool = True) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shared_cache (key, value, stored_at, complete)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, time.time(), int(complete)),
+            )
+
+    def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        Получает или продлевает аренду; одна инструкция - атомарно
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO leases (name, owner, expires) VALUES (?, ?, ?)"
+                " ON CONFLICT(name) DO UPDATE"
+                " SET owner = excluded.owner, expires = excluded.expires"
+                " WHERE leases.owner = excluded.owner OR leases.expires <= ?",
+                (name, owner, now + ttl, now),
+            )
+        return bool(cursor.rowcount)
+
+    def release(self, name: str, owner: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner)
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def instance_id() -> str:
+    """
+    Уникальное имя процесса для аренд: хост, PID и случайный суффикс
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderLease:
+    """
+    Аренда с фиксированным владельцем.
+
+    ``acquire`` возвращает True, если этот процесс - лидер; повторный вызов
+    продлевает аренду. Владелец, переставший продлевать аренду, теряет её
+    через ``ttl`` секунд.
+    """
+
+    def __init__(
+        self,
+        backend: SharedBackend,
+        name: str,
+        ttl: float,
+        owner: Optional[str] = None,
+    ) -> None:
+        self.backend = backend
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner or instance_id()
+        self.held = False
+
+    def acquire(self) -> bool:
+        self.held = self.backend.acquire(self.name, self.owner, self.ttl)
+        return self.held
+
+    def release(self) -> None:
+        if self.held:
+            self.backend.release(self.name, self.owner)
+            self.held = False
+
+
+def create_backend(kind: Optional[str] = None) -> Optional[SharedBackend]:
+    kind = kind or config.SHARED_BACKEND
+    if kind == "none":
+        return None
+    if kind == "sqlite":
+        return SQLiteBackend()
+    raise ValueError(f"Unknown shared backend: {kind}")
+
+
+_backend: Optional[SharedBackend] = None
+_backend_created = False
+
+
+def get_shared_backend() -> Optional[SharedBackend]:
+    """
+    Общее хранилище из SHARED_BACKEND; None - состояние только в процессе
+    """
+    global _backend, _backend_created
+    if not _backend_created:
+        _backend = create_backend()
+        _backend_created = True
+    return _backend
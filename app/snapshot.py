@@ -0,0 +1,111 @@
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.config import config
+from app.models import Vacancy, validate_vacancies_json
+
+logger = logging.getLogger(__name__)
+
+# Меняется при несовместимом изменении формата: старый снимок игнорируется
+SNAPSHOT_VERSION = 1
+# Сжатие почти как у уровня 9 (по умолчанию в gzip), но запись быстрее
+COMPRESS_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Результат обхода, сохранённый на диск, и момент записи (время UNIX)
+    """
+
+    vacancies: List[Vacancy]
+    saved_at: float
+    complete: bool = True
+    etag: Optional[str] = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.saved_at
+
+
+def snapshot_path(key: str) -> Optional[str]:
+    """
+    Файл снимка для ключа кэша; None, если SNAPSHOT_DIR пуст
+    """
+    if not config.SNAPSHOT_DIR:
+        return None
+    return os.path.join(config.SNAPSHOT_DIR, f"{key.replace(':', '_')}.jsonl.gz")
+
+
+def write_snapshot(
+    path: str,
+    vacancies: List[Vacancy],
+    complete: bool = True,
+    etag: Optional[str] = None,
+    saved_at: Optional[float] = None,
+) -> None:
+    """
+    Записывает снимок: gzip, первая строка - заголовок, дальше по вакансии
+    в строке. Файл пишется рядом и подменяется целиком, поэтому читатель
+    никогда не видит недописанный снимок.
+    """
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": time.time() if saved_at is None else saved_at,
+        "complete": complete,
+        "etag": etag,
+        "count": len(vacancies),
+    }
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            with gzip.GzipFile(
+                fileobj=raw, mode="wb", compresslevel=COMPRESS_LEVEL, mtime=0
+            ) as f:
+                f.write(json.dumps(header).encode())
+                for vacancy in vacancies:
+                    f.write(b"\n")
+                    f.write(vacancy.model_dump_json().encode())
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_snapshot(path: str) -> Optional[Snapshot]:
+    """
+    Читает снимок; без файла, со старой версией формата или с повреждённым
+    файлом возвращает None
+    """
+    try:
+        with gzip.open(path, "rb") as f:
+            lines = f.read().split(b"\n")
+        header = json.loads(lines[0])
+        if header.get("version") != SNAPSHOT_VERSION:
+            logger.info("Снимок %s в старом формате, пропущен", path)
+            return None
+        # Строки уже в JSON модели: одна валидация на весь снимок
+        vacancies = validate_vacancies_json(b"[" + b",".join(lines[1:]) + b"]")
+        if len(vacancies) != header["count"]:
+            raise ValueError(f"ожидалось {header['count']} вакансий")
+        return Snapshot(
+            vacancies,
+            float(header["saved_at"]),
+            bool(header["complete"]),
+            header.get("etag"),
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+        logger.warning("Не удалось прочитать снимок %s: %s", path, e)
+        return None
@@ -0,0 +1,239 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Set
+
+from app.config import config
+from app.models import Vacancy
+from app.subscriptions import Subscription
+
+# Сколько параметров подставляется в один запрос IN (...)
+SQL_BATCH = 500
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Открывает SQLite-базу приложения, создавая каталог при необходимости
+    """
+    if path != ":memory:":
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+class SeenStore:
+    """
+    Хранилище уже найденных вакансий и времени последнего обхода.
+
+    Вакансия считается новой, пока её ID не записан в таблицу seen.
+    Время обхода хранится общее и отдельно по каждому запросу: запрос,
+    не полученный целиком, не задерживает остальные.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._conn = connect(path or config.DB_PATH)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen ("
+                " id TEXT PRIMARY KEY,"
+                " first_seen TEXT NOT NULL,"
+                " published_at TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    @staticmethod
+    def _crawl_key(query: Optional[str]) -> str:
+        return f"last_crawl:{query}" if query else "last_crawl"
+
+    def last_crawl(self, query: Optional[str] = None) -> Optional[datetime]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (self._crawl_key(query),)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def set_last_crawl(self, moment: datetime, query: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (self._crawl_key(query), moment.isoformat()),
+            )
+
+    def add_new(
+        self, vacancies: Iterable[Vacancy], now: Optional[datetime] = None
+    ) -> List[Vacancy]:
+        """
+        Записывает вакансии как увиденные и возвращает только новые из них
+        """
+        first_seen = (now or datetime.now(timezone.utc)).isoformat()
+        new: List[Vacancy] = []
+        with self._lock, self._conn:
+            for vacancy in vacancies:
+                if vacancy.id is None:
+                    new.append(vacancy)
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO seen (id, first_seen, published_at)"
+                    " VALUES (?, ?, ?)",
+                    (
+                        vacancy.id,
+                        first_seen,
+                        (
+                            vacancy.published_at.isoformat()
+                            if vacancy.published_at
+                            else None
+                        ),
+                    ),
+                )
+                if cursor.rowcount:
+                    new.append(vacancy)
+        return new
+
+    def unseen(self, vacancies: Iterable[Vacancy]) -> List[Vacancy]:
+        """
+        Вакансии, ещё не записанные как увиденные; хранилище не меняется
+        """
+        vacancies = list(vacancies)
+        ids = [vacancy.id for vacancy in vacancies if vacancy.id is not None]
+        seen: Set[str] = set()
+        with self._lock:
+            for start in range(0, len(ids), SQL_BATCH):
+                chunk = ids[start : start + SQL_BATCH]
+                rows = self._conn.execute(
+                    "SELECT id FROM seen WHERE id IN"
+                    f" ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                seen.update(row[0] for row in rows)
+        return [vacancy for vacancy in vacancies if vacancy.id not in seen]
+
+    def first_seen(self, vacancy_id: str) -> Optional[datetime]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT first_seen FROM seen WHERE id = ?", (vacancy_id,)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class SubscriberStore:
+    """
+    Реестр чатов, подписанных на ежедневную рассылку, и их настроек.
+
+    Настройки хранятся отдельно и переживают отписку: после повторного
+    /start подписчик получает прежнюю персональную выдачу.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._conn = connect(path or config.DB_PATH)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS subscribers ("
+                " chat_id TEXT PRIMARY KEY,"
+                " subscribed_at TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS preferences ("
+                " chat_id TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL)"
+            )
+
+    def add(self, chat_id: str) -> bool:
+        """
+        Добавляет подписчика, возвращает True если он новый
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO subscribers (chat_id, subscribed_at)"
+                " VALUES (?, ?)",
+                (str(chat_id), datetime.now(timezone.utc).isoformat()),
+            )
+        return bool(cursor.rowcount)
+
+    def remove(self, chat_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM subscribers WHERE chat_id = ?", (str(chat_id),)
+            )
+        return bool(cursor.rowcount)
+
+    def all(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chat_id FROM subscribers ORDER BY subscribed_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM subscribers").fetchone()
+        return int(row[0])
+
+    def set_preferences(self, subscription: Subscription) -> None:
+        """
+        Сохраняет настройки чата; пустые настройки удаляют запись
+        """
+        with self._lock, self._conn:
+            if subscription.is_empty:
+                self._conn.execute(
+                    "DELETE FROM preferences WHERE chat_id = ?",
+                    (subscription.chat_id,),
+                )
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO preferences (chat_id, data) VALUES (?, ?)",
+                    (subscription.chat_id, subscription.to_json()),
+                )
+
+    def get_preferences(self, chat_id: str) -> Optional[Subscription]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM preferences WHERE chat_id = ?", (str(chat_id),)
+            ).fetchone()
+        return Subscription.from_json(str(chat_id), row[0]) if row else None
+
+    def preferences(self) -> List[Subscription]:
+        """
+        Настройки всех текущих подписчиков, у которых они заданы
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.chat_id, p.data FROM preferences p"
+                " JOIN subscribers s ON s.chat_id = p.chat_id"
+                " ORDER BY s.subscribed_at"
+            ).fetchall()
+        return [Subscription.from_json(chat_id, data) for chat_id, data in rows]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_seen_store: Optional[SeenStore] = None
+_subscriber_store: Optional[SubscriberStore] = None
+
+
+def get_seen_store() -> SeenStore:
+    global _seen_store
+    if _seen_store is None:
+        _seen_store = SeenStore()
+    return _seen_store
+
+
+def get_subscriber_store() -> SubscriberStore:
+    global _subscriber_store
+    if _subscriber_store is None:
+        _subscriber_store = SubscriberStore()
+        # Чат из USER_ID остаётся подписчиком по умолчанию
+        if config.NOTIFICATION_USER_ID:
+            _subscriber_store.add(config.NOTIFICATION_USER_ID)
+    return _subscriber_store
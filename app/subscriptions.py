@@ -0,0 +1,241 @@
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from app.models import Vacancy
+
+# Слова заголовка: буквы и цифры, плюс «+» и «#» внутри (c++, c#)
+_TOKEN_RE = re.compile(r"\w[\w+#]*")
+
+# Валюты, в которых сравнивается минимальная зарплата
+SALARY_CURRENCIES = frozenset({"RUR", "RUB"})
+
+Phrase = FrozenSet[str]
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    return frozenset(_TOKEN_RE.findall(text.lower()))
+
+
+def vacancy_tokens(vacancy: Vacancy) -> FrozenSet[str]:
+    """
+    Слова заголовка и ключевых навыков, если они догружены
+    """
+    tokens = tokenize(vacancy.title)
+    if vacancy.key_skills:
+        tokens = tokens.union(*map(tokenize, vacancy.key_skills))
+    return tokens
+
+
+def _phrases(words: Iterable[str]) -> Tuple[Phrase, ...]:
+    return tuple(tokens for tokens in map(tokenize, words) if tokens)
+
+
+def _split(value: str) -> Tuple[str, ...]:
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
+def salary_ceiling(vacancy: Vacancy) -> Optional[int]:
+    """
+    Верхняя граница зарплаты на руки в SALARY_CURRENCY, если она известна;
+    без нормализованной зарплаты - рублёвая граница из выдачи
+    """
+    if vacancy.salary_net is not None:
+        return vacancy.salary_net
+    if vacancy.currency not in SALARY_CURRENCIES:
+        return None
+    bounds = [b for b in (vacancy.salary_from, vacancy.salary_to) if b]
+    return max(bounds) if bounds else None
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """
+    Персональные настройки подписчика.
+
+    keywords - хотя бы одна фраза должна целиком встречаться в заголовке;
+    exclude - вакансии с любой из этих фраз отбрасываются;
+    min_salary - минимальная зарплата на руки, вакансии без неё не проходят;
+    schedule/employment - допустимые типы графика и занятости hh.ru.
+    Пустое поле не ограничивает выдачу.
+    """
+
+    chat_id: str
+    keywords: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+    min_salary: Optional[int] = None
+    schedule: Tuple[str, ...] = ()
+    employment: Tuple[str, ...] = ()
+    _keywords: Tuple[Phrase, ...] = field(init=False, repr=False, compare=False)
+    _exclude: Tuple[Phrase, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_keywords", _phrases(self.keywords))
+        object.__setattr__(self, "_exclude", _phrases(self.exclude))
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.keywords
+            or self.exclude
+            or self.min_salary
+            or self.schedule
+            or self.employment
+        )
+
+    def accepts(
+        self, vacancy: Vacancy, tokens: Optional[FrozenSet[str]] = None
+    ) -> bool:
+        if tokens is None:
+            tokens = vacancy_tokens(vacancy)
+        if any(phrase <= tokens for phrase in self._exclude):
+            return False
+        if self._keywords and not any(phrase <= tokens for phrase in self._keywords):
+            return False
+        if self.schedule and vacancy.schedule not in self.schedule:
+            return False
+        if self.employment and vacancy.employment not in self.employment:
+            return False
+        if self.min_salary:
+            ceiling = salary_ceiling(vacancy)
+            if ceiling is None or ceiling < self.min_salary:
+                return False
+        return True
+
+    def filter(self, vacancies: Iterable[Vacancy]) -> List[Vacancy]:
+        return [vacancy for vacancy in vacancies if self.accepts(vacancy)]
+
+    def to_json(self) -> str:
+        data = {
+            "keywords": self.keywords,
+            "exclude": self.exclude,
+            "min_salary": self.min_salary,
+            "schedule": self.schedule,
+            "employment": self.employment,
+        }
+        return json.dumps(data, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, chat_id: str, value: str) -> "Subscription":
+        data: Dict[str, Any] = json.loads(value)
+        return cls(
+            chat_id=chat_id,
+            keywords=tuple(data.get("keywords", ())),
+            exclude=tuple(data.get("exclude", ())),
+            min_salary=data.get("min_salary"),
+            schedule=tuple(data.get("schedule", ())),
+            employment=tuple(data.get("employment", ())),
+        )
+
+    @classmethod
+    def parse(cls, chat_id: str, text: str) -> "Subscription":
+        """
+        Разбирает настройки вида
+        ``keywords=python, django; exclude=senior; salary=150000; schedule=remote``
+        """
+        fields: Dict[str, Any] = {}
+        for part in text.split(";"):
+            if not part.strip():
+                continue
+            key, sep, value = part.partition("=")
+            key = key.strip().lower()
+            if not sep:
+                raise ValueError(f"Ожидалось ключ=значение: {part.strip()}")
+            if key in ("keywords", "exclude", "schedule", "employment"):
+                fields[key] = _split(value)
+            elif key == "salary":
+                value = value.strip()
+                if value and not value.isdigit():
+                    raise ValueError(f"Зарплата должна быть числом: {value}")
+                fields["min_salary"] = int(value) if value else None
+            else:
+                raise ValueError(f"Неизвестная настройка: {key}")
+        return cls(chat_id=chat_id, **fields)
+
+    def describe(self) -> str:
+        return "\n".join(
+            [
+                f"keywords = {', '.join(self.keywords) or '—'}",
+                f"exclude = {', '.join(self.exclude) or '—'}",
+                f"salary = {self.min_salary or '—'}",
+                f"schedule = {', '.join(self.schedule) or '—'}",
+                f"employment = {', '.join(self.employment) or '—'}",
+            ]
+        )
+
+
+class SubscriptionIndex:
+    """
+    Инвертированный индекс подписок для подбора вакансий за один проход.
+
+    Каждая подписка попадает в индекс по самому избирательному признаку:
+    по самому длинному слову каждой фразы из keywords, иначе по значениям
+    schedule или employment, и только без них - в список «подходит всё».
+    Для вакансии кандидаты собираются по её словам и атрибутам, а полная
+    проверка выполняется только для них, поэтому стоимость зависит от
+    слов вакансии и числа подходящих подписок, а не от числа подписчиков.
+    """
+
+    def __init__(self, subscriptions: Iterable[Subscription] = ()) -> None:
+        self._subscriptions: List[Subscription] = []
+        self._tokens: Dict[str, List[Tuple[int, Phrase]]] = defaultdict(list)
+        self._attributes: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        self._everyone: List[int] = []
+        for subscription in subscriptions:
+            self.add(subscription)
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def add(self, subscription: Subscription) -> None:
+        position = len(self._subscriptions)
+        self._subscriptions.append(subscription)
+
+        if subscription._keywords:
+            for phrase in subscription._keywords:
+                anchor = max(phrase, key=len)
+                self._tokens[anchor].append((position, phrase))
+        elif subscription.schedule:
+            for value in subscription.schedule:
+                self._attributes[("schedule", value)].append(position)
+        elif subscription.employment:
+            for value in subscription.employment:
+                self._attributes[("employment", value)].append(position)
+        else:
+            self._everyone.append(position)
+
+    def match(self, vacancy: Vacancy) -> List[str]:
+        """
+        Возвращает chat_id подписчиков, которым подходит вакансия
+        """
+        tokens = vacancy_tokens(vacancy)
+        candidates: Set[int] = set(self._everyone)
+        for token in tokens:
+            for position, phrase in self._tokens.get(token, ()):
+                if phrase <= tokens:
+                    candidates.add(position)
+        if vacancy.schedule:
+            candidates.update(self._attributes.get(("schedule", vacancy.schedule), ()))
+        if vacancy.employment:
+            candidates.update(
+                self._attributes.get(("employment", vacancy.employment), ())
+            )
+
+        subscriptions = self._subscriptions
+        return [
+            subscriptions[position].chat_id
+            for position in sorted(candidates)
+            if subscriptions[position].accepts(vacancy, tokens)
+        ]
+
+    def match_all(self, vacancies: Iterable[Vacancy]) -> Dict[str, List[Vacancy]]:
+        """
+        Раскладывает вакансии по подписчикам с сохранением порядка
+        """
+        matched: Dict[str, List[Vacancy]] = {}
+        for vacancy in vacancies:
+            for chat_id in self.match(vacancy):
+                matched.setdefault(chat_id, []).append(vacancy)
+        return matched
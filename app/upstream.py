@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from app.config import config
+from app.metrics import API_RETRIES, CIRCUIT_OPEN, HH_CONCURRENCY_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# Ответы, после которых запрос имеет смысл повторить
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class UpstreamError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class RetryPolicy:
+    """
+    Экспоненциальная задержка с полным джиттером: случайная пауза от нуля
+    до ``base * 2**attempt``, но не больше ``cap``. Retry-After от сервера
+    имеет приоритет.
+    """
+
+    def __init__(self, attempts: int = 3, base: float = 0.5, cap: float = 10.0) -> None:
+        self.attempts = max(1, attempts)
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.cap)
+        return random.uniform(0, min(self.cap, self.base * 2**attempt))
+
+
+class AIMDController:
+    """
+    Адаптивный лимит одновременных запросов (AIMD).
+
+    Каждый быстрый успешный ответ увеличивает лимит на ``1/limit``, то есть
+    примерно на единицу за «окно» запросов. Ответ 429, таймаут или задержка
+    выше ``latency_target`` уменьшают лимит вдвое, но не чаще раза в
+    ``latency_target`` секунд, чтобы пачка ошибок из одного окна не
+    сбросила его до минимума. Retry-After приостанавливает все запросы.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        minimum: int = 1,
+        latency_target: float = 2.0,
+        decrease: float = 0.5,
+    ) -> None:
+        self.maximum = max(minimum, maximum)
+        self.minimum = minimum
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.limit = float(self.maximum)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        HH_CONCURRENCY_LIMIT.set(self.limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        condition = self._condition
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        try:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            yield
+        finally:
+            async with condition:
+                self._in_flight -= 1
+                condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        if latency > self.latency_target:
+            self._backoff()
+            return
+        self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+        HH_CONCURRENCY_LIMIT.set(self.limit)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._backoff()
+
+    def _backoff(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.latency_target:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * self.decrease)
+        HH_CONCURRENCY_LIMIT.set(self.limit)
+        logger.info("Лимит параллельных запросов к hh.ru снижен до %d", self.limit)
+
+
+class CircuitBreaker:
+    """
+    Размыкается после ``failure_threshold`` неудачных запросов подряд.
+
+    Пока цепь разомкнута, запросы не отправляются. Через ``reset_timeout``
+    секунд пропускается один пробный запрос: успех замыкает цепь, ошибка
+    размыкает её снова.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def release_probe(self) -> None:
+        """
+        Пробный запрос прерван без ответа: следующий снова может стать пробным
+        """
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+        CIRCUIT_OPEN.labels(source="hh").set(0)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning("🔌 hh.ru недоступен, цепь разомкнута")
+            self._opened_at = time.monotonic()
+            CIRCUIT_OPEN.labels(source="hh").set(1)
+
+
+class UpstreamClient:
+    """
+    Запросы к hh.ru с повторами, адаптивным лимитом и размыкателем цепи
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        latency_target: Optional[float] = None,
+    ) -> None:
+        self.controller = AIMDController(
+            max_concurrency or config.CRAWL_CONCURRENCY,
+            latency_target=latency_target or config.HH_LATENCY_TARGET,
+        )
+        self.retry = retry or RetryPolicy(
+            config.HH_RETRY_ATTEMPTS, config.HH_RETRY_BASE_DELAY
+        )
+        self.breaker = breaker or CircuitBreaker(
+            config.HH_BREAKER_THRESHOLD, config.HH_BREAKER_RESET
+        )
+
+    async def get_json(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        params: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        error: Optional[Exception] = None
+        for attempt in range(self.retry.attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError("hh.ru временно недоступен")
+            if attempt:
+                API_RETRIES.labels(source="hh").inc()
+
+            retry_after: Optional[float] = None
+            try:
+                async with self.controller.slot():
+                    started = time.monotonic()
+                    async with session.get(url, params=params, headers=headers) as r:
+                        if r.status in RETRY_STATUSES:
+                            retry_after = parse_retry_after(
+                                r.headers.get("Retry-After")
+                            )
+                            if r.status == 429:
+                                self.controller.on_throttle(retry_after)
+                            raise UpstreamError(f"hh.ru ответил {r.status}", r.status)
+                        if r.status >= 400:
+                            # Ошибка запроса, а не сервера: повтор не поможет
+                            self.breaker.record_success()
+                            raise UpstreamError(f"hh.ru ответил {r.status}", r.status)
+                        data: Dict[str, Any] = await r.json(content_type=None)
+                    self.controller.on_success(time.monotonic() - started)
+                self.breaker.record_success()
+                return data
+            except UpstreamError as e:
+                if e.status is not None and e.status not in RETRY_STATUSES:
+                    raise
+                error = e
+            except asyncio.TimeoutError as e:
+                self.controller.on_throttle()
+                error = e
+            except (aiohttp.ClientError, json.JSONDecodeError) as e:
+                error = e
+            except BaseException:
+                # Отмена или непредвиденная ошибка не должна навсегда
+                # оставить цепь в ожидании пробного запроса
+                self.breaker.release_probe()
+                raise
+
+            self.breaker.record_failure()
+            if attempt + 1 < self.retry.attempts:
+                await asyncio.sleep(self.retry.delay(attempt, retry_after))
+
+        raise UpstreamError(f"hh.ru недоступен после повторов: {error}") from error
+
+
+_client: Optional[UpstreamClient] = None
+
+
+def get_client() -> UpstreamClient:
+    """
+    Общий клиент hh.ru: лимит и состояние цепи едины для всех обходов
+    """
+    global _client
+    if _client is None:
+        _client = UpstreamClient()
+    return _client
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+from typing import Any, Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from fastapi import FastAPI, Request, Response
+
+from app.config import config
+from app.metrics import WEBHOOK_IN_FLIGHT, WEBHOOK_UPDATES
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def webhook_secret(token: Optional[str] = None, secret: Optional[str] = None) -> str:
+    """
+    Секрет для заголовка Telegram: из WEBHOOK_SECRET или из токена бота.
+
+    Производный секрет одинаков на всех репликах и не раскрывает токен.
+    """
+    secret = config.WEBHOOK_SECRET if secret is None else secret
+    if secret:
+        return secret
+    token = config.BOT_TOKEN if token is None else token
+    return hashlib.sha256(f"webhook:{token}".encode()).hexdigest()
+
+
+def webhook_url(base_url: Optional[str] = None, path: Optional[str] = None) -> str:
+    base_url = config.WEBHOOK_BASE_URL if base_url is None else base_url
+    path = config.WEBHOOK_PATH if path is None else path
+    return base_url.rstrip("/") + "/" + path.lstrip("/")
+
+
+class WebhookHandler:
+    """
+    Принимает обновления Telegram на маршруте FastAPI.
+
+    Запрос без верного секрета отклоняется. Обновление сразу подтверждается
+    ответом 200 и обрабатывается в фоне, одновременно не больше
+    ``max_concurrency``; когда все слоты заняты, ответ задерживается, и
+    Telegram сам придерживает следующие обновления.
+    """
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        secret: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> None:
+        self.dp = dp
+        self.bot = bot
+        self.secret = webhook_secret(bot.token, secret)
+        self.max_concurrency = max_concurrency or config.WEBHOOK_MAX_CONCURRENCY
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def verify(self, request: Request) -> bool:
+        received = request.headers.get(SECRET_HEADER, "")
+        return hmac.compare_digest(received.encode(), self.secret.encode())
+
+    async def handle(self, request: Request) -> Response:
+        if not self.verify(request):
+            WEBHOOK_UPDATES.labels(result="rejected").inc()
+            return Response(status_code=401)
+        try:
+            update = await request.json()
+        except ValueError:
+            WEBHOOK_UPDATES.labels(result="invalid").inc()
+            return Response(status_code=400)
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        await self._slots.acquire()
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        WEBHOOK_IN_FLIGHT.set(len(self._tasks))
+        task.add_done_callback(self._finished)
+        WEBHOOK_UPDATES.labels(result="accepted").inc()
+        return Response(status_code=200)
+
+    async def _process(self, update: dict[str, Any]) -> None:
+        try:
+            result = await self.dp.feed_raw_update(self.bot, update)
+            # Ответ обработчика в виде метода Bot API отправляется отдельно
+            if isinstance(result, TelegramMethod):
+                await self.dp.silent_call_request(self.bot, result)
+        except Exception as e:
+            WEBHOOK_UPDATES.labels(result="error").inc()
+            logger.error(f"❌ Ошибка при обработке обновления Telegram: {e}")
+
+    def _finished(self, task: "asyncio.Task[None]") -> None:
+        self._tasks.discard(task)
+        WEBHOOK_IN_FLIGHT.set(len(self._tasks))
+        if self._slots is not None:
+            self._slots.release()
+
+    async def drain(self) -> None:
+        """
+        Дожидается обработки уже принятых обновлений
+        """
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def mount(self, app: FastAPI, path: Optional[str] = None) -> None:
+        app.add_api_route(
+            path or config.WEBHOOK_PATH,
+            self.handle,
+            methods=["POST"],
+            include_in_schema=False,
+        )
+
+    async def register(self, url: Optional[str] = None) -> None:
+        """
+        Регистрирует вебхук в Telegram и проверяет, что он принят
+        """
+        url = url or webhook_url()
+        await self.bot.set_webhook(
+            url,
+            secret_token=self.secret,
+            max_connections=min(100, self.max_concurrency),
+            allowed_updates=self.dp.resolve_used_update_types(),
+        )
+        info = await self.bot.get_webhook_info()
+        if info.url != url:
+            raise RuntimeError(f"Telegram registered webhook {info.url!r}, not {url!r}")
+        if info.last_error_message:
+            logger.warning(f"⚠️ Последняя ошибка вебхука: {info.last_error_message}")
+        logger.info(f"🔗 Вебхук зарегистрирован: {url}")
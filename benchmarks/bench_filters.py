@@ -0,0 +1,76 @@
+"""Microbenchmark: compiled filter engine vs. per-keyword scans.
+
+Run with ``python -m benchmarks.bench_filters [--titles N] [--repeat R]``.
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from app.filters import DEFAULT_PROFILE, EXCLUDE, FLAG, REQUIRE, CompiledFilter
+
+WORDS = (
+    "Python разработчик Senior Middle Junior DevOps инженер программист "
+    "backend Django аналитик тестировщик проектный менеджер Go data JS "
+    "ментор системный администратор удаленно временная контрактный "
+    "сетевой инженер специалист по информационной безопасности android"
+).split()
+
+
+def make_titles(count: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 7)))
+        for _ in range(count)
+    ]
+
+
+def legacy_scan(title: str) -> int:
+    """Реализация из исходного цикла get_top_vacancies()."""
+    title_lower = title.lower()
+    if any(word.lower() in title_lower for word in DEFAULT_PROFILE.exclude):
+        return EXCLUDE
+    mask = 0
+    if any(spec.lower() in title_lower for spec in DEFAULT_PROFILE.require):
+        mask |= REQUIRE
+    if any(keyword in title_lower for keyword in DEFAULT_PROFILE.flag):
+        mask |= FLAG
+    return mask
+
+
+def measure(func: Callable[[str], int], titles: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for title in titles:
+            func(title)
+        best = min(best, time.perf_counter() - start)
+    return len(titles) / best
+
+
+def run(count: int = 5000, repeat: int = 5) -> dict[str, float]:
+    titles = make_titles(count)
+    compiled = CompiledFilter(DEFAULT_PROFILE)
+    return {
+        "legacy_items_per_sec": measure(legacy_scan, titles, repeat),
+        "compiled_items_per_sec": measure(compiled.scan, titles, repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = run(args.titles, args.repeat)
+    legacy = result["legacy_items_per_sec"]
+    compiled = result["compiled_items_per_sec"]
+    print(f"titles:   {args.titles}")
+    print(f"legacy:   {legacy:,.0f} items/sec")
+    print(f"compiled: {compiled:,.0f} items/sec ({compiled / legacy:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
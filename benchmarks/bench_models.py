@@ -0,0 +1,110 @@
+"""Microbenchmark: Vacancy construction paths and memory per item.
+
+Run with ``python -m benchmarks.bench_models [--items N ...] [--repeat R]``.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from app.models import (
+    Vacancy,
+    VacancyRecord,
+    dump_vacancies_json,
+    from_records,
+    to_records,
+    validate_vacancies,
+    validate_vacancies_json,
+)
+
+
+def make_items(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": f"Python разработчик {i}",
+            "url": f"https://hh.ru/vacancy/{100000 + i}",
+            "salary": "от 150000 RUR",
+            "id": str(100000 + i),
+            "published_at": "2024-01-01T10:00:00+03:00",
+            "salary_from": 150000,
+            "salary_to": None,
+            "currency": "RUR",
+            "schedule": "remote",
+            "employment": "full",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(func: Callable[[], Any], count: int, repeat: int) -> float:
+    """Лучшее время на один элемент, мкс."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e6
+
+
+def bytes_per_item(build: Callable[[], List[Any]], count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def run(count: int = 10000, repeat: int = 5) -> Dict[str, float]:
+    items = make_items(count)
+    data = json.dumps(items).encode()
+    vacancies = validate_vacancies(items)
+    records = to_records(vacancies)
+    return {
+        "per_item_us": measure(
+            lambda: [Vacancy(**item) for item in items], count, repeat
+        ),
+        "batch_us": measure(lambda: validate_vacancies(items), count, repeat),
+        "json_loads_per_item_us": measure(
+            lambda: [Vacancy(**item) for item in json.loads(data)], count, repeat
+        ),
+        "validate_json_us": measure(
+            lambda: validate_vacancies_json(data), count, repeat
+        ),
+        "dump_per_item_us": measure(
+            lambda: [vacancy.model_dump_json() for vacancy in vacancies], count, repeat
+        ),
+        "dump_json_us": measure(lambda: dump_vacancies_json(vacancies), count, repeat),
+        "to_record_us": measure(lambda: to_records(vacancies), count, repeat),
+        "to_vacancy_us": measure(lambda: from_records(records), count, repeat),
+        "vacancy_bytes": bytes_per_item(lambda: validate_vacancies(items), count),
+        # Vacancy собираются и сразу отбрасываются: остаются записи и значения
+        "record_bytes": bytes_per_item(
+            lambda: [VacancyRecord.from_vacancy(v) for v in validate_vacancies(items)],
+            count,
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for count in args.items:
+        result = run(count, args.repeat)
+        print(f"items: {count}")
+        for name, value in result.items():
+            print(f"  {name:<24}{value:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Microbenchmark: writing and loading crawl snapshots of different sizes.
+
+Run with ``python -m benchmarks.bench_snapshot [--items N ...] [--repeat R]``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+from app.models import dump_vacancies_json, validate_vacancies, validate_vacancies_json
+from app.snapshot import load_snapshot, write_snapshot
+from benchmarks.bench_models import make_items
+
+
+def measure_ms(func: Callable[[], Any], repeat: int) -> float:
+    """Лучшее время вызова, мс."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(count: int = 10000, repeat: int = 3) -> Dict[str, float]:
+    vacancies = validate_vacancies(make_items(count))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "vacancies.jsonl.gz")
+        plain = os.path.join(directory, "vacancies.json")
+        with open(plain, "wb") as f:
+            f.write(dump_vacancies_json(vacancies))
+
+        def load_plain() -> None:
+            with open(plain, "rb") as f:
+                validate_vacancies_json(f.read())
+
+        write_ms = measure_ms(lambda: write_snapshot(path, vacancies), repeat)
+        size = os.path.getsize(path)
+        return {
+            "write_ms": write_ms,
+            "load_ms": measure_ms(lambda: load_snapshot(path), repeat),
+            # Тот же результат несжатым JSON-массивом, для сравнения
+            "load_plain_json_ms": measure_ms(load_plain, repeat),
+            "file_kb": size / 1024,
+            "plain_json_kb": os.path.getsize(plain) / 1024,
+            "bytes_per_item": size / count,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for count in args.items:
+        result = run(count, args.repeat)
+        print(f"items: {count}")
+        for name, value in result.items():
+            print(f"  {name:<24}{value:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Local stand-in for ``api.hh.ru/vacancies``.
+
+Serves generated or recorded result pages with configurable latency, error
+rate and page count, so crawls can be measured without touching hh.ru.
+
+Run standalone with ``python -m benchmarks.fake_hh --port 8081`` and point the
+app at it with ``HH_API_URL=http://127.0.0.1:8081/vacancies``.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from benchmarks.bench_filters import WORDS
+
+SKILLS = ["Python", "Django", "FastAPI", "PostgreSQL", "Docker", "Linux", "Go", "SQL"]
+SCHEDULES = ["remote", "remote", "fullDay", "flexible"]
+EMPLOYMENTS = ["part", "project", "full"]
+CURRENCIES = ["RUR", "RUR", "RUR", "USD", "EUR"]
+# Курсы в формате /dictionaries: единиц валюты за рубль
+RATES = {"RUR": 1.0, "USD": 0.0125, "EUR": 0.0115}
+
+
+def generate_items(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Генерирует элементы выдачи в формате hh.ru, от новых к старым."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    items = []
+    for index in range(count):
+        salary_from = rng.choice([None, 80000, 120000, 150000, 200000, 300000])
+        salary_to = rng.choice([None, salary_from and salary_from + 50000])
+        published = now - timedelta(minutes=5 * index)
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6)))
+        items.append(
+            {
+                "id": str(100000 + index),
+                "name": title,
+                "alternate_url": f"https://hh.ru/vacancy/{100000 + index}",
+                "published_at": published.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "salary": (
+                    {
+                        "from": salary_from,
+                        "to": salary_to,
+                        "currency": rng.choice(CURRENCIES),
+                        "gross": rng.random() < 0.5,
+                    }
+                    if salary_from or salary_to
+                    else None
+                ),
+                "employment": {"id": rng.choice(EMPLOYMENTS)},
+                "schedule": {"id": rng.choice(SCHEDULES)},
+                "experience": {"id": "between1And3"},
+            }
+        )
+    return items
+
+
+class FakeHHServer:
+    """
+    aiohttp-сервер, имитирующий список вакансий hh.ru.
+
+    latency - задержка ответа в секундах, error_rate - доля ответов 500,
+    items - записанная выдача (по умолчанию генерируется pages * per_page).
+    """
+
+    def __init__(
+        self,
+        pages: int = 20,
+        per_page: int = 100,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        items: Optional[List[Dict[str, Any]]] = None,
+        seed: int = 42,
+    ) -> None:
+        self.per_page = per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.items = items if items is not None else generate_items(pages * per_page)
+        self.requests = 0
+        self.errors = 0
+        self.detail_requests = 0
+        self._rng = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.port = 0
+
+    @classmethod
+    def from_recording(cls, path: str, **kwargs: Any) -> "FakeHHServer":
+        """Загружает выдачу из JSON-файла: список items или список страниц."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data and isinstance(data[0], dict) and "items" in data[0]:
+            data = [item for page in data for item in page["items"]]
+        return cls(items=data, **kwargs)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/vacancies"
+
+    @property
+    def pages(self) -> int:
+        return -(-len(self.items) // self.per_page)
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/vacancies", self.handle_list)
+        app.router.add_get("/vacancies/{id}", self.handle_detail)
+        app.router.add_get("/dictionaries", self.handle_dictionaries)
+        return app
+
+    async def handle_list(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"errors": [{"type": "fake"}]}, status=500)
+
+        page = int(request.query.get("page", 0))
+        per_page = int(request.query.get("per_page", self.per_page))
+        start = page * per_page
+        return web.json_response(
+            {
+                "items": self.items[start : start + per_page],
+                "found": len(self.items),
+                "page": page,
+                "pages": -(-len(self.items) // per_page),
+                "per_page": per_page,
+            }
+        )
+
+    async def handle_detail(self, request: web.Request) -> web.Response:
+        """Подробности вакансии: навыки и описание, выводимые из ID."""
+        self.detail_requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        vacancy_id = request.match_info["id"]
+        item = next((i for i in self.items if i["id"] == vacancy_id), None)
+        if item is None:
+            return web.json_response({"errors": [{"type": "not_found"}]}, status=404)
+        rng = random.Random(vacancy_id)
+        skills = rng.sample(SKILLS, 3)
+        return web.json_response(
+            {
+                **item,
+                "key_skills": [{"name": name} for name in skills],
+                "description": f"<p>Ищем разработчика: <strong>{', '.join(skills)}"
+                "</strong>.</p>",
+            }
+        )
+
+    async def handle_dictionaries(self, request: web.Request) -> web.Response:
+        """Справочник с курсами валют."""
+        return web.json_response(
+            {"currency": [{"code": code, "rate": rate} for code, rate in RATES.items()]}
+        )
+
+    async def start(self, port: int = 0) -> None:
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeHHServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--recording", help="JSON file with recorded items")
+    args = parser.parse_args()
+
+    options = dict(latency=args.latency, error_rate=args.error_rate)
+    if args.recording:
+        server = FakeHHServer.from_recording(args.recording, **options)
+    else:
+        server = FakeHHServer(pages=args.pages, **options)
+    web.run_app(server.make_app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
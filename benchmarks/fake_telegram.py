@@ -0,0 +1,269 @@
+"""Local stand-in for the Telegram Bot API.
+
+Answers the methods the bot uses (getMe, setWebhook, getWebhookInfo,
+deleteWebhook, sendMessage, editMessageText) and records every call, and can
+push updates to a registered webhook the way Telegram does, secret header
+included. Optional flood limits per chat and per bot answer 429 with
+``retry_after`` like the real API. Together with ``fake_hh`` this runs the
+bot fully offline.
+
+Run standalone with ``python -m benchmarks.fake_telegram --port 8082`` and
+point the app at it with ``TELEGRAM_API_URL=http://127.0.0.1:8082``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from app.webhook import SECRET_HEADER
+
+# Методы, на которые распространяются лимиты отправки
+LIMITED_METHODS = ("sendMessage", "editMessageText")
+
+
+def make_update(update_id: int, chat_id: int, text: str) -> Dict[str, Any]:
+    """Обновление с текстовым сообщением от пользователя в личном чате."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+            "text": text,
+            "entities": (
+                [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+                if text.startswith("/")
+                else []
+            ),
+        },
+    }
+
+
+class FloodLimit:
+    """
+    Лимит Bot API: ``rate`` сообщений в секунду с запасом ``burst`` на ключ
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._state: Dict[str, List[float]] = {}
+
+    def wait(self, key: str, now: float) -> float:
+        """
+        Через сколько секунд сообщение будет принято; 0 - можно сейчас
+        """
+        tokens, updated = self._state.get(key, [self.burst, now])
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        self._state[key] = [tokens, now]
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take(self, key: str) -> None:
+        self._state[key][0] -= 1
+
+
+class FakeTelegramServer:
+    """
+    aiohttp-сервер, имитирующий Bot API.
+
+    ``calls`` - принятые вызовы (метод и параметры), ``messages`` -
+    отправленные ботом сообщения. latency - задержка ответа в секундах.
+    С ``chat_rate`` и ``global_rate`` отправка и правка сообщений сверх
+    лимита отклоняются ответом 429, как у Telegram; ``flood_errors`` -
+    число таких ответов, ``delivered`` - принятых сообщений и правок.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        chat_rate: Optional[float] = None,
+        chat_burst: float = 1.0,
+        global_rate: Optional[float] = None,
+    ) -> None:
+        self.latency = latency
+        self.chat_limit = FloodLimit(chat_rate, chat_burst) if chat_rate else None
+        self.global_limit = (
+            FloodLimit(global_rate, global_rate) if global_rate else None
+        )
+        self.flood_errors = 0
+        self.delivered = 0
+        self.calls: List[Dict[str, Any]] = []
+        self.messages: List[Dict[str, Any]] = []
+        self.webhook: Dict[str, Any] = {"url": ""}
+        self._message_ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle_method)
+        return app
+
+    async def handle_method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        self.calls.append({"method": method, **params})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        handler = getattr(self, f"on_{method}", None)
+        if handler is None:
+            return web.json_response(
+                {"ok": False, "error_code": 404, "description": "Not Found"},
+                status=404,
+            )
+        if method in LIMITED_METHODS:
+            retry_after = self.check_flood(str(params.get("chat_id")))
+            if retry_after:
+                self.flood_errors += 1
+                return web.json_response(
+                    {
+                        "ok": False,
+                        "error_code": 429,
+                        "description": f"Too Many Requests: retry after {retry_after}",
+                        "parameters": {"retry_after": retry_after},
+                    },
+                    status=429,
+                )
+            self.delivered += 1
+        return web.json_response({"ok": True, "result": handler(params)})
+
+    def check_flood(self, chat_id: str) -> int:
+        """
+        0, если сообщение укладывается в лимиты, иначе retry_after в целых
+        секундах, как отвечает Telegram
+        """
+        now = time.monotonic()
+        limits = [
+            (limit, key)
+            for limit, key in ((self.chat_limit, chat_id), (self.global_limit, ""))
+            if limit is not None
+        ]
+        wait = max((limit.wait(key, now) for limit, key in limits), default=0.0)
+        if wait:
+            return max(1, math.ceil(wait))
+        for limit, key in limits:
+            limit.take(key)
+        return 0
+
+    def on_getMe(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}
+
+    def on_setWebhook(self, params: Dict[str, Any]) -> bool:
+        self.webhook = {
+            "url": params["url"],
+            "secret_token": params.get("secret_token"),
+            "max_connections": int(params.get("max_connections") or 40),
+        }
+        return True
+
+    def on_deleteWebhook(self, params: Dict[str, Any]) -> bool:
+        self.webhook = {"url": ""}
+        return True
+
+    def on_getWebhookInfo(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "url": self.webhook["url"],
+            "has_custom_certificate": False,
+            "pending_update_count": 0,
+        }
+
+    def on_sendMessage(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": int(params["chat_id"]), "type": "private"},
+            "text": params.get("text", ""),
+        }
+        self.messages.append(message)
+        return message
+
+    def on_editMessageText(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chat_id = int(params["chat_id"])
+        message_id = int(params["message_id"])
+        for message in self.messages:
+            if message["chat"]["id"] == chat_id and message["message_id"] == message_id:
+                message["text"] = params.get("text", "")
+                return message
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": params.get("text", ""),
+        }
+
+    async def deliver(
+        self,
+        session: aiohttp.ClientSession,
+        updates: List[Dict[str, Any]],
+        concurrency: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Отправляет обновления на зарегистрированный вебхук, держа не больше
+        max_connections запросов одновременно, как Telegram. Возвращает
+        статусы ответов.
+        """
+        url = self.webhook["url"]
+        headers = {}
+        if self.webhook.get("secret_token"):
+            headers[SECRET_HEADER] = self.webhook["secret_token"]
+        slots = asyncio.Semaphore(concurrency or self.webhook["max_connections"])
+
+        async def post(update: Dict[str, Any]) -> int:
+            async with slots:
+                async with session.post(url, json=update, headers=headers) as r:
+                    return r.status
+
+        return list(await asyncio.gather(*(post(update) for update in updates)))
+
+    async def start(self, port: int = 0) -> None:
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeTelegramServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--chat-rate", type=float, help="messages/sec per chat")
+    parser.add_argument("--chat-burst", type=float, default=1.0)
+    parser.add_argument("--global-rate", type=float, help="messages/sec per bot")
+    args = parser.parse_args()
+
+    server = FakeTelegramServer(
+        latency=args.latency,
+        chat_rate=args.chat_rate,
+        chat_burst=args.chat_burst,
+        global_rate=args.global_rate,
+    )
+    web.run_app(server.make_app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Load test: simulated Telegram users against the bot, fully offline.
+
+Starts the local hh.ru and Telegram Bot API stand-ins, the latter enforcing
+flood limits and answering 429 with ``retry_after``. It then feeds ``/start``
+updates from N concurrent users to the bot's dispatcher and fans the daily
+digest out to all of them. Reports p50/p95/p99 handler latency, time until
+the listing is delivered, hh.ru requests per user action and messages/sec
+accepted by Telegram::
+
+    python -m benchmarks.load --users 200 --presses 2 --hh-latency 0.1
+    python -m benchmarks.load --users 50 --output benchmarks/results/load.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+from unittest import mock
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from app import bot, cache, history, parser, storage, upstream
+from app.config import config
+from app.history import HistoryStore
+from app.storage import SeenStore, SubscriberStore
+from benchmarks.fake_hh import FakeHHServer
+from benchmarks.fake_telegram import FakeTelegramServer, make_update
+from benchmarks.run import Results, git_commit
+
+TOKEN = "42:load-test"
+FIRST_CHAT_ID = 1000
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу; для пустого списка 0."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(q / 100 * len(ordered))) - 1]
+
+
+def latency_stats(prefix: str, values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 и максимум в миллисекундах."""
+    stats = {f"{prefix}_p{q}_ms": percentile(values, q) * 1000 for q in (50, 95, 99)}
+    stats[f"{prefix}_max_ms"] = max(values, default=0.0) * 1000
+    return stats
+
+
+@contextmanager
+def isolated_bot(telegram_bot: Bot, hh_url: str) -> Iterator[None]:
+    """
+    Подменяет глобальное состояние бота: Bot API и hh.ru - заглушки,
+    хранилища в памяти, кэши выдачи пустые и без снимков на диске.
+    """
+    with ExitStack() as stack:
+        patches = [
+            (config, "HH_API_URL", hh_url),
+            (config, "RATES_TTL", 0.0),
+            (storage, "_subscriber_store", SubscriberStore(":memory:")),
+            (storage, "_seen_store", SeenStore(":memory:")),
+            (history, "_store", HistoryStore(":memory:")),
+            (upstream, "_client", None),
+            (parser, "_session", None),
+            (parser, "_last_good", None),
+            (
+                cache,
+                "vacancy_cache",
+                cache.VacancyCache(
+                    cache.load_vacancies,
+                    ttl=config.CACHE_TTL,
+                    partial_ttl=config.CACHE_PARTIAL_TTL,
+                ),
+            ),
+            (
+                cache,
+                "salary_cache",
+                cache.VacancyCache(
+                    cache.load_ranked_vacancies,
+                    ttl=config.CACHE_TTL,
+                    partial_ttl=config.CACHE_PARTIAL_TTL,
+                    key="vacancies:salary",
+                ),
+            ),
+            (bot, "_bot", telegram_bot),
+            (bot, "_provider", None),
+            (bot, "_broadcaster", None),
+            (bot, "_jobs", None),
+        ]
+        for target, name, value in patches:
+            stack.enter_context(mock.patch.object(target, name, value))
+        yield
+
+
+async def simulate_start(
+    telegram_bot: Bot,
+    hh: FakeHHServer,
+    telegram: FakeTelegramServer,
+    users: int,
+    presses: int,
+    think: float,
+    ramp: float,
+) -> Dict[str, float]:
+    """
+    Каждый пользователь жмёт /start ``presses`` раз с паузой ``think``;
+    пользователи приходят равномерно за ``ramp`` секунд.
+    """
+    dp = bot.get_dispatcher()
+    update_ids = itertools.count(1)
+    handler: List[float] = []
+    delivery: List[float] = []
+    errors = 0
+    waiters: List["asyncio.Task[None]"] = []
+    hh_before = hh.requests
+    delivered_before = telegram.delivered
+    flood_before = telegram.flood_errors
+
+    async def delivered(job: "asyncio.Task[None]", pressed: float) -> None:
+        await asyncio.wait([job])
+        delivery.append(time.perf_counter() - pressed)
+
+    async def user(index: int) -> None:
+        nonlocal errors
+        chat_id = FIRST_CHAT_ID + index
+        await asyncio.sleep(ramp * index / users)
+        for press in range(presses):
+            if press:
+                await asyncio.sleep(think)
+            update = make_update(next(update_ids), chat_id, "/start")
+            pressed = time.perf_counter()
+            try:
+                await dp.feed_raw_update(telegram_bot, update)
+            except Exception:
+                errors += 1
+            handler.append(time.perf_counter() - pressed)
+            job = bot.get_jobs().get(str(chat_id))
+            if job is not None:
+                waiters.append(asyncio.create_task(delivered(job, pressed)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(users)))
+    await asyncio.gather(*waiters)
+    elapsed = time.perf_counter() - started
+
+    actions = users * presses
+    messages = telegram.delivered - delivered_before
+    return {
+        "users": float(users),
+        "actions": float(actions),
+        "wall_time_s": elapsed,
+        **latency_stats("handler", handler),
+        **latency_stats("delivery", delivery),
+        "handler_errors": float(errors),
+        "hh_requests": float(hh.requests - hh_before),
+        "hh_requests_per_action": (hh.requests - hh_before) / actions,
+        "messages": float(messages),
+        "messages_per_sec": messages / elapsed,
+        "flood_errors": float(telegram.flood_errors - flood_before),
+    }
+
+
+async def simulate_digest(
+    hh: FakeHHServer, telegram: FakeTelegramServer
+) -> Dict[str, float]:
+    """
+    Ежедневная рассылка всем подписавшимся через /start
+    """
+    hh_before = hh.requests
+    delivered_before = telegram.delivered
+    flood_before = telegram.flood_errors
+
+    started = time.perf_counter()
+    await bot.send_daily_vacancies()
+    elapsed = time.perf_counter() - started
+
+    messages = telegram.delivered - delivered_before
+    return {
+        "subscribers": float(len(storage.get_subscriber_store())),
+        "wall_time_s": elapsed,
+        "hh_requests": float(hh.requests - hh_before),
+        "messages": float(messages),
+        "messages_per_sec": messages / elapsed,
+        "flood_errors": float(telegram.flood_errors - flood_before),
+    }
+
+
+async def run_load(
+    users: int = 100,
+    presses: int = 2,
+    think: float = 0.5,
+    ramp: float = 0.0,
+    pages: int = 5,
+    hh_latency: float = 0.05,
+    telegram_latency: float = 0.0,
+    chat_rate: Optional[float] = 1.0,
+    chat_burst: float = 3.0,
+    global_rate: Optional[float] = 30.0,
+    digest: bool = True,
+) -> Results:
+    async with FakeHHServer(pages=pages, latency=hh_latency) as hh:
+        async with FakeTelegramServer(
+            latency=telegram_latency,
+            chat_rate=chat_rate,
+            chat_burst=chat_burst,
+            global_rate=global_rate,
+        ) as telegram:
+            session = AiohttpSession(api=TelegramAPIServer.from_base(telegram.url))
+            telegram_bot = Bot(token=TOKEN, session=session)
+            try:
+                with isolated_bot(telegram_bot, hh.url):
+                    results = {
+                        "start": await simulate_start(
+                            telegram_bot, hh, telegram, users, presses, think, ramp
+                        )
+                    }
+                    if digest:
+                        results["digest"] = await simulate_digest(hh, telegram)
+                    await bot.close()
+                    await parser.close_session()
+            finally:
+                await session.close()
+    return results
+
+
+def main() -> None:
+    parser_ = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser_.add_argument("--users", type=int, default=100)
+    parser_.add_argument("--presses", type=int, default=2, help="/start per user")
+    parser_.add_argument("--think", type=float, default=0.5)
+    parser_.add_argument("--ramp", type=float, default=0.0)
+    parser_.add_argument("--pages", type=int, default=5)
+    parser_.add_argument("--hh-latency", type=float, default=0.05)
+    parser_.add_argument("--telegram-latency", type=float, default=0.0)
+    parser_.add_argument("--chat-rate", type=float, default=1.0)
+    parser_.add_argument("--chat-burst", type=float, default=3.0)
+    parser_.add_argument("--global-rate", type=float, default=30.0)
+    parser_.add_argument("--no-digest", action="store_true")
+    parser_.add_argument("--output", help="write JSON results to this file")
+    args = parser_.parse_args()
+
+    # Ожидания flood control - ожидаемая часть нагрузки, не ошибки
+    logging.basicConfig(level=logging.ERROR)
+    results = asyncio.run(
+        run_load(
+            users=args.users,
+            presses=args.presses,
+            think=args.think,
+            ramp=args.ramp,
+            pages=args.pages,
+            hh_latency=args.hh_latency,
+            telegram_latency=args.telegram_latency,
+            chat_rate=args.chat_rate,
+            chat_burst=args.chat_burst,
+            global_rate=args.global_rate,
+            digest=not args.no_digest,
+        )
+    )
+
+    for group, metrics in results.items():
+        for name, value in metrics.items():
+            print(f"{group}.{name:<28} {value:>14.2f}")
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "options": vars(args),
+            "results": results,
+        }
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Результаты записаны в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
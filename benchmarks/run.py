@@ -0,0 +1,216 @@
+"""Offline benchmark suite.
+
+Measures crawl wall time and pages/sec against the local hh.ru stand-in,
+filter throughput, ``Vacancy`` construction cost, ``format_vacancy_message``,
+digest packing cost and full-text search over the vacancy history. Results
+are written as JSON so runs can be compared between commits::
+
+    python -m benchmarks.run --output benchmarks/results/current.json
+    python -m benchmarks.run --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+from unittest import mock
+
+import aiohttp
+
+from app import history, salary
+from app.config import config
+from app.history import HistoryStore
+from app.messages import DigestCache, format_vacancy_message
+from app.models import Vacancy
+from app.parser import crawl_top_vacancies
+from app.upstream import UpstreamClient
+from benchmarks import bench_filters
+from benchmarks.fake_hh import FakeHHServer, generate_items
+
+Results = Dict[str, Dict[str, float]]
+
+
+def per_call(func: Callable[[], Any], count: int, repeat: int = 3) -> float:
+    """Лучшее время одного вызова в микросекундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(count):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e6
+
+
+async def bench_crawl(
+    pages: int, latency: float, error_rate: float, concurrency: int
+) -> Dict[str, float]:
+    async with FakeHHServer(
+        pages=pages, latency=latency, error_rate=error_rate
+    ) as server:
+        with ExitStack() as stack, tempfile.TemporaryDirectory() as directory:
+            # Вакансии заглушки не должны попасть в настоящую историю, а
+            # обход - обновлять data/rates.json и запрашивать /dictionaries
+            patches = [
+                (config, "HH_API_URL", server.url),
+                (config, "RATES_TTL", 0.0),
+                (config, "RATES_PATH", os.path.join(directory, "rates.json")),
+                (salary, "_rates", salary.RateTable()),
+                (history, "_store", HistoryStore(":memory:")),
+            ]
+            for target, name, value in patches:
+                stack.enter_context(mock.patch.object(target, name, value))
+            async with aiohttp.ClientSession() as session:
+                start = time.perf_counter()
+                # Свой клиент: лимит AIMD не упирается в CRAWL_CONCURRENCY
+                result = await crawl_top_vacancies(
+                    session,
+                    limit=10**9,
+                    concurrency=concurrency,
+                    client=UpstreamClient(max_concurrency=concurrency),
+                )
+                elapsed = time.perf_counter() - start
+
+    return {
+        "wall_time_s": elapsed,
+        "pages": server.requests,
+        "pages_per_sec": server.requests / elapsed,
+        "vacancies": len(result.vacancies),
+        "failed_pages": result.failed_pages,
+        "upstream_errors": server.errors,
+    }
+
+
+def bench_models(count: int = 10000) -> Dict[str, float]:
+    data = {
+        "title": "Python разработчик",
+        "url": "https://hh.ru/vacancy/100000",
+        "salary": "от 150000 RUR",
+        "id": "100000",
+    }
+    vacancy = Vacancy(**data)
+    digest = [vacancy] * config.MAX_VACANCIES
+    cache = DigestCache()
+    return {
+        "vacancy_construct_us": per_call(lambda: Vacancy(**data), count),
+        "format_message_us": per_call(lambda: format_vacancy_message(vacancy), count),
+        "pack_digest_us": per_call(
+            lambda: DigestCache().render(digest), count // config.MAX_VACANCIES
+        ),
+        "cached_digest_us": per_call(lambda: cache.render(digest), count),
+    }
+
+
+def bench_search(count: int = 20000, repeat: int = 200) -> Dict[str, float]:
+    vacancies = [
+        Vacancy(
+            title=item["name"],
+            url=item["alternate_url"],
+            salary="-",
+            id=item["id"],
+            published_at=item["published_at"],
+            schedule=item["schedule"]["id"],
+            employment=item["employment"]["id"],
+        )
+        for item in generate_items(count)
+    ]
+    store = HistoryStore(":memory:")
+    start = time.perf_counter()
+    store.add(vacancies)
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": float(len(store)),
+        "insert_per_1k_ms": elapsed / count * 1000 * 1000,
+        "search_ms": per_call(lambda: store.search("python remote"), repeat) / 1000,
+        "search_narrow_ms": per_call(
+            lambda: store.search("devops сетевой инженер"), repeat
+        )
+        / 1000,
+    }
+
+
+def run_suite(
+    pages: int = 20,
+    latency: float = 0.05,
+    error_rate: float = 0.0,
+    concurrency: Optional[int] = None,
+) -> Results:
+    concurrency = concurrency or config.CRAWL_CONCURRENCY
+    crawl = asyncio.run(bench_crawl(pages, latency, error_rate, concurrency))
+    crawl["concurrency"] = concurrency
+    crawl["latency_s"] = latency
+    return {
+        "crawl": crawl,
+        "filters": bench_filters.run(count=5000, repeat=3),
+        "models": bench_models(),
+        "search": bench_search(),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Results, baseline: Results) -> None:
+    for group, metrics in current.items():
+        for name, value in metrics.items():
+            old = baseline.get(group, {}).get(name)
+            if not old:
+                continue
+            change = (value - old) / old * 100
+            print(f"{group}.{name:<24} {old:>14.2f} -> {value:>14.2f} ({change:+.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args()
+
+    results = run_suite(args.pages, args.latency, args.error_rate, args.concurrency)
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+    for group, metrics in results.items():
+        for name, value in metrics.items():
+            print(f"{group}.{name:<24} {value:>14.2f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Результаты записаны в {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        print(f"\nСравнение с {args.compare}:")
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Shared fixtures and test data factories."""
+
+import asyncio
+
+import pytest
+
+from app import cache, history, parser, salary, upstream
+from app.config import config
+from app.models import Vacancy
+
+
+def make_vacancy(index=1, title=None, salary="-", **fields):
+    """Vacancy with an hh.ru-like id and url; other fields by keyword."""
+    return Vacancy(
+        title=title or f"Python {index}",
+        url=f"https://hh.ru/vacancy/{index}",
+        salary=salary,
+        id=str(index),
+        **fields,
+    )
+
+
+def make_vacancies(title, count=1, **fields):
+    """Vacancies titled "<title> 0", "<title> 1" and so on."""
+    return [make_vacancy(index, f"{title} {index}", **fields) for index in range(count)]
+
+
+class CountingLoader:
+    """Cache loader that counts its calls; results are titled by call number."""
+
+    def __init__(self, tag="load", delay=0.01, count=1):
+        self.tag = tag
+        self.delay = delay
+        self.count = count
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return make_vacancies(f"{self.tag} {self.calls}", self.count)
+
+
+@pytest.fixture(autouse=True)
+def fresh_upstream(monkeypatch):
+    """Give every test its own hh.ru client state, history and no retry delays."""
+    # Снимки кэшей проверяются отдельно, на временных файлах
+    monkeypatch.setattr(cache.vacancy_cache, "snapshot", None)
+    monkeypatch.setattr(cache.salary_cache, "snapshot", None)
+    monkeypatch.setattr(config, "HH_RETRY_BASE_DELAY", 0.0)
+    # Курсы по умолчанию, без обращений к /dictionaries
+    monkeypatch.setattr(config, "RATES_TTL", 0.0)
+    monkeypatch.setattr(salary, "_rates", salary.RateTable())
+    monkeypatch.setattr(upstream, "_client", None)
+    monkeypatch.setattr(history, "_store", history.HistoryStore(":memory:"))
+    monkeypatch.setattr(parser, "_last_good", None)
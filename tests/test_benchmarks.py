@@ -0,0 +1,139 @@
+"""Tests for the offline benchmark suite and local hh.ru stand-in."""
+
+import aiohttp
+import pytest
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramRetryAfter
+
+from app import salary
+from app.config import config
+from app.parser import fetch_top_vacancies, parse_item
+from benchmarks.fake_hh import FakeHHServer, generate_items
+from benchmarks.fake_telegram import FakeTelegramServer
+from benchmarks.load import percentile, run_load
+from benchmarks.run import bench_crawl, run_suite
+
+
+class TestFakeHHServer:
+    """Test cases for FakeHHServer."""
+
+    async def test_full_crawl_matches_direct_filtering(self, monkeypatch):
+        """Test that crawling the fake server sees every generated page."""
+        async with FakeHHServer(pages=5) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                result = await fetch_top_vacancies(session, limit=10**6)
+
+        expected = [v for v in map(parse_item, server.items) if v is not None]
+        assert [v.id for v in result] == [v.id for v in expected]
+        assert server.requests == 5
+
+    async def test_error_rate(self, monkeypatch):
+        """Test that injected upstream errors reach the crawler."""
+        async with FakeHHServer(pages=2, error_rate=1.0) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                assert await fetch_top_vacancies(session) is None
+        assert server.errors >= 1
+
+    def test_recording(self, tmp_path):
+        """Test loading a recorded list of pages."""
+        path = tmp_path / "pages.json"
+        path.write_text(
+            '[{"items": [{"id": "1"}]}, {"items": [{"id": "2"}]}]', encoding="utf-8"
+        )
+        server = FakeHHServer.from_recording(str(path), per_page=1)
+        assert [item["id"] for item in server.items] == ["1", "2"]
+        assert server.pages == 2
+
+    def test_generated_items_are_newest_first(self):
+        """Test that generated items are ordered by publication time."""
+        items = generate_items(10)
+        published = [item["published_at"] for item in items]
+        assert published == sorted(published, reverse=True)
+
+
+class TestFakeTelegramServer:
+    """Test cases for the Bot API stand-in."""
+
+    async def test_flood_limit(self):
+        """Test that messages over the chat limit get 429 with retry_after."""
+        async with FakeTelegramServer(chat_rate=1, chat_burst=2) as telegram:
+            session = AiohttpSession(api=TelegramAPIServer.from_base(telegram.url))
+            bot = Bot(token="42:test-token", session=session)
+            try:
+                await bot.send_message(1, "a")
+                await bot.send_message(1, "b")
+                with pytest.raises(TelegramRetryAfter) as error:
+                    await bot.send_message(1, "c")
+                # Лимит считается по чату
+                await bot.send_message(2, "d")
+            finally:
+                await session.close()
+
+        assert error.value.retry_after == 1
+        assert telegram.flood_errors == 1
+        assert telegram.delivered == 3
+        assert [m["text"] for m in telegram.messages] == ["a", "b", "d"]
+
+
+class TestSuite:
+    """Smoke test for the benchmark runner."""
+
+    def test_run_suite_reports_all_groups(self):
+        """Test that the suite produces every result group."""
+        results = run_suite(pages=2, latency=0.0)
+
+        assert results["crawl"]["pages"] >= 2
+        assert results["crawl"]["pages_per_sec"] > 0
+        assert results["filters"]["compiled_items_per_sec"] > 0
+        assert results["models"]["vacancy_construct_us"] > 0
+        assert results["models"]["format_message_us"] > 0
+        assert results["search"]["search_ms"] > 0
+
+    async def test_crawl_keeps_rates(self, monkeypatch, tmp_path):
+        """Test that the crawl benchmark does not refresh or save real rates."""
+        path = tmp_path / "rates.json"
+        monkeypatch.setattr(config, "RATES_TTL", 86400.0)
+        monkeypatch.setattr(config, "RATES_PATH", str(path))
+        rates = salary.get_rates()
+
+        await bench_crawl(pages=2, latency=0.0, error_rate=0.0, concurrency=2)
+
+        assert not path.exists()
+        assert salary.get_rates() is rates
+
+
+class TestLoad:
+    """Smoke test for the load-test driver."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 95) == 0.0
+
+    async def test_run_load(self):
+        """Test that concurrent /start presses share one crawl and get replies."""
+        results = await run_load(
+            users=4,
+            presses=2,
+            think=0.0,
+            pages=2,
+            hh_latency=0.05,
+            chat_rate=None,
+            global_rate=None,
+        )
+
+        start, digest = results["start"], results["digest"]
+        assert start["actions"] == 8
+        assert start["handler_errors"] == 0
+        assert 0 < start["handler_p50_ms"] <= start["handler_p99_ms"]
+        # Один обход на всех пользователей, а не по обходу на нажатие
+        assert start["hh_requests_per_action"] < 1
+        assert start["messages"] >= 8
+        assert digest["subscribers"] == 4
+        assert digest["messages"] >= 4
@@ -0,0 +1,144 @@
+"""Tests for vacancy result cache."""
+
+import asyncio
+
+from app.cache import VacancyCache
+from app.models import VacancyRecord
+from tests.conftest import CountingLoader, make_vacancies, make_vacancy
+
+
+class TestVacancyCache:
+    """Test cases for VacancyCache."""
+
+    async def test_concurrent_misses_share_one_load(self):
+        """Test that concurrent callers join the in-flight load."""
+        loader = CountingLoader()
+        cache = VacancyCache(loader, ttl=60)
+
+        results = await asyncio.gather(*(cache.get() for _ in range(10)))
+
+        assert loader.calls == 1
+        assert all(r[0].title == "load 1 0" for r in results)
+        assert cache.misses == 10
+
+    async def test_fresh_hit(self):
+        """Test that a fresh value is served without loading."""
+        loader = CountingLoader()
+        cache = VacancyCache(loader, ttl=60)
+        await cache.get()
+        await cache.get()
+
+        assert loader.calls == 1
+        assert cache.hits == 1
+
+    async def test_stale_while_revalidate(self):
+        """Test that an expired value is returned while refreshing."""
+        loader = CountingLoader()
+        cache = VacancyCache(loader, ttl=0)
+        await cache.get()
+
+        stale = await cache.get()
+        assert stale[0].title == "load 1 0"
+        assert cache.stale_hits == 1
+
+        await asyncio.sleep(0.05)
+        assert loader.calls == 2
+        assert (await cache.get())[0].title == "load 2 0"
+
+    async def test_failed_load_keeps_last_value(self):
+        """Test that an empty reload does not drop the cached result."""
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return make_vacancies("ok") if len(calls) == 1 else None
+
+        cache = VacancyCache(loader, ttl=0)
+        await cache.get()
+        await cache.refresh()
+
+        assert (await cache.get())[0].title == "ok 0"
+
+
+class TestStreaming:
+    """Test cases for streaming partial results."""
+
+    async def test_stream_yields_before_load_finishes(self):
+        """Test that published vacancies reach the stream during the load."""
+        release = asyncio.Event()
+        received = []
+
+        async def loader():
+            first = make_vacancy(1, "first")
+            cache.publish(first)
+            await release.wait()
+            second = make_vacancy(2, "second")
+            cache.publish(second)
+            return [first, second]
+
+        cache = VacancyCache(loader, ttl=60)
+
+        async def consume():
+            async for vacancy in cache.stream():
+                received.append(vacancy.title)
+                if len(received) == 1:
+                    release.set()
+
+        await asyncio.wait_for(consume(), timeout=1)
+
+        assert received == ["first", "second"]
+        assert cache.loads == 1
+
+    async def test_get_reports_progress(self):
+        """Test that a waiting get() sees the count of published vacancies."""
+        counts = []
+
+        async def loader():
+            for index, tag in enumerate(("first", "second")):
+                cache.publish(make_vacancy(index, tag))
+                await asyncio.sleep(0.01)
+            return [make_vacancy(2, "done")]
+
+        cache = VacancyCache(loader, ttl=60)
+        result = await cache.get(on_progress=counts.append)
+
+        assert result[0].title == "done"
+        assert counts == [0, 1, 2]
+
+    async def test_stream_from_cached_value(self):
+        """Test that a cached result is streamed without reloading."""
+        loader = CountingLoader()
+        cache = VacancyCache(loader, ttl=60)
+        await cache.get()
+
+        titles = [v.title async for v in cache.stream()]
+
+        assert titles == ["load 1 0"]
+        assert loader.calls == 1
+
+    async def test_keeps_compact_records(self):
+        """Test that the cache holds records and hands out its own vacancies."""
+        loader = CountingLoader()
+        cache = VacancyCache(loader, ttl=60)
+        loaded = await cache.get()
+
+        first = await cache.get()
+        first[0].title = "changed"
+        second = await cache.get()
+
+        assert all(isinstance(r, VacancyRecord) for r in cache._records)
+        assert cache._partial == []
+        assert second == loaded
+        assert second[0] is not first[0]
+
+    async def test_etag_changes_with_result(self):
+        """Test that the ETag follows the cached result set."""
+        loader = CountingLoader()
+        cache = VacancyCache(loader, ttl=60)
+
+        await cache.get()
+        first = cache.etag
+        await cache.refresh()
+
+        assert first is not None
+        assert cache.etag != first
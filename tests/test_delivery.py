@@ -0,0 +1,143 @@
+"""Tests for rate-limited delivery."""
+
+import time
+from datetime import datetime, timezone
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from app import bot as bot_module
+from app import storage
+from app.delivery import Broadcaster, TokenBucket
+from app.queries import CrawlDelta
+from app.storage import SeenStore, SubscriberStore
+from tests.conftest import make_vacancies
+
+
+class FakeBot:
+    def __init__(self, retry_after=None, forbidden=(), broken=()):
+        self.sent = []
+        self.retry_after = dict(retry_after or {})
+        self.forbidden = set(forbidden)
+        self.broken = set(broken)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        method = SendMessage(chat_id=chat_id, text=text)
+        if chat_id in self.forbidden:
+            raise TelegramForbiddenError(method, "bot was blocked by the user")
+        if chat_id in self.broken:
+            raise RuntimeError("connection reset")
+        if self.retry_after.get(chat_id):
+            self.retry_after[chat_id] -= 1
+            raise TelegramRetryAfter(method, "Too Many Requests", retry_after=0)
+        self.sent.append((chat_id, text))
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+
+    async def test_burst_then_rate(self):
+        """Test that capacity is served at once and the rest at the rate."""
+        bucket = TokenBucket(rate=100, capacity=5)
+        start = time.monotonic()
+        for _ in range(10):
+            await bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        assert 0.04 <= elapsed < 0.5
+
+    async def test_pause(self):
+        """Test that pause blocks token issue."""
+        bucket = TokenBucket(rate=1000, capacity=10)
+        bucket.pause(0.05)
+        start = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - start >= 0.04
+
+
+class TestBroadcaster:
+    """Test cases for Broadcaster."""
+
+    async def test_broadcast_keeps_per_chat_order(self):
+        """Test that every chat gets all messages in order."""
+        bot = FakeBot()
+        broadcaster = Broadcaster(bot, global_rate=1000, chat_rate=1000)
+        messages = [("a", {}), ("b", {}), ("c", {})]
+
+        report = await broadcaster.broadcast(["1", "2", "3"], messages)
+
+        assert report.chats == 3
+        assert report.sent == 9
+        for chat_id in ("1", "2", "3"):
+            assert [t for c, t in bot.sent if c == chat_id] == ["a", "b", "c"]
+
+    async def test_retry_after_is_honoured(self):
+        """Test that RetryAfter is retried instead of failing."""
+        bot = FakeBot(retry_after={"1": 2})
+        broadcaster = Broadcaster(bot, global_rate=1000, chat_rate=1000)
+
+        report = await broadcaster.broadcast(["1"], [("a", {})])
+
+        assert report.sent == 1
+        assert report.failed == 0
+
+    async def test_blocked_chat_is_reported(self):
+        """Test that chats which blocked the bot are reported."""
+        removed = []
+        bot = FakeBot(forbidden={"2"})
+        broadcaster = Broadcaster(
+            bot, global_rate=1000, chat_rate=1000, on_blocked=removed.append
+        )
+
+        report = await broadcaster.broadcast(["1", "2"], [("a", {})])
+
+        assert report.sent == 1
+        assert report.blocked == ["2"]
+        assert removed == ["2"]
+
+
+class TestDailyDigest:
+    """Test cases for committing the daily delta after delivery."""
+
+    async def send_digest(self, monkeypatch, telegram_bot):
+        delta = CrawlDelta(
+            make_vacancies("Python разработчик", 2),
+            datetime(2024, 1, 1, 6, 0, tzinfo=timezone.utc),
+            {"python@1": datetime(2024, 1, 1, 6, 0, tzinfo=timezone.utc)},
+        )
+
+        async def fetch_new_vacancies():
+            return delta
+
+        subscribers = SubscriberStore(":memory:")
+        subscribers.add("1")
+        subscribers.add("2")
+        seen = SeenStore(":memory:")
+        monkeypatch.setattr(storage, "_subscriber_store", subscribers)
+        monkeypatch.setattr(storage, "_seen_store", seen)
+        monkeypatch.setattr(bot_module, "fetch_new_vacancies", fetch_new_vacancies)
+        monkeypatch.setattr(
+            bot_module,
+            "_broadcaster",
+            Broadcaster(telegram_bot, global_rate=1000, chat_rate=1000),
+        )
+
+        await bot_module.send_daily_vacancies()
+        return delta, seen
+
+    async def test_delivered_digest_is_committed(self, monkeypatch):
+        """Test that vacancies are marked seen once every chat got the digest."""
+        delta, seen = await self.send_digest(monkeypatch, FakeBot())
+
+        assert seen.unseen(delta.vacancies) == []
+        assert seen.last_crawl() == delta.started_at
+        assert seen.last_crawl("python@1") == delta.started_at
+
+    async def test_failed_delivery_keeps_vacancies_new(self, monkeypatch):
+        """Test that a failed fan-out leaves the delta for the next digest."""
+        telegram_bot = FakeBot(broken={"2"})
+        delta, seen = await self.send_digest(monkeypatch, telegram_bot)
+
+        assert {chat_id for chat_id, _ in telegram_bot.sent} == {"1"}
+        assert seen.unseen(delta.vacancies) == delta.vacancies
+        assert seen.last_crawl() is None
@@ -0,0 +1,125 @@
+"""Tests for vacancy detail enrichment."""
+
+import asyncio
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.config import config
+from app.details import DetailEnricher, DetailStore, VacancyDetails
+from app.filters import CompiledFilter, FilterProfile
+from app.parser import iter_top_vacancies
+from app.queries import QuerySpec
+from benchmarks.fake_hh import EMPLOYMENTS, SCHEDULES, FakeHHServer
+
+
+def make_item(index, published="2024-01-01T10:00:00+0300"):
+    return {"id": str(index), "published_at": published}
+
+
+class TestDetailStore:
+    """Test cases for DetailStore."""
+
+    def test_from_api_strips_markup(self):
+        """Test that the description is stored as plain text."""
+        details = VacancyDetails.from_api(
+            {
+                "key_skills": [{"name": "Python"}, {"name": ""}],
+                "description": "<p>Ищем <b>Python</b>&nbsp;разработчика</p>",
+            }
+        )
+        assert details.key_skills == ("Python",)
+        assert details.description == "Ищем Python разработчика"
+
+    def test_invalidated_by_stamp(self, tmp_path):
+        """Test that a changed updated_at invalidates cached details."""
+        store = DetailStore(str(tmp_path / "details.db"))
+        store.put("1", "v1", VacancyDetails(("Go",), "text"))
+
+        assert store.get_many({"1": "v1"})["1"].key_skills == ("Go",)
+        assert store.get_many({"1": "v2"}) == {}
+        assert store.get_many({"2": "v1"}) == {}
+
+
+class TestDetailEnricher:
+    """Test cases for DetailEnricher."""
+
+    async def test_downloads_each_vacancy_once(self, tmp_path):
+        """Test that cached details are not requested again."""
+        async with FakeHHServer(pages=1, per_page=5) as server:
+            items = server.items
+            enricher = DetailEnricher(
+                DetailStore(str(tmp_path / "details.db")), url=server.url
+            )
+            async with aiohttp.ClientSession() as session:
+                first = await enricher.enrich(session, items)
+                second = await enricher.enrich(session, items)
+                assert server.detail_requests == 5
+
+                changed = [{**items[0], "published_at": "2030-01-01T00:00:00+0000"}]
+                await enricher.enrich(session, changed)
+                assert server.detail_requests == 6
+
+        assert first == second
+        assert all(len(details.key_skills) == 3 for details in first.values())
+
+    async def test_bounded_concurrency(self, tmp_path):
+        """Test that at most `concurrency` detail requests run at once."""
+        running = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return web.json_response({"key_skills": [], "description": ""})
+
+        app = web.Application()
+        app.router.add_get("/vacancies/{id}", handler)
+        async with TestServer(app) as server:
+            enricher = DetailEnricher(
+                DetailStore(str(tmp_path / "details.db")),
+                concurrency=2,
+                url=str(server.make_url("/vacancies")),
+            )
+            async with aiohttp.ClientSession() as session:
+                details = await enricher.enrich(session, map(make_item, range(8)))
+
+        assert len(details) == 8
+        assert peak == 2
+
+    async def test_crawl_filters_on_details(self, tmp_path, monkeypatch):
+        """Test that skill rules run on enriched candidates only."""
+        rules = CompiledFilter(
+            FilterProfile(
+                name="django",
+                employment=tuple(EMPLOYMENTS),
+                schedule=tuple(SCHEDULES),
+                skills=("Django",),
+            )
+        )
+        async with FakeHHServer(pages=1, per_page=20) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            enricher = DetailEnricher(
+                DetailStore(str(tmp_path / "details.db")), url=server.url
+            )
+            async with aiohttp.ClientSession() as session:
+                found = [
+                    vacancy
+                    async for vacancy in iter_top_vacancies(
+                        session,
+                        limit=100,
+                        concurrency=1,
+                        rules=rules,
+                        query=QuerySpec("python"),
+                        enricher=enricher,
+                    )
+                ]
+            requested = server.detail_requests
+
+        assert requested == 20
+        assert 0 < len(found) < 20
+        assert all("Django" in vacancy.key_skills for vacancy in found)
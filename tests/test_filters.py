@@ -0,0 +1,103 @@
+"""Tests for compiled filter engine."""
+
+import json
+
+import pytest
+
+from app.filters import (
+    DEFAULT_PROFILE,
+    EXCLUDE,
+    FLAG,
+    REQUIRE,
+    CompiledFilter,
+    FilterProfile,
+    load_profiles,
+)
+from benchmarks.bench_filters import legacy_scan, make_titles
+
+
+class TestCompiledFilter:
+    """Test cases for CompiledFilter."""
+
+    def test_matches_legacy_scan(self):
+        """Test that the compiled engine agrees with per-keyword scans."""
+        compiled = CompiledFilter(DEFAULT_PROFILE)
+        for title in make_titles(2000):
+            assert compiled.scan(title) == legacy_scan(title), title
+
+    def test_overlapping_keywords(self):
+        """Test that overlapping and prefix keywords are all detected."""
+        profile = FilterProfile(
+            name="overlap", require=("разработчик",), flag=("разраб", "чикаго")
+        )
+        compiled = CompiledFilter(profile)
+        assert compiled.scan("Разработчикаго") == REQUIRE | FLAG
+
+    def test_exclude_wins(self):
+        """Test that an excluded word rejects the title."""
+        compiled = CompiledFilter(DEFAULT_PROFILE)
+        assert compiled.scan("Python разработчик (JS)") & EXCLUDE
+        assert not compiled.match_title("Python разработчик (JS)")
+        assert compiled.match_title("Python разработчик")
+
+    def test_empty_require_accepts(self):
+        """Test that a profile without required words accepts any title."""
+        compiled = CompiledFilter(FilterProfile(name="any", exclude=("1с",)))
+        assert compiled.match_title("Go developer")
+        assert not compiled.match_title("Программист 1С")
+
+    def test_employment_and_schedule(self):
+        """Test attribute filters."""
+        compiled = CompiledFilter(DEFAULT_PROFILE)
+        assert compiled.allows_schedule("remote")
+        assert compiled.allows_schedule("")
+        assert not compiled.allows_schedule("fullDay")
+        assert not compiled.allows_employment("full")
+
+    def test_empty_employment_and_schedule_accept(self):
+        """Test that a profile without attribute rules accepts any value."""
+        profile = FilterProfile.from_dict("devops", {"require": ["devops"]})
+        compiled = CompiledFilter(profile)
+        assert compiled.allows_employment("full")
+        assert compiled.allows_schedule("remote")
+        assert compiled.allows_schedule("fullDay")
+
+    def test_match_details(self):
+        """Test key skill and description rules."""
+        compiled = CompiledFilter(
+            FilterProfile(
+                name="skills", skills=("Django",), description_exclude=("1с",)
+            )
+        )
+        assert compiled.needs_details
+        assert compiled.match_details(["python", "django"], "REST API")
+        assert not compiled.match_details(["Go"], "REST API")
+        assert not compiled.match_details(["Django"], "Интеграция с 1С")
+        assert not CompiledFilter(DEFAULT_PROFILE).needs_details
+
+
+class TestLoadProfiles:
+    """Test cases for loading named profiles."""
+
+    def test_default_only(self):
+        """Test that the default profile is always present."""
+        assert load_profiles("") == {"default": DEFAULT_PROFILE}
+
+    def test_load_from_file(self, tmp_path):
+        """Test loading profiles from a JSON file."""
+        path = tmp_path / "profiles.json"
+        path.write_text(
+            json.dumps({"devops": {"require": ["devops"], "schedule": ["remote"]}}),
+            encoding="utf-8",
+        )
+
+        profiles = load_profiles(str(path))
+
+        assert profiles["devops"].require == ("devops",)
+        assert profiles["devops"].schedule == ("remote",)
+        assert "default" in profiles
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing profiles file raises an error."""
+        with pytest.raises(FileNotFoundError):
+            load_profiles(str(tmp_path / "missing.json"))
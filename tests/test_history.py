@@ -0,0 +1,142 @@
+"""Tests for the vacancy history and full-text search."""
+
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from app import bot
+from app.config import config
+from app.history import HistoryStore, get_history_store, match_query
+from app.parser import fetch_top_vacancies
+from app.providers import search_history
+from benchmarks.fake_hh import FakeHHServer
+from benchmarks.fake_telegram import FakeTelegramServer, make_update
+from tests import conftest
+
+NOW = datetime(2024, 6, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def make_vacancy(index, title, days_ago=0, **fields):
+    published_at = NOW - timedelta(days=days_ago)
+    return conftest.make_vacancy(index, title, published_at=published_at, **fields)
+
+
+VACANCIES = [
+    make_vacancy(1, "Python разработчик", schedule="remote"),
+    make_vacancy(2, "DevOps инженер", days_ago=3, key_skills=["Python", "Ansible"]),
+    make_vacancy(3, "Python DevOps", days_ago=10, schedule="remote"),
+    make_vacancy(4, "Go разработчик", days_ago=1, schedule="fullDay"),
+]
+
+
+class TestMatchQuery:
+    """Test cases for match_query."""
+
+    def test_prefix_terms(self):
+        """Test that every word becomes a quoted prefix term."""
+        assert match_query("Python  DevOps") == '"python"* "devops"*'
+
+    def test_russian_endings(self):
+        """Test that inflected Russian words match their base form."""
+        assert match_query("разработчика") == '"разработчик"*'
+
+    def test_no_words(self):
+        """Test that punctuation alone is not a query."""
+        assert match_query(' "*) ') is None
+
+
+class TestHistoryStore:
+    """Test cases for HistoryStore."""
+
+    def test_search_all_words(self):
+        """Test that titles, skills and schedule are searchable together."""
+        store = HistoryStore(":memory:")
+        store.add(VACANCIES)
+
+        assert [v.id for v in store.search("python")] == ["1", "2", "3"]
+        assert [v.id for v in store.search("remote python devops")] == ["3"]
+        assert [v.id for v in store.search("разработчики")] == ["1", "4"]
+        assert store.search("java") == []
+
+    def test_since_and_limit(self):
+        """Test that old postings are excluded and results are newest first."""
+        store = HistoryStore(":memory:")
+        store.add(VACANCIES)
+
+        week_ago = NOW - timedelta(days=7)
+        assert [v.id for v in store.search("python", since=week_ago)] == ["1", "2"]
+        assert [v.id for v in store.search("python", limit=1)] == ["1"]
+
+    def test_incremental_updates(self, tmp_path):
+        """Test that unchanged vacancies are skipped and changes reindexed."""
+        path = str(tmp_path / "history.db")
+        store = HistoryStore(path)
+        assert store.add(VACANCIES) == 4
+        assert store.add(VACANCIES) == 0
+
+        renamed = VACANCIES[0].model_copy(update={"title": "Java разработчик"})
+        assert store.add([renamed]) == 1
+
+        reopened = HistoryStore(path)
+        assert len(reopened) == 4
+        assert [v.id for v in reopened.search("java")] == ["1"]
+        assert [v.id for v in reopened.search("python")] == ["2", "3"]
+
+
+class TestCrawlHistory:
+    """Test cases for recording crawls into the history."""
+
+    async def test_crawl_is_searchable(self, monkeypatch):
+        """Test that accepted vacancies are searchable after a crawl."""
+        async with FakeHHServer(pages=2, per_page=50) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                found = await fetch_top_vacancies(session, limit=10**6)
+            requests = server.requests
+
+            results = search_history("remote", limit=100)
+
+        assert len(get_history_store()) == len(found)
+        assert results and all(v.schedule == "remote" for v in results)
+        # Поиск не обращается к hh.ru
+        assert server.requests == requests
+
+
+class SearchProvider:
+    """Provider answering /search from a fixed list."""
+
+    def __init__(self):
+        self.queries = []
+
+    async def search(self, query, days=None):
+        self.queries.append(query)
+        return VACANCIES[:1]
+
+
+class TestSearchCommand:
+    """Test cases for /search handled through the dispatcher."""
+
+    async def test_query_is_escaped_once(self, monkeypatch):
+        """Test that the query in the header is HTML-escaped exactly once."""
+        provider = SearchProvider()
+        monkeypatch.setattr(bot, "_provider", provider)
+        monkeypatch.setattr(bot, "_broadcaster", None)
+
+        async with FakeTelegramServer() as telegram:
+            session = AiohttpSession(api=TelegramAPIServer.from_base(telegram.url))
+            telegram_bot = Bot(token="42:test-token", session=session)
+            monkeypatch.setattr(bot, "_bot", telegram_bot)
+            try:
+                await bot.get_dispatcher().feed_raw_update(
+                    telegram_bot, make_update(1, 7, "/search c++ <b>")
+                )
+            finally:
+                await telegram_bot.session.close()
+
+        assert provider.queries == ["c++ <b>"]
+        assert telegram.messages[0]["text"].startswith(
+            "🔎 Найдено 1 вакансий по запросу «c++ &lt;b&gt;»"
+        )
@@ -0,0 +1,53 @@
+"""Cold-start guard: import cost and side effects of the entry points."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Щедрый предел: ловит возврат тяжёлых импортов, а не шум CI
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "3.0"))
+
+
+def import_profile(module, cwd):
+    """Import a module in a fresh interpreter and parse -X importtime."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "BOT_TOKEN": ""}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total) / 1e6
+    return cumulative
+
+
+class TestImportTime:
+    """Test cases for lazy initialization of the entry points."""
+
+    def test_api_does_not_import_bot_stack(self, tmp_path):
+        """Test that app.main loads without aiogram, apscheduler or uvicorn."""
+        modules = import_profile("app.main", tmp_path)
+        heavy = [
+            name
+            for name in modules
+            if name.split(".")[0] in ("aiogram", "apscheduler", "uvicorn")
+        ]
+        assert heavy == []
+        assert modules["app.main"] < IMPORT_BUDGET_SECONDS
+
+    def test_bot_import_has_no_side_effects(self, tmp_path):
+        """Test that app.bot imports without a token and writes no files."""
+        import_profile("app.bot", tmp_path)
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,175 @@
+"""Tests for per-chat background jobs and the non-blocking /start."""
+
+import asyncio
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from app import bot, storage
+from app.config import config
+from app.jobs import ChatJobs
+from app.storage import SubscriberStore
+from benchmarks.fake_telegram import FakeTelegramServer, make_update
+from tests.conftest import make_vacancies
+
+VACANCIES = make_vacancies("Python", 2)
+
+
+class SlowProvider:
+    """Provider whose crawl finishes only when released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def get_vacancies(self, sort=None, min_salary=None, on_progress=None):
+        self.calls += 1
+        if on_progress is not None:
+            on_progress(5)
+        await self.release.wait()
+        return VACANCIES
+
+    async def close(self):
+        pass
+
+
+class TestChatJobs:
+    """Test cases for ChatJobs."""
+
+    async def test_one_job_per_chat(self):
+        """Test that a running chat job is joined instead of duplicated."""
+        jobs = ChatJobs()
+        release = asyncio.Event()
+        runs = []
+
+        async def job():
+            runs.append(1)
+            await release.wait()
+
+        first, started = jobs.start("1", job)
+        second, joined = jobs.start("1", job)
+        _, other = jobs.start("2", job)
+        assert started and not joined and other
+        assert first is second
+        assert len(jobs) == 2
+
+        release.set()
+        await jobs.drain()
+        assert len(runs) == 2
+        assert len(jobs) == 0
+        # Завершённое задание не мешает запустить новое
+        assert jobs.start("1", job)[1]
+        await jobs.drain()
+
+    async def test_other_params_replace_job(self):
+        """Test that a job with other parameters replaces the running one."""
+        jobs = ChatJobs()
+        release = asyncio.Event()
+
+        async def job():
+            await release.wait()
+
+        first, _ = jobs.start("1", job, ("salary", None))
+        second, started = jobs.start("1", job, (None, None))
+        assert started and first is not second
+        assert jobs.get("1") is second
+        assert len(jobs) == 1
+
+        release.set()
+        await jobs.drain()
+        assert first.cancelled()
+        assert second.done() and not second.cancelled()
+
+    async def test_failed_job_is_released(self):
+        """Test that a failing job frees the chat slot."""
+        jobs = ChatJobs()
+
+        async def job():
+            raise RuntimeError("boom")
+
+        task, _ = jobs.start("1", job)
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert jobs.get("1") is None
+
+    async def test_cancel(self):
+        """Test that cancel stops running jobs."""
+        jobs = ChatJobs()
+        task, _ = jobs.start("1", lambda: asyncio.sleep(60))
+        await jobs.cancel()
+        assert task.cancelled()
+
+
+class TestStartCommand:
+    """Test cases for /start handled through the dispatcher."""
+
+    async def test_start_does_not_wait_for_crawl(self, monkeypatch):
+        """Test that /start returns at once and edits its progress message."""
+        provider = SlowProvider()
+        monkeypatch.setattr(config, "PROGRESS_EDIT_INTERVAL", 0.01)
+        monkeypatch.setattr(storage, "_subscriber_store", SubscriberStore(":memory:"))
+        monkeypatch.setattr(bot, "_provider", provider)
+        monkeypatch.setattr(bot, "_broadcaster", None)
+        monkeypatch.setattr(bot, "_jobs", None)
+
+        async with FakeTelegramServer() as telegram:
+            session = AiohttpSession(api=TelegramAPIServer.from_base(telegram.url))
+            telegram_bot = Bot(token="42:test-token", session=session)
+            monkeypatch.setattr(bot, "_bot", telegram_bot)
+            dp = bot.get_dispatcher()
+            try:
+                started = time.monotonic()
+                await dp.feed_raw_update(telegram_bot, make_update(1, 7, "/start"))
+                await dp.feed_raw_update(telegram_bot, make_update(2, 7, "/start"))
+                handled = time.monotonic() - started
+
+                await asyncio.sleep(0.1)
+                progress = [m["text"] for m in telegram.messages]
+
+                provider.release.set()
+                await bot.get_jobs().drain()
+            finally:
+                await telegram_bot.session.close()
+
+        assert handled < 0.5
+        assert provider.calls == 1
+        # Повторный /start не добавляет сообщений, выдача заменяет сообщение
+        # о поиске
+        assert progress == [bot.PROGRESS_TEXT.format(count=5)]
+        assert len(telegram.messages) == 1
+        assert telegram.messages[0]["text"].startswith("📋 Найдено 2 вакансий")
+        assert "7" in storage.get_subscriber_store().all()
+
+    async def test_start_with_other_args_replaces_search(self, monkeypatch):
+        """Test that /start with new arguments replaces the running search."""
+        provider = SlowProvider()
+        monkeypatch.setattr(storage, "_subscriber_store", SubscriberStore(":memory:"))
+        monkeypatch.setattr(bot, "_provider", provider)
+        monkeypatch.setattr(bot, "_broadcaster", None)
+        monkeypatch.setattr(bot, "_jobs", None)
+
+        async with FakeTelegramServer() as telegram:
+            session = AiohttpSession(api=TelegramAPIServer.from_base(telegram.url))
+            telegram_bot = Bot(token="42:test-token", session=session)
+            monkeypatch.setattr(bot, "_bot", telegram_bot)
+            dp = bot.get_dispatcher()
+            try:
+                await dp.feed_raw_update(telegram_bot, make_update(1, 7, "/start"))
+                await asyncio.sleep(0.05)
+                await dp.feed_raw_update(
+                    telegram_bot, make_update(2, 7, "/start sort=salary")
+                )
+                await asyncio.sleep(0.05)
+                assert len(bot.get_jobs()) == 1
+                provider.release.set()
+                await bot.get_jobs().drain()
+            finally:
+                await telegram_bot.session.close()
+
+        assert provider.calls == 2
+        # Сообщение прерванного поиска закрыто, выдачу присылает новый
+        assert [m["text"] for m in telegram.messages][0] == bot.REPLACED_TEXT
+        assert len(telegram.messages) == 2
+        assert telegram.messages[1]["text"].startswith("📋 Найдено 2 вакансий")
@@ -0,0 +1,67 @@
+"""Tests for the logging pipeline."""
+
+import json
+import logging
+
+from app import logging_config
+from app.logging_config import (
+    CorrelationFilter,
+    JsonFormatter,
+    crawl_context,
+    crawl_id_var,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+def make_record(message="hello"):
+    return logging.LogRecord("app.parser", logging.INFO, __file__, 1, message, (), None)
+
+
+class TestCorrelation:
+    """Test cases for crawl correlation IDs."""
+
+    def test_crawl_context_sets_and_resets(self):
+        """Test that the crawl ID is only set inside the block."""
+        with crawl_context("abc") as crawl_id:
+            assert crawl_id == "abc"
+            record = make_record()
+            CorrelationFilter().filter(record)
+            assert record.crawl_id == "abc"
+        assert crawl_id_var.get() == "-"
+
+    def test_json_formatter(self):
+        """Test structured JSON output."""
+        record = make_record("вакансия")
+        record.crawl_id = "42"
+        payload = json.loads(JsonFormatter().format(record))
+        assert payload["message"] == "вакансия"
+        assert payload["crawl_id"] == "42"
+        assert payload["logger"] == "app.parser"
+
+
+class TestSetupLogging:
+    """Test cases for the queue-based setup."""
+
+    def test_records_reach_file_through_queue(self, tmp_path):
+        """Test that log calls are written by the background listener."""
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        log_file = tmp_path / "logs" / "bot.log"
+        try:
+            setup_logging(level="INFO", log_file=str(log_file), fmt="text")
+            listener = logging_config._listener
+            setup_logging(level="INFO", log_file=str(log_file))
+            assert logging_config._listener is listener
+
+            with crawl_context("c0ffee"):
+                logging.getLogger("app.test").info("через очередь")
+            logging.getLogger("app.test").debug("не пишется")
+            shutdown_logging()
+        finally:
+            shutdown_logging()
+            root.handlers, root.level = saved_handlers, saved_level
+
+        content = log_file.read_text(encoding="utf-8")
+        assert "[c0ffee] через очередь" in content
+        assert "не пишется" not in content
@@ -0,0 +1,180 @@
+"""Tests for the application factory and run modes."""
+
+import httpx
+import pytest
+
+from app import cache, history, main
+from app.config import Config, config
+from app.models import Vacancy
+from tests.conftest import CountingLoader
+
+
+def client_for(app):
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+class TestCreateApp:
+    """Test cases for create_app."""
+
+    async def test_api_only(self):
+        """Test that the API app serves routes without a webhook."""
+        app = main.create_app()
+        async with client_for(app) as client:
+            response = await client.get("/health")
+        assert response.json() == {"status": "ok"}
+        assert app.state.webhook is None
+        paths = {route.path for route in app.routes}
+        assert {"/vacancies", "/metrics"} <= paths
+        assert "/vacancies/new" not in paths
+        assert config.WEBHOOK_PATH not in paths
+
+    async def test_webhook_route(self, monkeypatch):
+        """Test that webhook mode mounts the Telegram route."""
+        from app import bot
+
+        # Config.validate() - classmethod и читает атрибуты класса, подмена
+        # на экземпляре config до проверки не доходит
+        monkeypatch.setattr(Config, "BOT_TOKEN", "42:test-token")
+        monkeypatch.setattr(bot, "_bot", None)
+        app = main.create_app(webhook=True)
+        try:
+            async with client_for(app) as client:
+                response = await client.post(config.WEBHOOK_PATH, json={})
+            assert response.status_code == 401
+            assert app.state.webhook is not None
+        finally:
+            await bot.close()
+
+    async def test_vacancies_by_salary(self, monkeypatch):
+        """Test that sort=salary serves the ranked cache filtered by min_salary."""
+
+        async def ranked():
+            return [
+                Vacancy(
+                    title=f"Python {salary_net}",
+                    url="https://hh.ru/vacancy/1",
+                    salary="-",
+                    salary_net=salary_net,
+                )
+                for salary_net in (300000, 200000, 100000)
+            ]
+
+        monkeypatch.setattr(cache, "salary_cache", cache.VacancyCache(ranked, ttl=60))
+        async with client_for(main.create_app()) as client:
+            response = await client.get(
+                "/vacancies", params={"sort": "salary", "min_salary": 150000}
+            )
+            invalid = await client.get("/vacancies", params={"sort": "title"})
+
+        assert [v["salary_net"] for v in response.json()] == [300000, 200000]
+        assert invalid.status_code == 422
+
+    async def test_search(self):
+        """Test that /search answers from the local history."""
+        history.get_history_store().add(
+            [
+                Vacancy(
+                    title=title,
+                    url=f"https://hh.ru/vacancy/{index}",
+                    salary="-",
+                    id=str(index),
+                )
+                for index, title in enumerate(["Python разработчик", "Go инженер"])
+            ]
+        )
+        async with client_for(main.create_app()) as client:
+            found = await client.get("/search", params={"q": "python"})
+            empty = await client.get("/search", params={"q": ""})
+
+        assert [v["title"] for v in found.json()] == ["Python разработчик"]
+        assert empty.status_code == 422
+
+    def test_module_app_is_lazy(self, monkeypatch):
+        """Test that app.main.app is built on first access."""
+        monkeypatch.setattr(main, "_app", None)
+        assert main.app is main.app
+        with pytest.raises(AttributeError):
+            main.missing
+
+
+class TestPagination:
+    """Test cases for cursor pagination of /vacancies."""
+
+    async def test_pages_follow_cursor(self, monkeypatch):
+        """Test that the cursor walks the cached result page by page."""
+        loader = CountingLoader(count=5)
+        monkeypatch.setattr(cache, "vacancy_cache", cache.VacancyCache(loader, ttl=60))
+        titles = []
+        async with client_for(main.create_app()) as client:
+            params = {"limit": 2}
+            while True:
+                response = await client.get("/vacancies", params=params)
+                titles += [v["title"] for v in response.json()]
+                if "X-Next-Cursor" not in response.headers:
+                    break
+                params["cursor"] = response.headers["X-Next-Cursor"]
+
+        assert titles == [f"load 1 {index}" for index in range(5)]
+
+    async def test_stale_cursor_is_gone(self, monkeypatch):
+        """Test that a cursor from a replaced result set is refused."""
+        vacancy_cache = cache.VacancyCache(CountingLoader(count=5), ttl=60)
+        monkeypatch.setattr(cache, "vacancy_cache", vacancy_cache)
+        async with client_for(main.create_app()) as client:
+            first = await client.get("/vacancies", params={"limit": 2})
+            cursor = first.headers["X-Next-Cursor"]
+            await vacancy_cache.refresh()
+            stale = await client.get("/vacancies", params={"cursor": cursor})
+            streamed = await client.get(
+                "/vacancies", params={"cursor": cursor, "format": "ndjson"}
+            )
+            invalid = await client.get("/vacancies", params={"cursor": "bm9wZQ"})
+
+        assert stale.status_code == 410
+        assert streamed.status_code == 410
+        assert invalid.status_code == 400
+
+
+class TestMain:
+    """Test cases for run mode selection."""
+
+    async def test_unknown_mode(self):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError, match="Unknown mode"):
+            await main.main("everything")
+
+    async def test_runs_only_requested_parts(self, monkeypatch):
+        """Test that each mode starts only its components."""
+        started = []
+
+        async def run_api(app):
+            started.append("api")
+
+        async def run_bot(webhook=None):
+            started.append("bot")
+
+        async def run_scheduler():
+            started.append("scheduler")
+
+        async def close():
+            started.append("close")
+
+        from app import bot
+
+        monkeypatch.setattr(main, "setup_logging", lambda: None)
+        monkeypatch.setattr(main, "run_api", run_api)
+        monkeypatch.setattr(main, "run_bot", run_bot)
+        monkeypatch.setattr(main, "run_scheduler", run_scheduler)
+        monkeypatch.setattr(bot, "close", close)
+        monkeypatch.setattr(config, "BOT_MODE", "polling")
+
+        for mode, expected in [
+            ("api", ["api"]),
+            ("bot", ["bot", "close"]),
+            ("scheduler", ["scheduler", "close"]),
+            ("all", ["api", "bot", "scheduler", "close"]),
+        ]:
+            started.clear()
+            await main.main(mode)
+            assert started == expected
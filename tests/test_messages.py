@@ -0,0 +1,78 @@
+"""Tests for Telegram message rendering and packing."""
+
+from app.messages import (
+    TELEGRAM_MESSAGE_LIMIT,
+    DigestCache,
+    format_vacancy_message,
+    pack_messages,
+    visible_length,
+)
+from tests.conftest import make_vacancies
+
+
+class TestFormatting:
+    """Test cases for vacancy formatting."""
+
+    def test_title_is_escaped(self):
+        """Test that HTML special characters in titles are escaped."""
+        vacancy = make_vacancies("C++ & <Python>")[0]
+        text = format_vacancy_message(vacancy)
+        assert "C++ &amp; &lt;Python&gt;" in text
+
+    def test_visible_length_counts_parsed_text(self):
+        """Test that tags are dropped, entities unfolded and UTF-16 used."""
+        assert visible_length("<b>a &amp; b</b>") == len("a & b")
+        assert visible_length("🔍") == 2
+
+
+class TestPacking:
+    """Test cases for the size-aware packer."""
+
+    def test_messages_stay_under_limit(self):
+        """Test that every packed message fits Telegram's limit."""
+        blocks = [
+            format_vacancy_message(v) for v in make_vacancies("Python разработчик", 200)
+        ]
+        messages = pack_messages(blocks)
+        assert len(messages) > 1
+        assert all(visible_length(m) <= TELEGRAM_MESSAGE_LIMIT for m in messages)
+        assert sum(m.count("<a href") for m in messages) == 200
+
+    def test_fills_messages(self):
+        """Test that messages are filled instead of fixed-size batches."""
+        blocks = [
+            format_vacancy_message(v) for v in make_vacancies("Python разработчик", 20)
+        ]
+        assert len(pack_messages(blocks)) == 1
+        assert len(pack_messages(blocks, limit=1000)) > 1
+
+    def test_entity_limit(self):
+        """Test that a message never exceeds the entity limit."""
+        blocks = [
+            format_vacancy_message(v) for v in make_vacancies("Python разработчик", 20)
+        ]
+        messages = pack_messages(blocks, entity_limit=9)
+        assert len(messages) == 7
+
+
+class TestDigestCache:
+    """Test cases for the rendered digest cache."""
+
+    def test_reuses_rendered_chunks(self):
+        """Test that the same result set is rendered only once."""
+        cache = DigestCache()
+        vacancies = make_vacancies("Python разработчик", 30)
+        first = cache.render(vacancies, "Заголовок", "Подпись")
+        second = cache.render(list(vacancies), "Заголовок", "Подпись")
+        assert second is first
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert first[0].startswith("Заголовок")
+        assert first[-1].endswith("Подпись")
+
+    def test_changed_results_are_rerendered(self):
+        """Test that a different result set misses the cache."""
+        cache = DigestCache(maxsize=1)
+        cache.render(make_vacancies("Python разработчик", 3))
+        cache.render(make_vacancies("Go", 3))
+        cache.render(make_vacancies("Python разработчик", 3))
+        assert cache.misses == 3
@@ -0,0 +1,51 @@
+"""Tests for metrics exposition."""
+
+import pytest
+
+from app.metrics import Counter, Gauge, Histogram, Registry
+
+
+class TestMetrics:
+    """Test cases for Prometheus text exposition."""
+
+    def test_counter_with_labels(self):
+        """Test labelled counter samples."""
+        registry = Registry()
+        counter = Counter("requests_total", "Requests", ["code"], registry=registry)
+        counter.labels(code="200").inc()
+        counter.labels(code="200").inc(2)
+
+        text = registry.render()
+
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{code="200"} 3' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram bucket, sum and count samples."""
+        registry = Registry()
+        histogram = Histogram("latency", "Latency", buckets=(1, 2), registry=registry)
+        for value in (0.5, 1.5, 5):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_bucket{le="1"} 1' in text
+        assert 'latency_bucket{le="2"} 2' in text
+        assert 'latency_bucket{le="+Inf"} 3' in text
+        assert "latency_sum 7" in text
+        assert "latency_count 3" in text
+
+    def test_gauge_set(self):
+        """Test that gauges hold the last value."""
+        registry = Registry()
+        gauge = Gauge("lag", "Lag", ["job"], registry=registry)
+        gauge.labels(job="daily").set(3)
+        gauge.labels(job="daily").set(1.5)
+
+        assert 'lag{job="daily"} 1.5' in registry.render()
+
+    def test_wrong_labels(self):
+        """Test that unknown label names are rejected."""
+        counter = Counter("c", "C", ["rule"], registry=None)
+        with pytest.raises(ValueError):
+            counter.labels(other="x")
@@ -1,9 +1,33 @@
 """Tests for data models."""
 
+import json
+import warnings
+
 import pytest
 from pydantic import ValidationError
 
-from app.models import Vacancy
+from app import models
+from app.models import (
+    Vacancy,
+    VacancyRecord,
+    dump_vacancies_json,
+    trusted_vacancy,
+    validate_vacancies,
+    validate_vacancies_json,
+)
+
+ITEMS = [
+    {
+        "title": f"Python Developer {i}",
+        "salary": "от 100000 RUR",
+        "url": f"https://hh.ru/vacancy/{i}",
+        "id": str(i),
+        "published_at": "2024-01-01T10:00:00+03:00",
+        "salary_from": 100000,
+        "currency": "RUR",
+    }
+    for i in range(3)
+]
 
 
 class TestVacancy:
@@ -56,3 +80,56 @@ class TestVacancy:
         str_repr = str(vacancy)
         assert "Python Developer" in str_repr
         assert "100000-150000 USD" in str_repr
+
+
+class TestBatchValidation:
+    """Test cases for list validation and serialization."""
+
+    def test_batch_matches_per_item(self):
+        """Test that batch validation builds the same models."""
+        assert validate_vacancies(ITEMS) == [Vacancy(**item) for item in ITEMS]
+
+    def test_batch_rejects_invalid_item(self):
+        """Test that one invalid item fails the whole batch."""
+        with pytest.raises(ValidationError):
+            validate_vacancies([*ITEMS, {"title": "Developer"}])
+
+    def test_json_round_trip(self):
+        """Test parsing and dumping a JSON array of vacancies."""
+        vacancies = validate_vacancies_json(json.dumps(ITEMS))
+        assert vacancies == validate_vacancies(ITEMS)
+        dumped = json.loads(dump_vacancies_json(vacancies))
+        assert dumped == [json.loads(v.model_dump_json()) for v in vacancies]
+
+
+class TestVacancyRecord:
+    """Test cases for the compact vacancy representation."""
+
+    def test_round_trip(self):
+        """Test converting a vacancy to a record and back."""
+        vacancy = Vacancy(**ITEMS[0])
+        record = VacancyRecord.from_vacancy(vacancy)
+        assert record.title == vacancy.title
+        assert record == VacancyRecord.from_vacancy(Vacancy(**ITEMS[0]))
+        assert record.to_vacancy() == vacancy
+
+    def test_trusted_vacancy_serializes_cleanly(self):
+        """Test that an unvalidated vacancy dumps without warnings."""
+        vacancy = Vacancy(**ITEMS[1])
+        restored = trusted_vacancy(dict(vacancy.__dict__))
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            assert restored.model_dump_json() == vacancy.model_dump_json()
+        assert restored.model_fields_set == set(Vacancy.model_fields)
+
+    def test_unknown_pydantic_layout_uses_model_construct(self, monkeypatch):
+        """Test that the trusted path falls back to model_construct."""
+        monkeypatch.setattr(models, "_TRUSTED", False)
+        vacancy = Vacancy(**ITEMS[2])
+        assert VacancyRecord.from_vacancy(vacancy).to_vacancy() == vacancy
+
+    def test_records_are_compact(self):
+        """Test that records do not carry a per-instance dict."""
+        record = VacancyRecord(**ITEMS[2])
+        assert not hasattr(record, "__dict__")
+        assert record.schedule is None
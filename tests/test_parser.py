@@ -0,0 +1,320 @@
+"""Tests for hh.ru parser."""
+
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.config import config
+from app.parser import (
+    commit_new_vacancies,
+    crawl_queries,
+    fetch_new_vacancies,
+    fetch_top_vacancies,
+    format_salary,
+    parse_item,
+)
+from app.queries import CrawlState, QuerySpec, parse_queries
+from app.storage import SeenStore
+from benchmarks.fake_hh import FakeHHServer
+
+
+def make_item(index, title="Python разработчик", schedule="remote", published=None):
+    return {
+        "published_at": published,
+        "id": str(index),
+        "name": f"{title} {index}",
+        "alternate_url": f"https://hh.ru/vacancy/{index}",
+        "salary": {"from": 100000, "to": None, "currency": "RUR"},
+        "employment": {"id": "part"},
+        "schedule": {"id": schedule},
+        "experience": {"id": "between1And3"},
+    }
+
+
+def make_app(pages, requested):
+    async def handler(request):
+        page = int(request.query["page"])
+        requested.append(page)
+        items = pages[page] if page < len(pages) else []
+        return web.json_response({"items": items, "pages": len(pages)})
+
+    app = web.Application()
+    app.router.add_get("/vacancies", handler)
+    return app
+
+
+async def crawl(pages, monkeypatch, **kwargs):
+    requested = []
+    async with TestServer(make_app(pages, requested)) as server:
+        monkeypatch.setattr(config, "HH_API_URL", str(server.make_url("/vacancies")))
+        async with aiohttp.ClientSession() as session:
+            result = await fetch_top_vacancies(session, **kwargs)
+    return result, requested
+
+
+class TestParseItem:
+    """Test cases for item filtering."""
+
+    def test_accepts_matching_item(self):
+        """Test that a matching item becomes a vacancy."""
+        vacancy = parse_item(make_item(1))
+        assert vacancy is not None
+        assert vacancy.salary == "от 100000 RUR"
+
+    def test_rejects_excluded_word(self):
+        """Test that excluded words reject the item."""
+        assert parse_item(make_item(1, title="Python разработчик JS")) is None
+
+    def test_rejects_schedule(self):
+        """Test that disallowed schedule rejects the item."""
+        assert parse_item(make_item(1, schedule="fullDay")) is None
+
+    def test_format_salary(self):
+        """Test salary string formatting."""
+        assert format_salary(None) == "Зарплата не указана"
+        assert format_salary({"from": 1, "to": 2, "currency": "USD"}) == "1-2 USD"
+        assert format_salary({"to": 2, "currency": "USD"}) == "до 2 USD"
+
+
+class TestCrawler:
+    """Test cases for the concurrent crawler."""
+
+    async def test_concurrent_matches_sequential(self, monkeypatch):
+        """Test that concurrency does not change the result order."""
+        pages = [
+            [
+                make_item(p * 10 + i, schedule="remote" if i % 2 else "fullDay")
+                for i in range(10)
+            ]
+            for p in range(6)
+        ]
+        sequential, _ = await crawl(pages, monkeypatch, limit=12, concurrency=1)
+        concurrent, _ = await crawl(pages, monkeypatch, limit=12, concurrency=4)
+        assert [v.url for v in concurrent] == [v.url for v in sequential]
+        assert len(concurrent) == 12
+
+    async def test_stops_on_empty_page(self, monkeypatch):
+        """Test that crawling stops at the last page."""
+        pages = [[make_item(1)], [make_item(2)]]
+        result, requested = await crawl(pages, monkeypatch, concurrency=1)
+        assert len(result) == 2
+        assert max(requested) == 1
+
+    async def test_invalid_item_does_not_drop_page(self, monkeypatch):
+        """Test that one invalid item falls back to per-item validation."""
+        broken = make_item(2)
+        broken["alternate_url"] = "not a url"
+        pages = [[make_item(1), broken, make_item(3)]]
+        result, _ = await crawl(pages, monkeypatch, concurrency=1)
+        assert [v.id for v in result] == ["1", "3"]
+
+    async def test_returns_none_on_upstream_error(self, monkeypatch):
+        """Test that an HTTP error yields no result."""
+
+        async def handler(request):
+            return web.Response(status=500)
+
+        app = web.Application()
+        app.router.add_get("/vacancies", handler)
+        async with TestServer(app) as server:
+            monkeypatch.setattr(
+                config, "HH_API_URL", str(server.make_url("/vacancies"))
+            )
+            async with aiohttp.ClientSession() as session:
+                assert await fetch_top_vacancies(session) is None
+
+
+async def crawl_new(store, session):
+    delta = await fetch_new_vacancies(store, session)
+    commit_new_vacancies(delta, store)
+    return delta.vacancies
+
+
+class TestIncrementalCrawl:
+    """Test cases for incremental crawling."""
+
+    async def test_stops_at_last_crawl(self, monkeypatch, tmp_path):
+        """Test that paging stops at vacancies older than the last crawl."""
+        now = datetime.now(timezone.utc)
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        store.set_last_crawl(now - timedelta(hours=3))
+
+        def published(hours):
+            return (now - timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%S%z")
+
+        pages = [
+            [make_item(1, published=published(1))],
+            [make_item(2, published=published(2))],
+            [make_item(3, published=published(48))],
+            [make_item(4, published=published(49))],
+            [make_item(5, published=published(50))],
+        ]
+        requested = []
+        async with TestServer(make_app(pages, requested)) as server:
+            monkeypatch.setattr(
+                config, "HH_API_URL", str(server.make_url("/vacancies"))
+            )
+            monkeypatch.setattr(config, "CRAWL_CONCURRENCY", 1)
+            async with aiohttp.ClientSession() as session:
+                first = await crawl_new(store, session)
+                second = await crawl_new(store, session)
+
+        assert [v.id for v in first] == ["1", "2"]
+        assert second == []
+        assert max(requested) == 2
+        assert store.last_crawl() > now
+
+    async def test_fetch_does_not_mark_seen(self, monkeypatch, tmp_path):
+        """Test that new vacancies stay new until the delta is committed."""
+        since = datetime.now(timezone.utc) - timedelta(days=7)
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        store.set_last_crawl(since)
+        async with FakeHHServer(pages=1) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                first = await fetch_new_vacancies(store, session)
+                second = await fetch_new_vacancies(store, session)
+                commit_new_vacancies(second, store)
+                third = await fetch_new_vacancies(store, session)
+
+        assert first.vacancies
+        assert second.vacancies == first.vacancies
+        assert store.last_crawl() == second.started_at
+        assert third.vacancies == []
+
+    async def test_no_quota_on_new_vacancies(self, monkeypatch, tmp_path):
+        """Test that new vacancies beyond MAX_VACANCIES are not lost."""
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        store.set_last_crawl(datetime.now(timezone.utc) - timedelta(days=7))
+        async with FakeHHServer(pages=5) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                first = await crawl_new(store, session)
+                second = await crawl_new(store, session)
+            expected = [
+                item["id"] for item in server.items if parse_item(item) is not None
+            ]
+
+        assert len(first) > config.MAX_VACANCIES
+        assert [v.id for v in first] == expected
+        assert second == []
+
+    async def test_exhausted_budget_moves_last_crawl(self, monkeypatch, tmp_path):
+        """Test that a crawl cut short by the page budget still moves last_crawl."""
+        since = datetime.now(timezone.utc) - timedelta(days=7)
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        store.set_last_crawl(since)
+        monkeypatch.setattr(config, "CRAWL_BUDGET", 2)
+        async with FakeHHServer(pages=5) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                new = await crawl_new(store, session)
+
+        assert new
+        assert store.last_crawl() > since
+        assert store.last_crawl("python@1") == store.last_crawl()
+
+    async def test_budget_does_not_stall_queries(self, monkeypatch, tmp_path):
+        """Test that crawls deeper than the budget make progress across runs."""
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        store.set_last_crawl(datetime.now(timezone.utc) - timedelta(days=30))
+        monkeypatch.setattr(config, "CRAWL_QUERIES", "python:1,devops:1,golang:1")
+        monkeypatch.setattr(config, "CRAWL_CONCURRENCY", 1)
+        requests = []
+        crawls = []
+        async with FakeHHServer(pages=20) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                for _ in range(3):
+                    before = server.requests
+                    await crawl_new(store, session)
+                    requests.append(server.requests - before)
+                    crawls.append(store.last_crawl())
+
+        assert requests == [config.CRAWL_BUDGET, 3, 3]
+        assert crawls[0] < crawls[1] < crawls[2]
+        for query in parse_queries():
+            assert store.last_crawl(query.name) == crawls[2]
+
+    async def test_first_crawl_seeds_store(self, monkeypatch, tmp_path):
+        """Test that the first crawl reads one page per query to seed the store."""
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        monkeypatch.setattr(config, "CRAWL_QUERIES", "python:1,devops:1,golang:1")
+        monkeypatch.setattr(config, "CRAWL_CONCURRENCY", 1)
+        async with FakeHHServer(pages=20) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                first = await crawl_new(store, session)
+                seeded = server.requests
+                second = await crawl_new(store, session)
+
+        assert seeded == 3
+        assert first and second == []
+        assert store.last_crawl() is not None
+
+
+class TestCrawlPlanner:
+    """Test cases for the multi-query crawl planner."""
+
+    async def plan(self, results, monkeypatch, queries, concurrency=2, **kwargs):
+        requested = []
+
+        async def handler(request):
+            pages = results[request.query["text"]]
+            page = int(request.query["page"])
+            requested.append((request.query["text"], page))
+            items = pages[page] if page < len(pages) else []
+            return web.json_response({"items": items, "pages": len(pages)})
+
+        app = web.Application()
+        app.router.add_get("/vacancies", handler)
+        state = CrawlState(kwargs.pop("budget", None), concurrency)
+        async with TestServer(app) as server:
+            monkeypatch.setattr(
+                config, "HH_API_URL", str(server.make_url("/vacancies"))
+            )
+            async with aiohttp.ClientSession() as session:
+                found = await crawl_queries(
+                    queries, session, concurrency=concurrency, state=state, **kwargs
+                )
+        return found, state, requested
+
+    async def test_deduplicates_across_queries(self, monkeypatch):
+        """Test that a vacancy found by two queries is returned once."""
+        results = {
+            "python": [[make_item(1), make_item(2)], [make_item(3)]],
+            "devops": [[make_item(2, title="DevOps"), make_item(4, title="DevOps")]],
+        }
+        queries = [QuerySpec("python"), QuerySpec("devops")]
+
+        found, state, _ = await self.plan(
+            results, monkeypatch, queries, concurrency=1, limit=100
+        )
+
+        assert [v.id for v in found] == ["1", "2", "3", "4"]
+        assert state.duplicates == 1
+        assert state.pages == {"python@1": 2, "devops@1": 1}
+
+    async def test_global_budget(self, monkeypatch):
+        """Test that all queries together stay within the page budget."""
+        page = [make_item(i) for i in range(3)]
+        results = {"python": [page] * 10, "golang": [page] * 10}
+        queries = [QuerySpec("python"), QuerySpec("golang")]
+
+        _, state, requested = await self.plan(
+            results, monkeypatch, queries, limit=1000, budget=5
+        )
+
+        assert len(requested) == 5
+        assert state.requested == 5
+        assert state.exhausted
+
+    def test_parse_queries(self):
+        """Test parsing of the CRAWL_QUERIES setting."""
+        assert parse_queries("python:1, devops , golang:2,python:1") == [
+            QuerySpec("python", "1"),
+            QuerySpec("devops", "1"),
+            QuerySpec("golang", "2"),
+        ]
@@ -0,0 +1,111 @@
+"""Tests for vacancy providers."""
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.cache import VacancyCache
+from app.models import Vacancy
+from app.providers import InProcessProvider, RemoteProvider, create_provider
+
+VACANCY = {"title": "Python", "url": "https://hh.ru/vacancy/1", "salary": "-"}
+
+
+class TestInProcessProvider:
+    """Test cases for InProcessProvider."""
+
+    async def test_reads_from_cache(self):
+        """Test that vacancies come straight from the cache."""
+
+        async def loader():
+            return [Vacancy(**VACANCY)]
+
+        provider = InProcessProvider(VacancyCache(loader, ttl=60))
+        result = await provider.get_vacancies()
+        assert [v.title for v in result] == ["Python"]
+
+    async def test_sort_and_min_salary(self):
+        """Test that sort=salary reads the ranked cache and min_salary filters."""
+
+        async def loader():
+            return [Vacancy(**VACANCY)]
+
+        async def ranked():
+            return [
+                Vacancy(**VACANCY, salary_net=salary_net)
+                for salary_net in (300000, 200000, 100000)
+            ]
+
+        provider = InProcessProvider(
+            VacancyCache(loader, ttl=60), VacancyCache(ranked, ttl=60)
+        )
+        result = await provider.get_vacancies("salary", min_salary=150000)
+        assert [v.salary_net for v in result] == [300000, 200000]
+        assert await provider.get_vacancies(min_salary=1) == []
+
+
+class TestRemoteProvider:
+    """Test cases for RemoteProvider."""
+
+    async def test_reuses_session(self):
+        """Test that requests share one long-lived session."""
+
+        async def handler(request):
+            return web.json_response([VACANCY])
+
+        app = web.Application()
+        app.router.add_get("/vacancies", handler)
+        async with TestServer(app) as server:
+            provider = RemoteProvider(str(server.make_url("")))
+            first = await provider.get_vacancies()
+            session = provider._session
+            second = await provider.get_vacancies()
+            assert provider._session is session
+            await provider.close()
+
+        assert first == second
+        assert first[0].title == "Python"
+
+    async def test_passes_listing_parameters(self):
+        """Test that sort and min_salary are sent as query parameters."""
+        queries = []
+
+        async def handler(request):
+            queries.append(dict(request.query))
+            return web.json_response([VACANCY])
+
+        app = web.Application()
+        app.router.add_get("/vacancies", handler)
+        async with TestServer(app) as server:
+            provider = RemoteProvider(str(server.make_url("")))
+            await provider.get_vacancies("salary", 150000)
+            await provider.close()
+
+        assert queries == [{"sort": "salary", "min_salary": "150000"}]
+
+    async def test_error_status_returns_none(self):
+        """Test that a non-200 response is reported as None."""
+
+        async def handler(request):
+            return web.Response(status=502)
+
+        app = web.Application()
+        app.router.add_get("/vacancies", handler)
+        async with TestServer(app) as server:
+            provider = RemoteProvider(str(server.make_url("")))
+            assert await provider.get_vacancies() is None
+            await provider.close()
+
+
+class TestCreateProvider:
+    """Test cases for provider selection."""
+
+    def test_known_kinds(self):
+        """Test that configured kinds map to implementations."""
+        assert isinstance(create_provider("inprocess"), InProcessProvider)
+        assert isinstance(create_provider("remote"), RemoteProvider)
+
+    def test_unknown_kind(self):
+        """Test that an unknown kind is rejected."""
+        with pytest.raises(ValueError, match="Unknown vacancy provider"):
+            create_provider("carrier-pigeon")
@@ -0,0 +1,126 @@
+"""Tests for salary normalization and top-k ranking."""
+
+import random
+
+import aiohttp
+
+from app import salary
+from app.config import config
+from app.parser import accept_item, crawl_ranked_vacancies
+from app.salary import RateTable, TopK, at_least, normalize_salary, refresh_rates
+from benchmarks.fake_hh import FakeHHServer
+from tests.conftest import make_vacancy
+
+RATES = RateTable({"RUR": 1.0, "USD": 0.01})
+
+
+class TestNormalizeSalary:
+    """Test cases for normalize_salary."""
+
+    def test_converts_upper_bound(self):
+        """Test that the upper bound is converted to the base currency."""
+        info = {"from": 1000, "to": 2000, "currency": "USD", "gross": False}
+        assert normalize_salary(info, RATES) == 200000
+
+    def test_gross_is_reduced_by_income_tax(self):
+        """Test that a gross salary is compared net of tax."""
+        info = {"from": 100000, "currency": "RUR", "gross": True}
+        assert normalize_salary(info, RATES) == 87000
+
+    def test_unknown_amount_or_currency(self):
+        """Test that a missing amount or rate yields None."""
+        assert normalize_salary({"currency": "RUR"}, RATES) is None
+        assert normalize_salary({"from": 100, "currency": "XYZ"}, RATES) is None
+
+    def test_rub_alias(self):
+        """Test that RUB is treated as hh.ru's RUR."""
+        assert normalize_salary({"to": 5000, "currency": "RUB"}, RATES) == 5000
+
+
+class TestRateTable:
+    """Test cases for the local rate table."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that saved rates are loaded back."""
+        path = str(tmp_path / "rates" / "rates.json")
+        RateTable({"RUR": 1.0, "KZT": 6.0}, fetched_at=123.0).save(path)
+
+        loaded = RateTable.load(path)
+        assert loaded.rates == {"RUR": 1.0, "KZT": 6.0}
+        assert loaded.fetched_at == 123.0
+
+    def test_missing_or_broken_file(self, tmp_path):
+        """Test that default rates are used without a readable file."""
+        broken = tmp_path / "rates.json"
+        broken.write_text("{")
+        assert RateTable.load(str(tmp_path / "none.json")).rates["RUR"] == 1.0
+        assert RateTable.load(str(broken)).rates == salary.DEFAULT_RATES
+
+    async def test_refresh_from_dictionaries(self, tmp_path, monkeypatch):
+        """Test that stale rates are refreshed from hh.ru and cached."""
+        path = str(tmp_path / "rates.json")
+        monkeypatch.setattr(config, "RATES_TTL", 3600.0)
+        monkeypatch.setattr(config, "RATES_PATH", path)
+        monkeypatch.setattr(salary, "_rates", RateTable({"RUR": 1.0}))
+        async with FakeHHServer(pages=1, per_page=1) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                rates = await refresh_rates(session)
+                # Свежая копия повторно не запрашивается
+                assert await refresh_rates(session) is rates
+
+        assert rates.rates["USD"] == 0.0125
+        assert RateTable.load(path).rates == rates.rates
+
+
+class TestTopK:
+    """Test cases for the bounded-heap selector."""
+
+    def test_matches_sorting(self):
+        """Test that the heap keeps the k largest in descending order."""
+        rng = random.Random(1)
+        values = [rng.randint(0, 1000) for _ in range(500)]
+        ranking = TopK(10, key=lambda value: value)
+        for value in values:
+            ranking.push(value)
+
+        assert len(ranking) == 10
+        assert ranking.result() == sorted(values, reverse=True)[:10]
+
+    def test_ties_keep_arrival_order(self):
+        """Test that of equal keys the earliest wins."""
+        ranking = TopK(2, key=lambda vacancy: vacancy.salary_net)
+        for index in range(5):
+            ranking.push(make_vacancy(index, salary_net=100))
+
+        assert [v.id for v in ranking.result()] == ["0", "1"]
+
+    def test_at_least(self):
+        """Test that vacancies without salary do not pass min_salary."""
+        vacancies = [
+            make_vacancy(1, salary_net=50),
+            make_vacancy(2, salary_net=150),
+            make_vacancy(3),
+        ]
+        assert [v.id for v in at_least(vacancies, 100)] == ["2"]
+
+
+class TestRankedCrawl:
+    """Test cases for crawl_ranked_vacancies."""
+
+    async def test_ranks_across_all_pages(self, monkeypatch):
+        """Test that ranking is not limited to the first matches."""
+        monkeypatch.setattr(config, "MAX_VACANCIES", 5)
+        async with FakeHHServer(pages=3, per_page=100) as server:
+            monkeypatch.setattr(config, "HH_API_URL", server.url)
+            async with aiohttp.ClientSession() as session:
+                result = await crawl_ranked_vacancies(5, session, concurrency=2)
+            requests = server.requests
+            accepted = [accept_item(item) for item in server.items]
+
+        expected = sorted(
+            (f["salary_net"] for f in accepted if f and f["salary_net"]), reverse=True
+        )
+        assert requests == 3
+        assert [v.salary_net for v in result.vacancies] == expected[:5]
+        assert result.complete
@@ -0,0 +1,125 @@
+"""Tests for the cross-process shared backend."""
+
+import asyncio
+import time
+
+from app import scheduler
+from app.cache import VacancyCache
+from app.models import dump_vacancies_json
+from app.shared import LeaderLease, SQLiteBackend
+from tests.conftest import CountingLoader, make_vacancies
+
+
+class TestSQLiteBackend:
+    """Test cases for SQLiteBackend."""
+
+    def test_entry_round_trip(self, tmp_path):
+        """Test that values written by one worker are read by another."""
+        path = str(tmp_path / "shared.db")
+        SQLiteBackend(path).set("key", b"value", complete=False)
+
+        entry = SQLiteBackend(path).get("key")
+        assert entry.value == b"value"
+        assert entry.complete is False
+        assert entry.age < 5
+
+    def test_lease_is_exclusive(self, tmp_path):
+        """Test that only one owner holds a lease until it expires."""
+        path = str(tmp_path / "shared.db")
+        first, second = SQLiteBackend(path), SQLiteBackend(path)
+
+        assert first.acquire("leader", "a", ttl=60)
+        assert not second.acquire("leader", "b", ttl=60)
+        # Владелец продлевает свою аренду
+        assert first.acquire("leader", "a", ttl=60)
+
+        first.release("leader", "a")
+        assert second.acquire("leader", "b", ttl=60)
+
+    def test_expired_lease_is_taken_over(self, tmp_path):
+        """Test that a lease of a dead owner expires."""
+        backend = SQLiteBackend(str(tmp_path / "shared.db"))
+        assert backend.acquire("leader", "a", ttl=0.05)
+        time.sleep(0.06)
+        assert backend.acquire("leader", "b", ttl=60)
+        assert not backend.acquire("leader", "a", ttl=60)
+
+    def test_leader_lease_release(self, tmp_path):
+        """Test that LeaderLease releases only a lease it holds."""
+        backend = SQLiteBackend(str(tmp_path / "shared.db"))
+        leader = LeaderLease(backend, "job", ttl=60)
+        other = LeaderLease(backend, "job", ttl=60)
+
+        assert leader.acquire()
+        assert not other.acquire()
+        other.release()
+        assert not other.acquire()
+        leader.release()
+        assert other.acquire()
+
+
+class TestSharedCache:
+    """Test cases for VacancyCache with a shared backend."""
+
+    async def test_one_worker_crawls(self, tmp_path):
+        """Test that concurrent workers share one crawl."""
+        path = str(tmp_path / "shared.db")
+        loaders = [CountingLoader("a", delay=0.1), CountingLoader("b", delay=0.1)]
+        caches = [
+            VacancyCache(loader, ttl=60, shared=SQLiteBackend(path), poll_interval=0.01)
+            for loader in loaders
+        ]
+
+        results = await asyncio.gather(*(cache.get() for cache in caches))
+
+        assert sum(loader.calls for loader in loaders) == 1
+        assert results[0] == results[1]
+        assert caches[0].etag == caches[1].etag
+
+    async def test_fresh_entry_skips_crawl(self, tmp_path):
+        """Test that a new worker serves a fresh shared result."""
+        backend = SQLiteBackend(str(tmp_path / "shared.db"))
+        backend.set("vacancies", dump_vacancies_json(make_vacancies("shared")), False)
+        loader = CountingLoader("own", delay=0.1)
+        cache = VacancyCache(loader, ttl=60, partial_ttl=30, shared=backend)
+
+        streamed = [vacancy async for vacancy in cache.stream()]
+
+        assert loader.calls == 0
+        assert [v.title for v in streamed] == ["shared 0"]
+        assert cache.complete is False
+
+    async def test_crawls_when_leader_gives_up(self, tmp_path):
+        """Test that a waiting worker crawls after the lease is released."""
+        backend = SQLiteBackend(str(tmp_path / "shared.db"))
+        backend.acquire("crawl:vacancies", "dead", ttl=60)
+        loader = CountingLoader("own", delay=0)
+        cache = VacancyCache(loader, ttl=60, shared=backend, poll_interval=0.01)
+
+        task = asyncio.create_task(cache.get())
+        await asyncio.sleep(0.05)
+        assert loader.calls == 0
+        backend.release("crawl:vacancies", "dead")
+
+        assert (await task)[0].title == "own 1 0"
+        assert loader.calls == 1
+
+
+class TestScheduledJob:
+    """Test cases for the single-run daily job."""
+
+    async def test_runs_once_across_workers(self, tmp_path, monkeypatch):
+        """Test that only the first worker sends the digest."""
+        path = str(tmp_path / "shared.db")
+        runs = []
+
+        async def send():
+            runs.append(1)
+
+        monkeypatch.setattr(scheduler, "send_daily_vacancies", send)
+        for _ in range(3):
+            backend = SQLiteBackend(path)
+            monkeypatch.setattr(scheduler, "get_shared_backend", lambda: backend)
+            await scheduler.run_daily_vacancies()
+
+        assert runs == [1]
@@ -0,0 +1,140 @@
+"""Tests for on-disk crawl snapshots."""
+
+import asyncio
+import gzip
+import json
+import time
+
+from app import snapshot
+from app.cache import VacancyCache
+from app.config import config
+from app.snapshot import load_snapshot, snapshot_path, write_snapshot
+from tests.conftest import CountingLoader, make_vacancies
+
+
+class TestSnapshotFile:
+    """Test cases for writing and reading snapshot files."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that vacancies and metadata survive a round trip."""
+        path = str(tmp_path / "snapshots" / "vacancies.jsonl.gz")
+        vacancies = make_vacancies("Python", 3)
+        write_snapshot(path, vacancies, complete=False, etag='"abc"', saved_at=123.0)
+
+        loaded = load_snapshot(path)
+        assert loaded.vacancies == vacancies
+        assert loaded.saved_at == 123.0
+        assert not loaded.complete
+        assert loaded.etag == '"abc"'
+        # Временные файлы не остаются рядом со снимком
+        assert [p.name for p in (tmp_path / "snapshots").iterdir()] == [
+            "vacancies.jsonl.gz"
+        ]
+
+    def test_missing_or_corrupt(self, tmp_path):
+        """Test that an unreadable snapshot is ignored."""
+        path = tmp_path / "vacancies.jsonl.gz"
+        assert load_snapshot(str(path)) is None
+
+        path.write_bytes(b"not gzip")
+        assert load_snapshot(str(path)) is None
+
+        write_snapshot(str(path), make_vacancies("Python", 3))
+        truncated = path.read_bytes()[:-20]
+        path.write_bytes(truncated)
+        assert load_snapshot(str(path)) is None
+
+    def test_other_version(self, tmp_path, monkeypatch):
+        """Test that a snapshot in another format version is ignored."""
+        path = str(tmp_path / "vacancies.jsonl.gz")
+        monkeypatch.setattr(snapshot, "SNAPSHOT_VERSION", 0)
+        write_snapshot(path, make_vacancies("Python", 3))
+        monkeypatch.undo()
+
+        with gzip.open(path, "rb") as f:
+            assert json.loads(f.readline())["version"] == 0
+        assert load_snapshot(path) is None
+
+    def test_path_from_config(self, tmp_path, monkeypatch):
+        """Test that cache keys map to files and an empty dir disables them."""
+        monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path))
+        assert snapshot_path("vacancies:salary") == str(
+            tmp_path / "vacancies_salary.jsonl.gz"
+        )
+        monkeypatch.setattr(config, "SNAPSHOT_DIR", "")
+        assert snapshot_path("vacancies") is None
+
+
+class TestCacheSnapshot:
+    """Test cases for VacancyCache warm restarts."""
+
+    async def test_load_is_saved(self, tmp_path):
+        """Test that a loaded result is written to the snapshot."""
+        path = str(tmp_path / "vacancies.jsonl.gz")
+        cache = VacancyCache(CountingLoader(count=3), ttl=60, snapshot=path)
+        await cache.get()
+        await cache._saving
+
+        saved = load_snapshot(path)
+        assert [v.title for v in saved.vacancies] == [
+            "load 1 0",
+            "load 1 1",
+            "load 1 2",
+        ]
+        assert saved.etag == cache.etag
+
+    async def test_fresh_snapshot_is_served(self, tmp_path):
+        """Test that a restart serves a fresh snapshot without crawling."""
+        path = str(tmp_path / "vacancies.jsonl.gz")
+        write_snapshot(path, make_vacancies("saved", 3), etag='"saved"')
+        loader = CountingLoader(count=3)
+        cache = VacancyCache(loader, ttl=60, snapshot=path)
+
+        results = await asyncio.gather(*(cache.get() for _ in range(5)))
+
+        assert all(r[0].title == "saved 0" for r in results)
+        assert cache.etag == '"saved"'
+        assert loader.calls == 0
+        assert cache.hits == 5
+
+    async def test_stale_snapshot_refreshes_in_background(self, tmp_path):
+        """Test that an old snapshot is answered at once and then replaced."""
+        path = str(tmp_path / "vacancies.jsonl.gz")
+        write_snapshot(path, make_vacancies("saved", 3), saved_at=time.time() - 120)
+        loader = CountingLoader(count=3)
+        cache = VacancyCache(loader, ttl=60, snapshot=path)
+
+        stale = await cache.get()
+        assert stale[0].title == "saved 0"
+        assert cache.stale_hits == 1
+
+        await asyncio.sleep(0.05)
+        await cache._saving
+        assert loader.calls == 1
+        assert (await cache.get())[0].title == "load 1 0"
+        assert load_snapshot(path).vacancies[0].title == "load 1 0"
+
+    async def test_warm_reads_in_background(self, tmp_path):
+        """Test that warm() restores the snapshot before the first request."""
+        path = str(tmp_path / "vacancies.jsonl.gz")
+        write_snapshot(path, make_vacancies("saved", 3))
+        cache = VacancyCache(CountingLoader(), ttl=60, snapshot=path)
+
+        cache.warm()
+        await cache._restoring
+        cache.warm()
+
+        assert cache.etag is not None
+        assert (await cache.get())[0].title == "saved 0"
+        assert cache.hits == 1
+
+    async def test_stream_from_snapshot(self, tmp_path):
+        """Test that stream() serves the snapshot instead of a crawl."""
+        path = str(tmp_path / "vacancies.jsonl.gz")
+        write_snapshot(path, make_vacancies("saved", 3))
+        cache = VacancyCache(CountingLoader(count=3), ttl=60, snapshot=path)
+
+        streamed = [vacancy.title async for vacancy in cache.stream()]
+
+        assert streamed == ["saved 0", "saved 1", "saved 2"]
+        assert cache.misses == 0
@@ -0,0 +1,79 @@
+"""Tests for persistent seen-vacancy store."""
+
+from datetime import datetime, timezone
+
+from app.storage import SeenStore, SubscriberStore
+from tests.conftest import make_vacancy
+
+
+class TestSeenStore:
+    """Test cases for SeenStore."""
+
+    def test_add_new_returns_only_unseen(self, tmp_path):
+        """Test that already seen vacancies are filtered out."""
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+
+        first = store.add_new([make_vacancy(1), make_vacancy(2)])
+        second = store.add_new([make_vacancy(2), make_vacancy(3)])
+
+        assert [v.id for v in first] == ["1", "2"]
+        assert [v.id for v in second] == ["3"]
+
+    def test_unseen_does_not_mark(self, tmp_path):
+        """Test that unseen() filters without recording anything."""
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        store.add_new([make_vacancy(1)])
+        batch = [make_vacancy(1), make_vacancy(2)]
+
+        assert [v.id for v in store.unseen(batch)] == ["2"]
+        assert [v.id for v in store.unseen(batch)] == ["2"]
+        assert store.first_seen("2") is None
+
+    def test_persists_between_instances(self, tmp_path):
+        """Test that state survives reopening the database."""
+        path = str(tmp_path / "db.sqlite")
+        moment = datetime(2024, 1, 1, 6, 0, tzinfo=timezone.utc)
+
+        store = SeenStore(path)
+        store.add_new([make_vacancy(1)], now=moment)
+        store.set_last_crawl(moment)
+        store.close()
+
+        reopened = SeenStore(path)
+        assert reopened.last_crawl() == moment
+        assert reopened.first_seen("1") == moment
+        assert reopened.add_new([make_vacancy(1)]) == []
+
+    def test_last_crawl_per_query(self, tmp_path):
+        """Test that each query keeps its own crawl time."""
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        moment = datetime(2024, 1, 1, 6, 0, tzinfo=timezone.utc)
+        store.set_last_crawl(moment, "python@1")
+
+        assert store.last_crawl("python@1") == moment
+        assert store.last_crawl("devops@1") is None
+        assert store.last_crawl() is None
+
+    def test_empty_store(self, tmp_path):
+        """Test defaults of a fresh store."""
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        assert store.last_crawl() is None
+        assert store.first_seen("1") is None
+
+
+class TestSubscriberStore:
+    """Test cases for SubscriberStore."""
+
+    def test_add_and_remove(self, tmp_path):
+        """Test subscribing and unsubscribing chats."""
+        store = SubscriberStore(str(tmp_path / "db.sqlite"))
+
+        assert store.add("1")
+        assert not store.add("1")
+        assert store.add("2")
+        assert store.all() == ["1", "2"]
+        assert len(store) == 2
+
+        assert store.remove("1")
+        assert not store.remove("1")
+        assert store.all() == ["2"]
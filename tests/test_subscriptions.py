@@ -0,0 +1,135 @@
+"""Tests for per-user subscriptions and the inverted index."""
+
+import pytest
+
+from app.bot import rejected_by_profile
+from app.storage import SubscriberStore
+from app.subscriptions import Subscription, SubscriptionIndex, tokenize
+from tests import conftest
+
+
+def make_vacancy(title, salary_from=None, schedule="remote", employment="part"):
+    return conftest.make_vacancy(
+        1,
+        title,
+        salary_from=salary_from,
+        currency="RUR" if salary_from else None,
+        schedule=schedule,
+        employment=employment,
+    )
+
+
+class TestSubscription:
+    """Test cases for Subscription."""
+
+    def test_tokenize_keeps_language_names(self):
+        """Test that C++ and C# survive tokenization."""
+        assert tokenize("Разработчик C++/C#, Python") == {
+            "разработчик",
+            "c++",
+            "c#",
+            "python",
+        }
+
+    def test_accepts(self):
+        """Test keyword, exclude, salary and attribute rules."""
+        subscription = Subscription(
+            "1",
+            keywords=("python", "data engineer"),
+            exclude=("senior",),
+            min_salary=150000,
+            schedule=("remote",),
+        )
+        assert subscription.accepts(make_vacancy("Python developer", 200000))
+        assert subscription.accepts(make_vacancy("Data Engineer", 150000))
+        assert not subscription.accepts(make_vacancy("Engineer", 200000))
+        assert not subscription.accepts(make_vacancy("Senior Python", 200000))
+        assert not subscription.accepts(make_vacancy("Python developer", 100000))
+        assert not subscription.accepts(make_vacancy("Python developer"))
+        assert not subscription.accepts(
+            make_vacancy("Python developer", 200000, schedule="fullDay")
+        )
+
+    def test_keywords_match_key_skills(self):
+        """Test that enriched key skills count as keywords."""
+        subscription = Subscription("1", keywords=("django",))
+        vacancy = make_vacancy("Backend developer")
+        assert not subscription.accepts(vacancy)
+        enriched = vacancy.model_copy(update={"key_skills": ["Python", "Django"]})
+        assert subscription.accepts(enriched)
+        assert SubscriptionIndex([subscription]).match(enriched) == ["1"]
+
+    def test_parse(self):
+        """Test parsing of /prefs arguments."""
+        subscription = Subscription.parse(
+            "1", "keywords=python, django; salary=150000; schedule=remote"
+        )
+        assert subscription.keywords == ("python", "django")
+        assert subscription.min_salary == 150000
+        assert subscription.schedule == ("remote",)
+
+        with pytest.raises(ValueError):
+            Subscription.parse("1", "colour=red")
+        with pytest.raises(ValueError):
+            Subscription.parse("1", "salary=много")
+
+    def test_rejected_by_profile(self):
+        """Test that values the filter profile never lets through are reported."""
+        subscription = Subscription.parse(
+            "1", "schedule=remote, fullDay; employment=part, full"
+        )
+        assert rejected_by_profile(subscription) == ["fullDay", "full"]
+        assert rejected_by_profile(Subscription("1")) == []
+
+
+class TestSubscriptionIndex:
+    """Test cases for SubscriptionIndex."""
+
+    def test_matches_same_as_linear_scan(self):
+        """Test that the index agrees with checking every subscription."""
+        subscriptions = [
+            Subscription("python", keywords=("python",)),
+            Subscription("go", keywords=("go", "golang")),
+            Subscription("remote", schedule=("remote",)),
+            Subscription("office", schedule=("fullDay",)),
+            Subscription("project", employment=("project",)),
+            Subscription("all"),
+            Subscription("rich", min_salary=300000),
+            Subscription("no-senior", exclude=("senior",)),
+        ]
+        index = SubscriptionIndex(subscriptions)
+        vacancies = [
+            make_vacancy("Python developer", 200000),
+            make_vacancy("Senior Golang engineer", 400000, schedule="fullDay"),
+            make_vacancy("Go разработчик", employment="project"),
+            make_vacancy("DevOps"),
+        ]
+        for vacancy in vacancies:
+            expected = [s.chat_id for s in subscriptions if s.accepts(vacancy)]
+            assert index.match(vacancy) == expected
+
+    def test_match_all_groups_by_chat(self):
+        """Test that vacancies are grouped per subscriber in order."""
+        index = SubscriptionIndex([Subscription("1", keywords=("python",))])
+        first = make_vacancy("Python developer")
+        second = make_vacancy("Java developer")
+        third = make_vacancy("Senior Python")
+        assert index.match_all([first, second, third]) == {"1": [first, third]}
+
+
+class TestPreferencesStorage:
+    """Test cases for storing preferences."""
+
+    def test_roundtrip(self, tmp_path):
+        """Test that preferences persist and follow subscription state."""
+        store = SubscriberStore(str(tmp_path / "db.sqlite"))
+        store.add("1")
+        subscription = Subscription("1", keywords=("python",), min_salary=100)
+        store.set_preferences(subscription)
+        store.set_preferences(Subscription("2", keywords=("go",)))
+
+        assert store.get_preferences("1") == subscription
+        assert store.preferences() == [subscription]
+
+        store.set_preferences(Subscription("1"))
+        assert store.get_preferences("1") is None
@@ -0,0 +1,203 @@
+"""Tests for the hh.ru upstream client."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.config import config
+from app.parser import crawl_top_vacancies
+from app.storage import SeenStore
+from app.upstream import (
+    AIMDController,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    UpstreamClient,
+    UpstreamError,
+)
+from tests.test_parser import crawl_new, make_item
+
+
+def make_server(handler):
+    app = web.Application()
+    app.router.add_get("/vacancies", handler)
+    return TestServer(app)
+
+
+def flaky_pages(pages, broken):
+    """hh.ru stand-in whose pages in ``broken`` always answer 503."""
+    requested = []
+
+    async def handler(request):
+        page = int(request.query["page"])
+        requested.append(page)
+        if page in broken:
+            return web.Response(status=503)
+        items = pages[page] if page < len(pages) else []
+        return web.json_response({"items": items, "pages": len(pages)})
+
+    return handler, requested
+
+
+class TestPolicies:
+    """Test cases for retry, AIMD and circuit breaker policies."""
+
+    def test_retry_delay(self):
+        """Test jittered backoff bounds and Retry-After precedence."""
+        policy = RetryPolicy(attempts=5, base=1.0, cap=3.0)
+        assert all(0 <= policy.delay(0) <= 1.0 for _ in range(100))
+        assert all(0 <= policy.delay(4) <= 3.0 for _ in range(100))
+        assert policy.delay(0, retry_after=2.0) == 2.0
+
+    def test_aimd(self):
+        """Test additive increase and multiplicative decrease."""
+        controller = AIMDController(maximum=8, latency_target=0.0)
+        controller.on_throttle()
+        assert controller.limit == 4
+        controller.on_success(latency=-1)
+        assert controller.limit == pytest.approx(4.25)
+
+        controller = AIMDController(maximum=8, latency_target=60.0)
+        controller.on_throttle()
+        controller.on_throttle()
+        assert controller.limit == 4
+
+    def test_breaker(self):
+        """Test opening, half-open probe and closing."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+        breaker.reset_timeout = 0
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+
+class TestUpstreamClient:
+    """Test cases for UpstreamClient."""
+
+    async def test_retries_server_errors(self):
+        """Test that 5xx and 429 answers are retried until success."""
+        statuses = [503, 429, 200]
+
+        async def handler(request):
+            status = statuses.pop(0)
+            if status != 200:
+                return web.Response(status=status, headers={"Retry-After": "0"})
+            return web.json_response({"items": []})
+
+        client = UpstreamClient(max_concurrency=4)
+        async with make_server(handler) as server, aiohttp.ClientSession() as session:
+            data = await client.get_json(
+                session, str(server.make_url("/vacancies")), {}
+            )
+        assert data == {"items": []}
+        assert client.controller.limit < 4
+
+    async def test_client_errors_are_not_retried(self):
+        """Test that 4xx answers fail immediately."""
+        calls = []
+
+        async def handler(request):
+            calls.append(1)
+            return web.Response(status=400)
+
+        client = UpstreamClient()
+        async with make_server(handler) as server, aiohttp.ClientSession() as session:
+            with pytest.raises(UpstreamError):
+                await client.get_json(session, str(server.make_url("/vacancies")), {})
+        assert len(calls) == 1
+        assert client.breaker.state == "closed"
+
+    async def test_open_circuit_skips_requests(self):
+        """Test that an open circuit fails without calling hh.ru."""
+        client = UpstreamClient(breaker=CircuitBreaker(failure_threshold=1))
+        client.breaker.record_failure()
+        async with aiohttp.ClientSession() as session:
+            with pytest.raises(CircuitOpenError):
+                await client.get_json(session, "http://127.0.0.1:9/", {})
+
+    async def test_cancelled_probe_is_released(self):
+        """Test that a cancelled half-open probe lets the next request probe."""
+        started = asyncio.Event()
+
+        async def handler(request):
+            started.set()
+            await asyncio.sleep(60)
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        client = UpstreamClient(breaker=breaker)
+        async with make_server(handler) as server, aiohttp.ClientSession() as session:
+            url = str(server.make_url("/vacancies"))
+            probe = asyncio.create_task(client.get_json(session, url, {}))
+            await started.wait()
+            assert not breaker.allow()
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+
+        assert breaker.allow()
+
+
+class TestPartialCrawl:
+    """Test cases for partial and stale crawl results."""
+
+    async def test_failed_page_keeps_other_pages(self, monkeypatch):
+        """Test that one broken page yields an incomplete result."""
+        pages = [[make_item(1)], [make_item(2)], [make_item(3)]]
+        handler, _ = flaky_pages(pages, broken={1})
+        async with make_server(handler) as server:
+            monkeypatch.setattr(
+                config, "HH_API_URL", str(server.make_url("/vacancies"))
+            )
+            async with aiohttp.ClientSession() as session:
+                result = await crawl_top_vacancies(session, concurrency=1)
+
+        assert [v.id for v in result.vacancies] == ["1", "3"]
+        assert not result.complete
+        assert result.failed_pages == 1
+
+    async def test_serves_last_good_result(self, monkeypatch):
+        """Test that an outage returns the last complete result as stale."""
+        pages = [[make_item(1)]]
+        broken = set()
+        handler, _ = flaky_pages(pages, broken)
+        async with make_server(handler) as server:
+            monkeypatch.setattr(
+                config, "HH_API_URL", str(server.make_url("/vacancies"))
+            )
+            async with aiohttp.ClientSession() as session:
+                good = await crawl_top_vacancies(session)
+                broken.add(0)
+                stale = await crawl_top_vacancies(session)
+
+        assert good.complete and not good.stale
+        assert stale.stale and not stale.complete
+        assert [v.id for v in stale.vacancies] == ["1"]
+
+    async def test_incremental_keeps_last_crawl_on_partial(self, monkeypatch, tmp_path):
+        """Test that a partial incremental crawl does not move the query's cursor."""
+        since = datetime.now(timezone.utc) - timedelta(days=7)
+        store = SeenStore(str(tmp_path / "db.sqlite"))
+        store.set_last_crawl(since)
+        pages = [[make_item(1)], [make_item(2)]]
+        handler, _ = flaky_pages(pages, broken={1})
+        async with make_server(handler) as server:
+            monkeypatch.setattr(
+                config, "HH_API_URL", str(server.make_url("/vacancies"))
+            )
+            async with aiohttp.ClientSession() as session:
+                new = await crawl_new(store, session)
+
+        assert [v.id for v in new] == ["1"]
+        assert store.last_crawl("python@1") == since
@@ -0,0 +1,137 @@
+"""Tests for the Telegram webhook route."""
+
+import asyncio
+
+import httpx
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Message
+from fastapi import FastAPI
+
+from app.webhook import SECRET_HEADER, WebhookHandler, webhook_secret, webhook_url
+from benchmarks.fake_telegram import FakeTelegramServer, make_update
+
+TOKEN = "42:test-token"
+
+
+def make_bot(api_url="http://127.0.0.1:9"):
+    session = AiohttpSession(api=TelegramAPIServer.from_base(api_url))
+    return Bot(token=TOKEN, session=session)
+
+
+def make_client(handler):
+    app = FastAPI()
+    handler.mount(app, "/hook")
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+class TestWebhookSecret:
+    """Test cases for secret and URL helpers."""
+
+    def test_derived_secret_is_stable(self):
+        """Test that replicas derive the same secret from the token."""
+        assert webhook_secret(TOKEN, "") == webhook_secret(TOKEN, "")
+        assert webhook_secret(TOKEN, "") != webhook_secret("43:other", "")
+        assert TOKEN not in webhook_secret(TOKEN, "")
+
+    def test_explicit_secret_wins(self):
+        """Test that WEBHOOK_SECRET overrides the derived value."""
+        assert webhook_secret(TOKEN, "s3cret") == "s3cret"
+
+    def test_webhook_url(self):
+        """Test joining the public base URL and the route path."""
+        assert webhook_url("https://bot.example/", "/tg") == "https://bot.example/tg"
+
+
+class TestWebhookHandler:
+    """Test cases for update intake."""
+
+    async def test_rejects_wrong_secret(self):
+        """Test that updates without the secret are not processed."""
+        dp = Dispatcher()
+        seen = []
+        dp.message.register(lambda message: seen.append(message.text))
+        handler = WebhookHandler(dp, make_bot(), secret="right")
+
+        async with make_client(handler) as client:
+            missing = await client.post("/hook", json=make_update(1, 7, "hi"))
+            wrong = await client.post(
+                "/hook",
+                json=make_update(2, 7, "hi"),
+                headers={SECRET_HEADER: "wrong"},
+            )
+        await handler.drain()
+
+        assert missing.status_code == 401
+        assert wrong.status_code == 401
+        assert seen == []
+
+    async def test_limits_concurrency(self):
+        """Test that at most max_concurrency updates run at once."""
+        dp = Dispatcher()
+        running = 0
+        peak = 0
+        release = asyncio.Event()
+
+        @dp.message()
+        async def slow(message: Message) -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+
+        handler = WebhookHandler(dp, make_bot(), secret="s", max_concurrency=2)
+        async with make_client(handler) as client:
+            posts = [
+                asyncio.create_task(
+                    client.post(
+                        "/hook",
+                        json=make_update(i, i, "hi"),
+                        headers={SECRET_HEADER: "s"},
+                    )
+                )
+                for i in range(5)
+            ]
+            await asyncio.sleep(0.1)
+            assert handler.in_flight == 2
+            assert sum(post.done() for post in posts) == 2
+
+            release.set()
+            responses = await asyncio.gather(*posts)
+            await handler.drain()
+
+        assert [r.status_code for r in responses] == [200] * 5
+        assert peak == 2
+
+    async def test_register_and_reply(self):
+        """Test registering the webhook and answering via the fake Bot API."""
+        dp = Dispatcher()
+
+        @dp.message()
+        async def echo(message: Message) -> None:
+            await message.answer(f"echo: {message.text}")
+
+        async with FakeTelegramServer() as telegram:
+            bot = make_bot(telegram.url)
+            handler = WebhookHandler(dp, bot, secret="s")
+            try:
+                await handler.register("https://bot.example/hook")
+                assert telegram.webhook["url"] == "https://bot.example/hook"
+                assert telegram.webhook["secret_token"] == "s"
+
+                async with make_client(handler) as client:
+                    response = await client.post(
+                        "/hook",
+                        json=make_update(1, 7, "hello"),
+                        headers={SECRET_HEADER: telegram.webhook["secret_token"]},
+                    )
+                await handler.drain()
+            finally:
+                await bot.session.close()
+
+        assert response.status_code == 200
+        assert [m["text"] for m in telegram.messages] == ["echo: hello"]
+        assert telegram.messages[0]["chat"]["id"] == 7